@@ -6,6 +6,7 @@ class ApiConfig(AppConfig):
     name = 'api'
 
     def ready(self):
-        # Import tasks to start the background worker when the app is loaded
+        # Import tasks so the worker and the process pools exist; the worker
+        # threads are started by jobs.workers.start_workers()
         from . import tasks  # noqa: F401
 
@@ -0,0 +1,80 @@
+"""Detect the bank of a statement from its header row.
+
+Every registered schema lists the column names (``aliases``) its bank
+exports.  They are indexed once, at import time, as ``alias -> (bank,
+column)``; detecting a file is then one dictionary lookup per header cell
+of the first few rows, without parsing the rest of the statement.
+"""
+
+from __future__ import annotations
+
+from collections import defaultdict
+from typing import Iterable
+
+from common.detection import Detection, rank
+
+from .registry import HANDLERS
+
+# Index key: ``(True, alias.lower())`` for case-insensitive columns,
+# ``(False, alias)`` for the others (as the schema resolver matches them).
+IndexKey = tuple[bool, str]
+
+
+def _build_index(handlers: dict) -> tuple[dict[IndexKey, list[tuple[str, str, bool]]], dict[str, int]]:
+    index: dict[IndexKey, list[tuple[str, str, bool]]] = defaultdict(list)
+    required: dict[str, int] = {}
+    for bank, processor in handlers.items():
+        schema = getattr(processor, 'schema', None)
+        if not schema:
+            continue
+        ignore_case = schema.get('ignore_case', False)
+        required[bank] = sum(spec.get('required', True) for spec in schema['columns'].values())
+        for name, spec in schema['columns'].items():
+            fold = spec.get('ignore_case', ignore_case)
+            for alias in spec['aliases']:
+                key = (True, alias.lower()) if fold else (False, alias)
+                index[key].append((bank, name, spec.get('required', True)))
+    return dict(index), required
+
+
+INDEX, REQUIRED = _build_index(HANDLERS)
+
+
+def score_row(cells: Iterable) -> dict[str, tuple[float, int]]:
+    """Return ``bank -> (share of required columns, columns found)`` for a
+    candidate header row."""
+    found: dict[str, set[tuple[str, bool]]] = defaultdict(set)
+    for cell in cells:
+        if not isinstance(cell, str):
+            continue
+        label = cell.strip()
+        for key in ((False, label), (True, label.lower())):
+            for bank, name, required in INDEX.get(key, ()):
+                found[bank].add((name, required))
+
+    scores = {}
+    for bank, columns in found.items():
+        total = REQUIRED[bank]
+        hits = sum(required for _, required in columns)
+        scores[bank] = (hits / total if total else 1.0, len(columns))
+    return scores
+
+
+def detect_rows(rows: Iterable[Iterable]) -> Detection | None:
+    """Return the most likely bank and header row among ``rows``."""
+    best, best_matches = None, 0
+    for number, cells in enumerate(rows):
+        scores = score_row(cells)
+        ranked = rank(scores)
+        if ranked is None:
+            continue
+        bank, confidence = ranked
+        if best is None or (confidence, scores[bank][1]) > (best.confidence, best_matches):
+            best_matches = scores[bank][1]
+            best = Detection(
+                bank=bank,
+                confidence=confidence,
+                header_row=number,
+                candidates={b: round(s[0], 3) for b, s in scores.items()},
+            )
+    return best
@@ -1,82 +1,65 @@
 from __future__ import annotations
 
+import numpy as np
 import pandas as pd
 
+from .schema import compile_schema
+from .utils import is_number
 
-def _parse_row(row: pd.Series) -> dict:
-    """Return a dict with the required keys for the JSON output."""
-    fecha = str(row.get("fecha", "")).strip()
-    debito = str(row.get("debito", "")).strip()
-    credito = str(row.get("credito", "")).strip()
-    referencia = str(row.get("referencia", "")).strip()
-    descripcion = str(row.get("descripcion", "")).strip()
-    ciudad = str(row.get("ciudad", "")).strip()
 
-    fecha_dt = pd.to_datetime(fecha, dayfirst=True, errors="coerce")
-    fecha_formatted = (
-        fecha_dt.strftime("%d/%m/%Y") if fecha_dt is not pd.NaT else ""
-    )
+def _upcast_numeric_rows(df: pd.DataFrame, columns: dict, values: dict) -> None:
+    """Render integers as floats ("1500.0") in rows made only of numbers.
 
-    return {
-        "Fecha": fecha_formatted,
-        "importe_credito": credito,
-        "importe_debito": debito,
-        "referencia": referencia,
-        "Info_detallada": descripcion,
-        "Info_detallada2": ciudad,
-    }
-
-
-def _find_column(lowered: dict[str, str], names: list[str]) -> str | None:
-    """Return the first matching column from ``lowered``.
-
-    ``lowered`` maps lower-case names to the original column names in the
-    DataFrame.  ``names`` contains candidate column headings to try.
+    Historically every row was rebuilt as a ``pd.Series`` of the mapped
+    values, which pandas turned into a float Series when they were all
+    numeric.  The output keeps that rendering.
     """
 
-    for name in names:
-        if name.lower() in lowered:
-            return lowered[name.lower()]
-    return None
-
-
-def process(df: pd.DataFrame) -> pd.DataFrame:
-    """Transform the DataFrame from Banco Itaú to the required shape."""
-    df.columns = df.columns.str.strip()
-
-    lowered = {c.lower(): c for c in df.columns}
-
-    fecha_col = _find_column(lowered, ["fecha"])
-    debito_col = _find_column(lowered, ["debito", "debitos", "débito", "débitos"])
-    credito_col = _find_column(lowered, ["credito", "creditos", "crédito", "créditos"])
-    desc_col = _find_column(lowered, ["descripcion", "descripción"])
-    ciudad_col = _find_column(lowered, ["ciudad"])
-    ref_col = _find_column(lowered, ["no. documento", "codigo movimiento", "código movimiento"])
-
-    missing = [
-        name
-        for name, col in [
-            ("Fecha", fecha_col),
-            ("Débitos", debito_col),
-            ("Créditos", credito_col),
-            ("Descripción", desc_col),
-            ("Ciudad", ciudad_col),
-        ]
-        if col is None
-    ]
-    if missing:
-        raise ValueError(f"Columnas faltantes: {', '.join(sorted(missing))}")
-
-    records = []
-    for _, row in df.iterrows():
-        mapped = {
-            "fecha": row[fecha_col],
-            "debito": row[debito_col],
-            "credito": row[credito_col],
-            "descripcion": row[desc_col],
-            "ciudad": row[ciudad_col],
-            "referencia": row[ref_col] if ref_col else "",
-        }
-        records.append(_parse_row(pd.Series(mapped)))
-
-    return pd.DataFrame(records)
\ No newline at end of file
+    if columns["referencia"] is None:
+        return
+    upcast = pd.Series(True, index=df.index)
+    for col in columns.values():
+        if not upcast.any():
+            return
+        upcast &= is_number(df[col])
+    if not upcast.any():
+        return
+    has_float = pd.Series(False, index=df.index)
+    for col in columns.values():
+        has_float |= df[col].map(lambda v: isinstance(v, (float, np.floating)))
+    upcast &= has_float
+    if not upcast.any():
+        return
+    for name, col in columns.items():
+        rows = upcast & df[col].map(lambda v: isinstance(v, (int, np.integer)))
+        values[name] = values[name].mask(rows, df[col][rows].astype(float).map(str))
+
+
+SCHEMA = {
+    "name": "Banco Itaú",
+    "ignore_case": True,
+    "columns": {
+        "fecha": {"aliases": ["fecha"], "label": "Fecha"},
+        "debito": {"aliases": ["debito", "debitos", "débito", "débitos"], "label": "Débitos"},
+        "credito": {"aliases": ["credito", "creditos", "crédito", "créditos"], "label": "Créditos"},
+        "descripcion": {"aliases": ["descripcion", "descripción"], "label": "Descripción"},
+        "ciudad": {"aliases": ["ciudad"], "label": "Ciudad"},
+        "referencia": {
+            "aliases": ["no. documento", "codigo movimiento", "código movimiento"],
+            "required": False,
+        },
+    },
+    "transform": _upcast_numeric_rows,
+    "date": {"column": "fecha", "format": "dayfirst"},
+    "debit_credit": {"rule": "columns", "debit": "debito", "credit": "credito"},
+    "output": {
+        "Fecha": "fecha",
+        "importe_credito": "credito",
+        "importe_debito": "debito",
+        "referencia": "referencia",
+        "Info_detallada": "descripcion",
+        "Info_detallada2": "ciudad",
+    },
+}
+
+process = compile_schema(SCHEMA)
@@ -3,92 +3,61 @@ from __future__ import annotations
 
 import pandas as pd
 
+from .schema import compile_schema
+from .utils import map_unique, text_or_blank
 
-def _parse_row(row: pd.Series) -> dict:
-    """Return a dict with the required keys for the JSON output."""
+DEFAULT_REFERENCIA = "AVENIDA 3A. NORTE"
 
-    fecha = str(row.get("Fecha", "")).strip()
-    debito = str(row.get("Débitos", "")).strip()
-    credito = str(row.get("Créditos", "")).strip()
 
-    raw_referencia = row.get("Nro. Documento", "")
-    referencia = "" if pd.isna(raw_referencia) else str(raw_referencia).strip()
-    if referencia.lower() == "nan":
-        referencia = ""
-    elif raw_referencia == 0:
-        referencia = "AVENIDA 3A. NORTE"
-    transaccion = str(row.get("Transacción", "")).strip()
-
-    # If "Nro. Documento" is empty try to extract it from the end of
-    # "Transacción".  Many rows include the document number as the last word
-    # in the transaction description.
-    if not referencia:
-        parts = transaccion.rsplit(" ", 1)
-        if len(parts) == 2 and any(ch.isdigit() for ch in parts[1]):
-            referencia = parts[1]
-            transaccion = parts[0]
-        else:
-            referencia = "AVENIDA 3A. NORTE"
-
-    if referencia == transaccion:
-        referencia = ""
-
-    # Parse date - handle YYYY/MM/DD format and convert to DD/MM/YYYY
-    fecha_formatted = ""
-    if fecha:
-        try:
-            # If date is in YYYY/MM/DD format
-            if "/" in fecha:
-                parts = fecha.split("/")
-                if len(parts) == 3:
-                    # Check if first part is year (4 digits)
-                    if len(parts[0]) == 4 and parts[0].isdigit():
-                        # YYYY/MM/DD format
-                        year, month, day = parts
-                        fecha_formatted = f"{day.zfill(2)}/{month.zfill(2)}/{year}"
-                    else:
-                        # Assume DD/MM/YYYY format already
-                        fecha_formatted = fecha
-                else:
-                    fecha_formatted = fecha
-            else:
-                # Try parsing with pandas as fallback
-                fecha_dt = pd.to_datetime(fecha, errors="coerce")
-                if fecha_dt is not pd.NaT:
-                    fecha_formatted = fecha_dt.strftime("%d/%m/%Y")
-                else:
-                    fecha_formatted = fecha
-        except Exception:
-            fecha_formatted = fecha  # Keep original if parsing fails
-
-    return {
-        "Fecha": fecha_formatted,
-        "importe_credito": credito,
-        "importe_debito": debito,
-        "referencia": referencia,
-        "Info_detallada": transaccion,
-    }
+def _has_digit(value: object) -> bool:
+    return isinstance(value, str) and any(ch.isdigit() for ch in value)
 
 
-def process(df: pd.DataFrame) -> pd.DataFrame:
-    """Transform the DataFrame from Banco de Occidente to the required shape."""
+def _referencias(df: pd.DataFrame, columns: dict, values: dict) -> None:
+    """Fill ``referencia`` and ``transaccion`` from the two source columns."""
 
-    # Normalise column names by stripping whitespace
-    df.columns = df.columns.str.strip()
+    raw_referencia = df[columns["referencia"]]
+    referencia = text_or_blank(df, columns["referencia"])
+    is_nan = referencia.str.lower() == "nan"
+    referencia = referencia.mask(is_nan, "")
+    is_zero = ~is_nan & raw_referencia.notna() & (raw_referencia.astype(object) == 0)
+    referencia = referencia.mask(is_zero, DEFAULT_REFERENCIA)
+    transaccion = values["transaccion"]
 
-    required_columns = {"Fecha", "Débitos", "Créditos", "Nro. Documento", "Transacción"}
-    if not required_columns.issubset(df.columns):
-        missing = required_columns.difference(df.columns)
-        raise ValueError(f"Columnas faltantes: {', '.join(missing)}")
-
-    records = [_parse_row(row) for _, row in df.iterrows()]
-    result = pd.DataFrame(records)
-
-    # Sort transactions by date from earliest to latest
-    fechas = pd.to_datetime(result["Fecha"], format="%d/%m/%Y", errors="coerce")
-    result.insert(0, "_sort_date", fechas)
-    result.sort_values("_sort_date", inplace=True)
-    result.drop(columns=["_sort_date"], inplace=True)
-    result.reset_index(drop=True, inplace=True)
-
-    return result
+    # If "Nro. Documento" is empty try to extract it from the end of
+    # "Transacción".  Many rows include the document number as the last word
+    # in the transaction description.
+    empty = referencia == ""
+    parts = transaccion.str.rsplit(" ", n=1)
+    head, last = parts.str[0], parts.str[1]
+    extract = empty & map_unique(last, _has_digit).astype(bool)
+    referencia = referencia.mask(extract, last).mask(empty & ~extract, DEFAULT_REFERENCIA)
+    transaccion = transaccion.mask(extract, head)
+
+    values["referencia"] = referencia.mask(referencia == transaccion, "")
+    values["transaccion"] = transaccion
+
+
+SCHEMA = {
+    "name": "Banco de Occidente",
+    "columns": {
+        "fecha": {"aliases": ["Fecha"]},
+        "debitos": {"aliases": ["Débitos"]},
+        "creditos": {"aliases": ["Créditos"]},
+        "referencia": {"aliases": ["Nro. Documento"]},
+        "transaccion": {"aliases": ["Transacción"], "dtype": "str"},
+    },
+    "date": {"column": "fecha", "format": "ymd_slash"},
+    "debit_credit": {"rule": "columns", "debit": "debitos", "credit": "creditos"},
+    "transform": _referencias,
+    "sort": "Fecha",
+    "output": {
+        "Fecha": "fecha",
+        "importe_credito": "credito",
+        "importe_debito": "debito",
+        "referencia": "referencia",
+        "Info_detallada": "transaccion",
+    },
+}
+
+process = compile_schema(SCHEMA)
@@ -15,4 +15,24 @@ HANDLERS: Dict[str, Callable[[pd.DataFrame], pd.DataFrame]] = {
 
 def get_processor(bank: str) -> Callable[[pd.DataFrame], pd.DataFrame] | None:
     """Return the processor function for a given bank key."""
-    return HANDLERS.get(bank)   
\ No newline at end of file
+    return HANDLERS.get(bank)   
+
+
+def is_streamable(bank: str) -> bool:
+    """Return ``True`` if the processor for ``bank`` can run per chunk.
+
+    Processors whose schema sorts the whole statement by date need every
+    row at once.
+    """
+    schema = getattr(HANDLERS.get(bank), 'schema', {})
+    return not schema.get('sort')
+
+
+def read_options(bank: str) -> dict:
+    """Return the extra reader arguments for ``bank``.
+
+    Schema processors only read the columns they declare (``usecols``,
+    ``dtype``) and stop at the end of the statement (``footer``,
+    ``empty_rows``); without a processor the whole sheet is read.
+    """
+    return getattr(HANDLERS.get(bank), 'read_options', {})
@@ -0,0 +1,270 @@
+"""Declarative bank schemas compiled into column-level pipelines.
+
+A schema is a plain ``dict`` describing how a bank export maps to the
+common output shape::
+
+    SCHEMA = {
+        "name": "Banco AV Villas",
+        "columns": {                      # logical name -> column spec
+            "fecha": {"aliases": ["Fecha"]},
+            "debitos": {"aliases": ["Débitos"]},
+            "oficina": {"aliases": ["Desc. Oficina"], "required": False},
+        },
+        "date": {"column": "fecha", "format": "default"},
+        "amount_locale": "auto",          # for columns with "amount": True
+        "debit_credit": {"rule": "columns", "debit": "debitos", "credit": "creditos"},
+        "sort": "Fecha",                  # output column sorted by date
+        "output": {"Fecha": "fecha", "importe_debito": "debito", ...},
+    }
+
+Column specs accept ``aliases`` (tried in order), ``required`` (default
+``True``), ``label`` (name used in the missing-columns error),
+``missing_error`` (custom error message), ``ignore_case``, ``na_blank``
+(missing cells become ``""`` instead of ``"nan"``), ``remove`` (characters
+removed from the value), ``amount`` (parse the column into integer cents
+with the schema's ``amount_locale``; missing cells are ``0``) and ``dtype``
+(type the reader uses for the column instead of inferring one, e.g. ``"str"``
+for columns only used as text).  A schema level ``ignore_case`` sets the
+default for every column.
+
+The readers stop at the end of the statement: at a row whose first
+non-empty cell matches one of the ``footer`` patterns (default
+:data:`FOOTER`) or after ``empty_rows`` consecutive blank rows (default
+:data:`EMPTY_ROWS`, ``0`` disables it).
+
+Banks with behaviour that does not fit the declarative part can add a
+``transform(df, columns, values)`` hook, which may replace entries of
+``values`` in place, and an ``expand(result, values)`` hook returning the
+final DataFrame (e.g. to add extra rows).
+
+:func:`compile_schema` resolves everything that does not depend on the
+data once, at import time, and returns the ``process(df)`` function used
+by :mod:`api.banks.registry`.  ``process.read_options`` holds the reader
+arguments: the ``usecols``/``dtype`` that skip every column the schema does
+not declare and the ``footer``/``empty_rows`` end-of-data rules.
+"""
+
+from __future__ import annotations
+
+from typing import Callable
+
+import re
+
+import numpy as np
+import pandas as pd
+
+from common.amounts import COMMA, DOT, format_cents, parse_cents
+from common.dates import OUTPUT_FORMAT, format_dates, parse_dates
+
+from .utils import text, text_or_blank
+
+
+# Date styles: how ambiguous dates are read and what unparseable values
+# become ("" or the original text).  The format itself is detected per file
+# by :func:`common.dates.parse_dates`.
+DATE_FORMATS: dict[str, dict] = {
+    "default": {"dayfirst": False, "keep_invalid": False},
+    "dayfirst": {"dayfirst": True, "keep_invalid": False},
+    # ``YYYY/MM/DD`` exports; values that are not dates are kept as-is
+    "ymd_slash": {"dayfirst": True, "keep_invalid": True},
+    # ``YYYY-MM-DD[ time]`` exports
+    "iso": {"dayfirst": True, "keep_invalid": False},
+}
+
+
+# Decimal separator assumed for ambiguous amounts (``1.234``) when the
+# column does not settle it; see :mod:`common.amounts`.
+AMOUNT_LOCALES: dict[str, str] = {
+    "auto": DOT,
+    "comma_decimal": COMMA,
+}
+
+
+def amounts(df: pd.DataFrame, col: str | None, decimal: str) -> pd.Series:
+    """Return ``col`` in integer cents; missing cells are ``0``."""
+    if col is None or col not in df.columns:
+        return pd.Series(0, index=df.index, dtype="int64")
+    return parse_cents(df[col], default=decimal)
+
+
+def _resolver(schema: dict) -> Callable[[pd.DataFrame], dict[str, str | None]]:
+    """Return a function mapping logical names to the DataFrame columns."""
+    ignore_case = schema.get("ignore_case", False)
+    specs = schema["columns"]
+
+    def resolve(df: pd.DataFrame) -> dict[str, str | None]:
+        exact = {c: c for c in df.columns}
+        lowered = {c.lower(): c for c in df.columns}
+        columns: dict[str, str | None] = {}
+        missing = []
+        errors = []
+        for name, spec in specs.items():
+            found = None
+            fold = spec.get("ignore_case", ignore_case)
+            available = lowered if fold else exact
+            for alias in spec["aliases"]:
+                key = alias.lower() if fold else alias
+                if key in available:
+                    found = available[key]
+                    break
+            if found is None and spec.get("required", True):
+                if spec.get("missing_error"):
+                    errors.append(spec["missing_error"])
+                else:
+                    missing.append(spec.get("label", spec["aliases"][0]))
+            columns[name] = found
+        if missing:
+            raise ValueError(f"Columnas faltantes: {', '.join(sorted(missing))}")
+        if errors:
+            raise ValueError(errors[0])
+        return columns
+
+    return resolve
+
+
+# First cell of the rows that close a statement (totals, closing balance,
+# end-of-report notes).  Matched case-insensitively against the whole cell.
+FOOTER = [r"total(es)?\b.*", r"saldo final\b.*", r"fin del (extracto|informe|reporte)\b.*"]
+# Consecutive blank rows after which the rest of the sheet is ignored.
+EMPTY_ROWS = 50
+
+
+def _read_options(schema: dict) -> dict:
+    """Return the ``read_csv``/``read_excel`` arguments reading only the
+    columns of ``schema``."""
+    ignore_case = schema.get("ignore_case", False)
+    exact: set[str] = set()
+    folded: set[str] = set()
+    dtype: dict[str, str] = {}
+    for spec in schema["columns"].values():
+        fold = spec.get("ignore_case", ignore_case)
+        for alias in spec["aliases"]:
+            if fold:
+                folded.add(alias.lower())
+            else:
+                exact.add(alias)
+            if spec.get("dtype"):
+                dtype[alias] = spec["dtype"]
+
+    def usecols(name) -> bool:
+        # Headers are stripped before resolving, so match them stripped too
+        label = str(name).strip()
+        return label in exact or label.lower() in folded
+
+    footer = schema.get("footer", FOOTER)
+    return {
+        "usecols": usecols,
+        "dtype": dtype,
+        "footer": re.compile("|".join(footer), re.IGNORECASE) if footer else None,
+        "empty_rows": schema.get("empty_rows", EMPTY_ROWS),
+    }
+
+
+def _debit_credit(rule: dict) -> Callable[[dict], tuple]:
+    """Return a function computing the ``(credito, debito)`` columns."""
+    if rule["rule"] == "columns":
+        return lambda values: (values[rule["credit"]], values[rule["debit"]])
+
+    if rule["rule"] != "sign":
+        raise ValueError(f"Regla débito/crédito desconocida: {rule['rule']}")
+
+    amount = rule["amount"]
+    blank = rule.get("blank", "")
+    keyword_col = rule.get("keyword_column")
+    debit_words = rule.get("debit_keywords", ())
+    credit_words = rule.get("credit_keywords", ())
+
+    def contains_any(values: pd.Series, words) -> pd.Series:
+        mask = pd.Series(False, index=values.index)
+        for word in words:
+            mask |= values.str.contains(word, regex=False)
+        return mask
+
+    def split(values: dict) -> tuple:
+        importe = values[amount]
+        keywords = values[keyword_col].str.lower() if keyword_col else None
+        amount_str = format_cents(importe.abs()).where(importe != 0, blank)
+
+        is_debit = importe < 0
+        is_credit = importe > 0
+        if keywords is not None:
+            is_debit |= contains_any(keywords, debit_words)
+            is_credit |= contains_any(keywords, credit_words)
+        is_credit &= ~is_debit
+        return (
+            np.where(is_credit, amount_str, blank),
+            np.where(is_debit, amount_str, blank),
+        )
+
+    return split
+
+
+def _sort_by_date(result: pd.DataFrame, dates: pd.Series) -> pd.DataFrame:
+    # Sort transactions by date from earliest to latest
+    result.insert(0, "_sort_date", dates.dt.normalize().to_numpy())
+    result.sort_values("_sort_date", inplace=True)
+    result.drop(columns=["_sort_date"], inplace=True)
+    result.reset_index(drop=True, inplace=True)
+    return result
+
+
+def compile_schema(schema: dict) -> Callable[[pd.DataFrame], pd.DataFrame]:
+    """Compile ``schema`` into a ``process(df)`` function."""
+    resolve = _resolver(schema)
+    specs = schema["columns"]
+
+    date = schema.get("date")
+    date_style = DATE_FORMATS[date["format"]] if date else None
+
+    amount_decimal = AMOUNT_LOCALES[schema.get("amount_locale", "auto")]
+
+    split = None
+    if schema.get("debit_credit"):
+        split = _debit_credit(schema["debit_credit"])
+
+    transform = schema.get("transform")
+    expand = schema.get("expand")
+    sort = schema.get("sort")
+    output = list(schema["output"].items())
+    # Sorting can reuse the parsed dates when the sort column is the date
+    sort_on_dates = bool(date and sort and schema["output"].get(sort) == date["column"] and not expand)
+
+    def process(df: pd.DataFrame) -> pd.DataFrame:
+        df.columns = df.columns.str.strip()
+        columns = resolve(df)
+        df = df.reset_index(drop=True)
+
+        values: dict[str, pd.Series] = {}
+        for name, spec in specs.items():
+            col = columns[name]
+            if spec.get("amount"):
+                values[name] = amounts(df, col, amount_decimal)
+            elif spec.get("na_blank"):
+                values[name] = text_or_blank(df, col)
+            else:
+                values[name] = text(df, col)
+            if spec.get("remove"):
+                values[name] = values[name].str.replace(spec["remove"], "", regex=False).str.strip()
+
+        if transform:
+            transform(df, columns, values)
+        dates = None
+        if date:
+            raw = values[date["column"]]
+            dates = parse_dates(raw, dayfirst=date_style["dayfirst"])
+            values[date["column"]] = format_dates(dates, default=raw if date_style["keep_invalid"] else "")
+        if split:
+            values["credito"], values["debito"] = split(values)
+
+        result = pd.DataFrame({key: values[name] for key, name in output})
+        if expand:
+            result = expand(result, values)
+        if sort:
+            if not sort_on_dates:
+                dates = parse_dates(result[sort], fmt=OUTPUT_FORMAT, strict=True)
+            result = _sort_by_date(result, dates)
+        return result
+
+    process.schema = schema
+    process.read_options = _read_options(schema)
+    return process
@@ -0,0 +1,59 @@
+"""Column-level helpers shared by the bank processors."""
+
+from __future__ import annotations
+
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+
+
+def text(df: pd.DataFrame, col: str | None, default: str = "") -> pd.Series:
+    """Return ``str(value).strip()`` for every value of ``col``.
+
+    Missing values become ``"nan"`` exactly like ``str()`` does.  When
+    ``col`` is ``None`` or not present ``default`` is used for every row.
+    """
+    if col is None or col not in df.columns:
+        return pd.Series(default, index=df.index, dtype=object)
+    values = df[col]
+    if df.iloc[:0].to_numpy().dtype.kind == "f":
+        # ``iterrows()`` upcasts every value of an all-numeric frame to float.
+        values = values.astype(float)
+    return values.astype(object).map(str).str.strip()
+
+
+def is_number(values: pd.Series) -> pd.Series:
+    """Return a mask of the values that are ints or floats (not bools)."""
+    if values.dtype.kind in "iuf":
+        return pd.Series(True, index=values.index)
+    if values.dtype.kind != "O":
+        return pd.Series(False, index=values.index)
+    return values.map(
+        lambda v: isinstance(v, (int, float, np.integer, np.floating))
+        and not isinstance(v, bool)
+    ).astype(bool)
+
+
+def text_or_blank(df: pd.DataFrame, col: str | None) -> pd.Series:
+    """Like :func:`text` but missing values become an empty string."""
+    result = text(df, col)
+    if col is not None and col in df.columns:
+        result = result.mask(df[col].isna(), "")
+    return result
+
+
+def map_unique(series: pd.Series, func: Callable[[object], object]) -> pd.Series:
+    """Return ``series.map(func)`` calling ``func`` once per distinct value.
+
+    Statements repeat dates and amounts heavily, so the Python-level work
+    becomes proportional to the number of distinct values instead of rows.
+    """
+    codes, uniques = pd.factorize(series)
+    mapped = np.empty(len(uniques) + 1, dtype=object)
+    mapped[:-1] = [func(u) for u in uniques]
+    missing = codes == -1
+    if missing.any():
+        mapped[-1] = func(series[missing].iloc[0])
+    return pd.Series(mapped[codes], index=series.index, dtype=object)
+
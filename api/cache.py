@@ -0,0 +1,166 @@
+"""Result cache for synchronous Excel conversions.
+
+Conversions are keyed by the SHA-256 of the uploaded bytes plus the
+normalised conversion parameters, so re-uploads of an identical statement
+are answered from the cache.  Two tiers are used: an in-process LRU that
+holds the rendered JSON body and an on-disk tier of gzip files shared by
+every worker process on the machine.
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+# Bump when processor output changes so stale entries (and ETags) expire.
+CACHE_VERSION = '5'
+
+CACHE_ENABLED = os.getenv('EXCEL_CACHE_ENABLED', 'true').lower() == 'true'
+MEMORY_MAX_ENTRIES = int(os.getenv('EXCEL_CACHE_MEMORY_ENTRIES', '128'))
+MEMORY_MAX_BYTES = int(os.getenv('EXCEL_CACHE_MEMORY_BYTES', str(64 * 1024 * 1024)))
+DISK_DIR = os.getenv('EXCEL_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'excel_to_json_cache'))
+DISK_MAX_BYTES = int(os.getenv('EXCEL_CACHE_DISK_BYTES', str(1024 * 1024 * 1024)))
+
+
+def cache_key(file, params: dict) -> str:
+    """Return the cache key for the uploaded ``file`` and ``params``.
+
+    ``file`` is a Django ``UploadedFile``; it is read in chunks and rewound
+    so it can still be parsed afterwards.
+    """
+    digest = hashlib.sha256()
+    for chunk in file.chunks():
+        digest.update(chunk)
+    file.seek(0)
+    extra = json.dumps(params, sort_keys=True, default=str)
+    return hashlib.sha256(f'{CACHE_VERSION}|{digest.hexdigest()}|{extra}'.encode()).hexdigest()
+
+
+class ResultCache:
+    """Two-tier (memory LRU + gzip files on disk) cache of JSON bodies."""
+
+    def __init__(self, directory: str = DISK_DIR, max_entries: int = MEMORY_MAX_ENTRIES,
+                 max_bytes: int = MEMORY_MAX_BYTES, disk_max_bytes: int = DISK_MAX_BYTES) -> None:
+        self.directory = directory
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.disk_max_bytes = disk_max_bytes
+        self._memory: 'OrderedDict[str, bytes]' = OrderedDict()
+        self._memory_bytes = 0
+        self._disk_bytes: int | None = None  # estimate, rescanned when exceeded
+        self._lock = threading.Lock()
+        self._counters = {
+            'memory_hits': 0,
+            'disk_hits': 0,
+            'misses': 0,
+            'stores': 0,
+            'memory_evictions': 0,
+            'disk_evictions': 0,
+        }
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f'{key}.json.gz')
+
+    def get(self, key: str) -> bytes | None:
+        with self._lock:
+            body = self._memory.get(key)
+            if body is not None:
+                self._memory.move_to_end(key)
+                self._counters['memory_hits'] += 1
+                return body
+
+        path = self._path(key)
+        try:
+            with gzip.open(path, 'rb') as f:
+                body = f.read()
+            os.utime(path)  # mark as recently used for eviction
+        except (OSError, EOFError):
+            with self._lock:
+                self._counters['misses'] += 1
+            return None
+
+        with self._lock:
+            self._counters['disk_hits'] += 1
+            self._remember(key, body)
+        return body
+
+    def set(self, key: str, body: bytes) -> None:
+        with self._lock:
+            self._counters['stores'] += 1
+            self._remember(key, body)
+
+        path = self._path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+            with os.fdopen(fd, 'wb') as raw, gzip.GzipFile(fileobj=raw, mode='wb', compresslevel=5) as f:
+                f.write(body)
+            os.replace(tmp, path)
+            size = os.path.getsize(path)
+            with self._lock:
+                if self._disk_bytes is not None:
+                    self._disk_bytes += size
+                over = self._disk_bytes is None or self._disk_bytes > self.disk_max_bytes
+            if over:
+                self._evict_disk()
+        except OSError as e:
+            print(f">>> CACHE WRITE ERROR for {key}: {e}")
+
+    def _remember(self, key: str, body: bytes) -> None:
+        """Store ``body`` in the memory tier (lock must be held)."""
+        if len(body) > self.max_bytes:
+            return
+        old = self._memory.pop(key, None)
+        if old is not None:
+            self._memory_bytes -= len(old)
+        self._memory[key] = body
+        self._memory_bytes += len(body)
+        while len(self._memory) > self.max_entries or self._memory_bytes > self.max_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+            self._counters['memory_evictions'] += 1
+
+    def _evict_disk(self) -> None:
+        """Remove least recently used files until the disk tier fits."""
+        entries = []
+        total = 0
+        for shard in os.scandir(self.directory):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                if not entry.name.endswith('.json.gz'):
+                    continue
+                st = entry.stat()
+                entries.append((st.st_mtime, st.st_size, entry.path))
+                total += st.st_size
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.disk_max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+                with self._lock:
+                    self._counters['disk_evictions'] += 1
+            except OSError:
+                pass
+        with self._lock:
+            self._disk_bytes = total
+
+    def stats(self) -> dict:
+        with self._lock:
+            info = dict(self._counters)
+            info['memory_entries'] = len(self._memory)
+            info['memory_bytes'] = self._memory_bytes
+            info['disk_bytes'] = self._disk_bytes
+        lookups = info['memory_hits'] + info['disk_hits'] + info['misses']
+        info['hit_ratio'] = round((info['memory_hits'] + info['disk_hits']) / lookups, 4) if lookups else 0.0
+        return info
+
+
+result_cache = ResultCache()
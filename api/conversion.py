@@ -0,0 +1,548 @@
+"""Shared Excel/CSV conversion helpers used by the views and the worker."""
+
+from __future__ import annotations
+
+import csv
+import os
+import tempfile
+from contextlib import contextmanager
+from io import BytesIO
+from itertools import islice
+from typing import Callable, Iterable, Iterator
+
+import numpy as np
+import pandas as pd
+from pandas.io.parsers import TextParser
+
+from common.detection import MIN_CONFIDENCE, Detection
+
+from .banks.detect import detect_rows
+from .banks.registry import get_processor, is_streamable, read_options
+from .banks.utils import map_unique
+
+# Number of spreadsheet rows converted per chunk in streaming mode.
+CHUNK_ROWS = int(os.getenv('EXCEL_STREAM_CHUNK_ROWS', '5000'))
+# Rows read to look for the header when ``branch=auto``.
+DETECT_ROWS = int(os.getenv('BANK_DETECT_ROWS', '30'))
+DETECT_BYTES = 256 * 1024
+
+# Spreadsheet formats accepted by the endpoints and inside ZIP uploads.
+EXTENSIONS = ('.csv', '.xls', '.xlsx')
+
+AUTO_BRANCH = 'auto'
+# Banks whose records the ``convert/`` view returns under ``movimientos`` and
+# the webhook payload under ``data`` (the other way round for the rest).
+SCHEMA_BANKS = ('occidente', 'agrario', 'alianza', 'bbva', 'avvillas', 'itau')
+# ``worksheet=all`` converts every sheet of the workbook.
+ALL_SHEETS = 'all'
+
+
+def sheet_name(sheet):
+    """Return the ``sheet_name`` argument for ``sheet`` (first sheet if empty)."""
+    if sheet is None or str(sheet).strip() == '':
+        return 0
+    return int(sheet) if str(sheet).isdigit() else sheet
+
+
+def requested_sheets(sheet) -> list | None:
+    """Return the sheets of a multi-sheet request, ``None`` for a single sheet.
+
+    ``sheet`` is ``all``, a comma-separated list of names/indexes or a list
+    (the ``worksheet`` field repeated).
+    """
+    if isinstance(sheet, (list, tuple)):
+        names = [s for s in sheet if str(s).strip()]
+        return [sheet_name(s) for s in names] if len(names) > 1 else None
+    text = str(sheet or '').strip()
+    if text.lower() == ALL_SHEETS:
+        return [ALL_SHEETS]
+    if ',' in text:
+        return [sheet_name(s.strip()) for s in text.split(',') if s.strip()]
+    return None
+
+
+def open_source(source):
+    """Open ``source`` for reading: a spool file path or the file contents."""
+    return open(source, 'rb') if isinstance(source, str) else BytesIO(source)
+
+
+def workbook_sheets(data: bytes | str, ext: str, sheets: list) -> list:
+    """Return the sheets ``sheets`` stands for (every sheet name for ``all``).
+
+    Only the list of sheets is read: the cells (and the shared strings of
+    ``.xlsx`` files) are left to the children converting the sheets.
+    """
+    if ext == '.csv':
+        raise ValueError('Los archivos CSV no tienen hojas; no use worksheet=all ni una lista de hojas')
+    if sheets != [ALL_SHEETS]:
+        return sheets
+    if ext == '.xls':
+        import xlrd
+
+        kwargs = {'filename': data} if isinstance(data, str) else {'file_contents': data}
+        book = xlrd.open_workbook(on_demand=True, **kwargs)
+        try:
+            return book.sheet_names()
+        finally:
+            book.release_resources()
+    from openpyxl.reader.excel import ExcelReader
+
+    with open_source(data) as f:
+        reader = ExcelReader(f, read_only=True)
+        try:
+            reader.read_manifest()
+            reader.read_workbook()
+            # Worksheets only, as ``pd.ExcelFile.sheet_names``
+            return [sheet.name for sheet, rel in reader.parser.find_sheets() if 'chartsheet' not in rel.Type]
+        finally:
+            reader.archive.close()
+
+
+def open_book(source, ext: str) -> pd.ExcelFile:
+    """Open the workbook ``source`` (a path or a file) once for several sheets.
+
+    ``.xls`` sheets are then only parsed when they are read.
+    """
+    if ext == '.xls':
+        return pd.ExcelFile(source, engine='xlrd', engine_kwargs={'on_demand': True})
+    return pd.ExcelFile(source, engine='openpyxl')
+
+
+def read_file(file, ext, sheet, header, skip, footer=None, empty_rows=0,
+              **options) -> pd.DataFrame:
+    """Read the whole upload into a single DataFrame.
+
+    ``options`` are extra reader arguments such as the ``usecols``/``dtype``
+    of :func:`api.banks.registry.read_options`.  With a ``footer`` pattern
+    or ``empty_rows`` the data ends at the first footer row or run of blank
+    rows (see :func:`_until_end`), looking at whole rows before ``usecols``
+    is applied; ``.xlsx`` sheets are then read row by row and nothing after
+    that point is parsed.
+    """
+    if ext == '.xlsx' and (footer is not None or empty_rows):
+        frames = list(_iter_xlsx(file, sheet, header, skip, None, footer, empty_rows, **options))
+        return frames[0] if frames else pd.DataFrame()
+    options, usecols = _split_usecols(options, footer, empty_rows)
+    if ext == '.csv':
+        df = pd.read_csv(file, header=header, skiprows=skip, **options)
+    else:
+        df = pd.read_excel(
+            file,
+            sheet_name=sheet_name(sheet),
+            header=header,
+            skiprows=skip,
+            engine='xlrd' if ext == '.xls' else 'openpyxl',
+            **options,
+        )
+    return _select(_trim(df, footer, empty_rows), usecols)
+
+
+def read_head(file, ext, sheet, rows: int = DETECT_ROWS) -> list[list]:
+    """Return the first ``rows`` rows of the upload as raw cell lists.
+
+    Row numbers match the ``header_row`` parameter: blank lines are skipped
+    in CSV files (as ``pd.read_csv`` does) and kept in spreadsheets.  The
+    file is rewound afterwards; ``file`` may also be an opened
+    :class:`pandas.ExcelFile` (see :func:`open_book`).
+    """
+    if isinstance(file, pd.ExcelFile):
+        df = pd.read_excel(file, sheet_name=sheet_name(sheet), header=None, nrows=rows)
+        return df.astype(object).where(df.notna(), None).values.tolist()
+    try:
+        if ext == '.csv':
+            head = file.read(DETECT_BYTES)
+            lines = head.decode('utf-8', errors='replace').splitlines()
+            if len(head) == DETECT_BYTES:
+                lines = lines[:-1]  # probably cut in the middle
+            return list(islice((r for r in csv.reader(lines) if r), rows))
+        engine = 'xlrd' if ext == '.xls' else 'openpyxl'
+        df = pd.read_excel(file, sheet_name=sheet_name(sheet), header=None, nrows=rows, engine=engine)
+        return df.astype(object).where(df.notna(), None).values.tolist()
+    finally:
+        file.seek(0)
+
+
+def resolve_branch(file, ext, sheet, branch: str,
+                   header: int | None) -> tuple[str, int, Detection | None]:
+    """Return ``(branch, header_row, detection)`` for the request.
+
+    With ``branch=auto`` the bank (and, unless ``header`` is given, the
+    header row) is detected from the first rows of the file; a file no bank
+    matches with enough confidence raises ``ValueError``.
+    """
+    if branch != AUTO_BRANCH:
+        return branch, header or 0, None
+    detection = detect_rows(read_head(file, ext, sheet))
+    if detection is None or detection.confidence < MIN_CONFIDENCE:
+        candidates = detection.candidates if detection else {}
+        raise ValueError(f"No se pudo identificar el banco del archivo (candidatos: {candidates})")
+    return detection.bank, detection.header_row if header is None else header, detection
+
+
+def _convert_cell(value):
+    """Mirror the cell conversion pandas applies to openpyxl values."""
+    if value is None:
+        return ''
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def _is_footer(value, footer) -> bool:
+    return isinstance(value, str) and footer.fullmatch(value.strip()) is not None
+
+
+def _until_end(rows: Iterable[list], footer, empty_rows: int) -> Iterator[list]:
+    """Yield ``rows`` up to the end of the statement.
+
+    The data ends at a row whose first non-empty cell matches ``footer`` or
+    after ``empty_rows`` consecutive blank rows.  Blank rows are held back
+    until more data follows, so the blank run closing the data is dropped
+    too (trailing blank rows are dropped anyway, as ``pd.read_excel`` does).
+    """
+    blank = []
+    for row in rows:
+        first = next((v for v in row if v != ''), None)
+        if first is None:
+            blank.append(row)
+            if empty_rows and len(blank) >= empty_rows:
+                return
+            continue
+        if footer is not None and _is_footer(first, footer):
+            return
+        yield from blank
+        blank = []
+        yield row
+
+
+def _end_of_data(df: pd.DataFrame, footer, empty_rows: int,
+                 blank_run: int = 0) -> tuple[int | None, int]:
+    """Return ``(stop, blank_run)`` for a parsed chunk.
+
+    ``stop`` is the position where the data ends as in :func:`_until_end`
+    (``None`` if it goes on) and ``blank_run`` the number of blank rows the
+    chunk ends with, carried over from the previous chunk.
+    """
+    n = len(df)
+    blank = df.isna().all(axis=1).to_numpy()
+    pos = np.arange(n)
+    last = np.maximum.accumulate(np.where(blank, -1, pos)) if n else pos
+    run = np.where(blank, pos - last + np.where(last < 0, blank_run, 0), 0)
+
+    stops = []
+    if footer is not None:
+        seen = np.zeros(n, dtype=bool)
+        hits = np.zeros(n, dtype=bool)
+        for _, values in df.items():
+            if values.dtype.kind == 'O':
+                hits |= ~seen & map_unique(values, lambda v: _is_footer(v, footer)).to_numpy(dtype=bool)
+            seen |= values.notna().to_numpy()
+        if hits.any():
+            at = int(np.argmax(hits))
+            stops.append(at - (run[at - 1] if at else 0))
+    if empty_rows:
+        full = np.flatnonzero(run >= empty_rows)
+        if len(full):
+            stops.append(full[0] - run[full[0]] + 1)
+    if stops:
+        return max(int(min(stops)), 0), 0
+    return None, int(run[-1]) if n else blank_run
+
+
+def _trim(df: pd.DataFrame, footer, empty_rows: int) -> pd.DataFrame:
+    """Return ``df`` without the rows after the end of the statement."""
+    if footer is None and not empty_rows:
+        return df
+    stop, _ = _end_of_data(df, footer, empty_rows)
+    return df if stop is None else df.iloc[:stop]
+
+
+def _split_usecols(options: dict, footer, empty_rows: int) -> tuple[dict, object]:
+    """Return ``(options, usecols)`` for reading whole rows.
+
+    The end-of-data rules look at every cell of a row, as :func:`_until_end`
+    does for ``.xlsx`` sheets, so with a ``footer`` or ``empty_rows`` the
+    ``usecols`` option is taken out of the reader options and applied to the
+    trimmed frames by :func:`_select` instead.
+    """
+    if 'usecols' not in options or (footer is None and not empty_rows):
+        return options, None
+    options = dict(options)
+    return options, options.pop('usecols')
+
+
+def _select(df: pd.DataFrame, usecols) -> pd.DataFrame:
+    """Return the columns of ``df`` the reader option ``usecols`` selects."""
+    if usecols is None:
+        return df
+    if callable(usecols):
+        return df.loc[:, [bool(usecols(c)) for c in df.columns]]
+    if all(isinstance(c, int) for c in usecols):
+        return df.iloc[:, sorted(usecols)]
+    return df.loc[:, [c in usecols for c in df.columns]]
+
+
+def _frames_until_end(frames: Iterable[pd.DataFrame], footer,
+                      empty_rows: int) -> Iterator[pd.DataFrame]:
+    """Yield the chunks ``frames`` up to the end of the statement.
+
+    Like :func:`_until_end`, the blank rows a chunk ends with are held back
+    until more data follows.
+    """
+    if footer is None and not empty_rows:
+        yield from frames
+        return
+    blank_run = 0
+    pending = None
+    for df in frames:
+        stop, blank_run = _end_of_data(df, footer, empty_rows, blank_run)
+        if stop is not None:
+            df = df.iloc[:stop]
+        tail = min(blank_run, len(df))
+        body = df.iloc[:len(df) - tail]
+        if len(body):
+            if pending is not None:
+                yield pending
+                pending = None
+            yield body
+        if stop is not None:
+            return
+        if tail:
+            rows = df.iloc[len(df) - tail:]
+            pending = rows if pending is None else pd.concat([pending, rows])
+    if pending is not None:
+        yield pending
+
+
+def _frames_from_rows(rows: Iterable[tuple], header: int, skip: int | None,
+                      chunk_rows: int | None, footer=None, empty_rows: int = 0,
+                      **options) -> Iterator[pd.DataFrame]:
+    """Yield DataFrames of ``chunk_rows`` rows parsed like ``pd.read_excel``.
+
+    The first chunk is parsed together with the header so column naming
+    (``Unnamed: n``, de-duplicated labels) matches pandas exactly; later
+    chunks reuse those column names.  ``options`` (``usecols``, ``dtype``)
+    are applied to every chunk and the rows after the header stop at the
+    end of the statement (see :func:`_until_end`).  ``chunk_rows=None``
+    yields a single frame.
+    """
+    rows = iter(rows)
+    if skip:
+        rows = islice(rows, skip, None)
+    head = [list(r) for r in islice(rows, header + 1)]
+    if len(head) <= header:
+        return
+    if footer is not None or empty_rows:
+        rows = _until_end(rows, footer, empty_rows)
+
+    columns = None
+    width = 0
+    while True:
+        batch = [list(r) for r in islice(rows, chunk_rows)]
+        if columns is None:
+            width = max(len(r) for r in head + batch)
+            block = [r + [''] * (width - len(r)) for r in head + batch]
+            df = TextParser(block, header=header, **options).read()
+            columns = list(df.columns)
+            if options:
+                # Later chunks need every column name, not only the selected ones
+                columns = list(TextParser(block[:header + 1], header=header).read().columns)
+        else:
+            if not batch:
+                break
+            block = [(r + [''] * (width - len(r)))[:width] for r in batch]
+            df = TextParser(block, header=None, names=columns, **options).read()
+        yield df
+        if chunk_rows is None or len(batch) < chunk_rows:
+            break
+
+
+def _iter_xlsx(file, sheet, header, skip, chunk_rows, footer=None, empty_rows=0,
+               **options) -> Iterator[pd.DataFrame]:
+    import openpyxl
+
+    # An opened ``pd.ExcelFile`` keeps its (read-only) workbook for the next sheets
+    shared = isinstance(file, pd.ExcelFile)
+    wb = file.book if shared else openpyxl.load_workbook(file, read_only=True, data_only=True)
+    try:
+        name = sheet_name(sheet)
+        ws = wb.worksheets[name] if isinstance(name, int) else wb[name]
+        rows = (tuple(_convert_cell(v) for v in r) for r in ws.iter_rows(values_only=True))
+        yield from _frames_from_rows(rows, header, skip, chunk_rows, footer, empty_rows, **options)
+    finally:
+        if not shared:
+            wb.close()
+
+
+def iter_frames(file, ext, sheet, header, skip, chunk_rows: int = CHUNK_ROWS,
+                footer=None, empty_rows=0, **options) -> Iterator[pd.DataFrame]:
+    """Yield the upload as consecutive DataFrame chunks.
+
+    ``.xlsx`` files are read with openpyxl in read-only mode and CSV files
+    with pandas' chunked reader, so only one chunk is held in memory at a
+    time.  ``.xls`` files have no row-streaming reader and are loaded whole
+    and then sliced.  ``options`` and the end-of-data rules are applied as
+    in :func:`read_file`; reading stops at the end of the statement.
+    """
+    if ext == '.csv':
+        options, usecols = _split_usecols(options, footer, empty_rows)
+        with pd.read_csv(file, header=header, skiprows=skip, chunksize=chunk_rows, **options) as reader:
+            for df in _frames_until_end(reader, footer, empty_rows):
+                yield _select(df, usecols)
+    elif ext == '.xlsx':
+        yield from _iter_xlsx(file, sheet, header, skip, chunk_rows, footer, empty_rows, **options)
+    else:
+        df = read_file(file, ext, sheet, header, skip, footer, empty_rows, **options)
+        for start in range(0, max(len(df), 1), chunk_rows):
+            yield df.iloc[start:start + chunk_rows]
+
+
+def convert_frame(df: pd.DataFrame, processor: Callable[[pd.DataFrame], pd.DataFrame] | None,
+                  remove_unnamed: bool) -> pd.DataFrame:
+    """Apply the bank processor and the common clean-up to ``df``."""
+    if processor:
+        df = processor(df)
+
+    if remove_unnamed:
+        df = df.loc[:, ~df.columns.astype(str).str.contains(r'^Unnamed')]
+    df = df.dropna(how='all')
+    df = df.fillna('')
+    return df.astype(str)
+
+
+def iter_converted(frames: Iterable[pd.DataFrame], branch: str,
+                   remove_unnamed: bool) -> Iterator[pd.DataFrame]:
+    """Convert ``frames`` chunk by chunk with the processor for ``branch``.
+
+    Processors that reorder rows across the whole statement (see
+    :func:`api.banks.registry.is_streamable`) receive all chunks at once.
+    """
+    processor = get_processor(branch)
+    if processor and not is_streamable(branch):
+        frames = list(frames)
+        frames = [pd.concat(frames, ignore_index=True)] if frames else []
+    for df in frames:
+        yield convert_frame(df, processor, remove_unnamed)
+
+
+def build_payload(file_name: str, data: bytes | str, params: dict) -> dict:
+    """Parse an uploaded file and return the webhook payload.
+
+    Runs inside the worker processes of :mod:`api.tasks`, so it only takes
+    and returns picklable values; ``data`` is the file contents or the path
+    of its spool file (see :func:`open_source`).
+    """
+    base = os.path.basename(file_name)
+    with open_source(data) as f:
+        return _payload(base, f, params)
+
+
+def _payload(base: str, file, params: dict) -> dict:
+    """Return the :func:`build_payload` result for ``file``, an open file or
+    :class:`pandas.ExcelFile`."""
+    ext = os.path.splitext(base)[1].lower()
+
+    branch = str(params.get('branch', '')).lower()
+    sheet = params.get('worksheet')
+    header = int(params['header_row']) if str(params.get('header_row', '')).isdigit() else None
+    skip = int(params.get('skip_rows')) if str(params.get('skip_rows', '')).isdigit() else None
+    remove_unnamed = str(params.get('remove_unnamed', 'true')).lower() == 'true'
+
+    branch, header, detection = resolve_branch(file, ext, sheet, branch, header)
+    df = read_file(file, ext, sheet, header, skip, **read_options(branch))
+
+    df = convert_frame(df, get_processor(branch), remove_unnamed)
+
+    records = df.to_dict(orient='records')
+    key = 'data' if branch in SCHEMA_BANKS else 'movimientos'
+
+    payload = {
+        'bank_key': branch,
+        'file_name': base,
+        'params': params,
+        key: records,
+    }
+    if detection:
+        payload['detection'] = detection.as_dict()
+    return payload
+
+
+def convert_sheets(file_name: str, path: str, params: dict, sheets: list, view: bool = False) -> list[dict]:
+    """Return the :func:`build_payload` result of each of ``sheets``, without
+    the file fields.
+
+    The workbook at ``path`` is opened once for all of them; a sheet that
+    fails gets ``{'error': ...}``.  With ``view`` the records are returned
+    as the ``convert/`` view does for a single sheet:
+    ``{'movimientos' | 'data': records}``.
+    """
+    base = os.path.basename(file_name)
+    results = []
+    with open_book(path, os.path.splitext(base)[1].lower()) as book:
+        for sheet in sheets:
+            try:
+                payload = _payload(base, book, {**params, 'worksheet': sheet})
+            except Exception as e:
+                results.append({'error': str(e)})
+                continue
+            if view:
+                records = payload['data'] if 'data' in payload else payload['movimientos']
+                results.append({'movimientos' if payload['bank_key'] in SCHEMA_BANKS else 'data': records})
+            else:
+                del payload['file_name'], payload['params']
+                results.append(payload)
+    return results
+
+
+def build_sheets_payload(file_name: str, data: bytes | str, params: dict, sheets: list,
+                         pool, timeout: float | None = None, view: bool = False) -> dict:
+    """Convert several sheets concurrently and return the webhook payload.
+
+    The sheets are split in up to ``pool.size`` groups and each group is
+    converted by :func:`convert_sheets` in a child of ``pool`` (an
+    :class:`api.pool.SlotPool`), which opens the workbook once; sheets use
+    the bank processor (or ``branch=auto`` detection) independently.  The
+    children read the file from its path: ``data`` is the spool file path
+    or the contents, written once to a temporary file.  ``timeout`` applies
+    per sheet.  Results are keyed by sheet name; a sheet that fails gets
+    ``{'error': ...}`` instead of failing the whole workbook.  Errors
+    listing the sheets are raised (``ValueError`` for CSV files).  ``view``
+    selects the sheet layout of the ``convert/`` response (see
+    :func:`convert_sheets`).
+    """
+    base = os.path.basename(file_name)
+    ext = os.path.splitext(base)[1].lower()
+    names = workbook_sheets(data, ext, sheets)
+
+    # Sheets per child, so at most ``pool.size`` children open the workbook
+    size = max(-(-len(names) // pool.size), 1)
+    groups = [names[i:i + size] for i in range(0, len(names), size)]
+    results = {}
+    with _source_path(data, ext) as path:
+        futures = pool.map(convert_sheets, [(base, path, params, group, view) for group in groups],
+                           timeout=timeout and timeout * size)
+        for group, future in zip(groups, futures):
+            error = future.exception()
+            converted = [{'error': str(error)}] * len(group) if error else future.result()
+            results.update((str(name), result) for name, result in zip(group, converted))
+    return {
+        'bank_key': str(params.get('branch', '')).lower(),
+        'file_name': base,
+        'params': params,
+        'sheets': results,
+    }
+
+
+@contextmanager
+def _source_path(data: bytes | str, ext: str) -> Iterator[str]:
+    """Yield a path to ``data``: the spool file path itself, or a temporary
+    copy of the contents removed afterwards."""
+    if isinstance(data, str):
+        yield data
+        return
+    with tempfile.NamedTemporaryFile(suffix=ext, delete=False) as tmp:
+        tmp.write(data)
+    try:
+        yield tmp.name
+    finally:
+        os.unlink(tmp.name)
@@ -0,0 +1,153 @@
+"""Worker processes used to run CPU-bound conversions outside the GIL.
+
+Each :class:`ProcessSlot` owns one child process connected through a pipe.
+The parent thread that drives a slot sends a picklable function and its
+arguments, waits for the result with a timeout and kills the child when
+the job runs too long, so one pathological workbook only blocks its own
+slot until the timeout expires.  Children are recycled after
+``max_tasks`` jobs to return memory fragmented by pandas to the OS.
+:class:`SlotPool` shares a fixed set of slots between threads, e.g. to
+convert the sheets of one workbook concurrently.
+
+This module must stay free of import side effects: with the ``spawn``
+start method it is imported again in every child.
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+import queue
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+
+class JobTimeout(Exception):
+    """Raised when a job exceeds the per-job timeout."""
+
+
+def _child_main(conn, max_tasks: int) -> None:
+    done = 0
+    while not max_tasks or done < max_tasks:
+        try:
+            func, args = conn.recv()
+        except (EOFError, OSError):
+            return
+        try:
+            conn.send((True, func(*args)))
+        except BaseException as e:
+            try:
+                conn.send((False, e))
+            except Exception:
+                # The exception itself could not be pickled
+                conn.send((False, RuntimeError(f"{type(e).__name__}: {e}")))
+        done += 1
+
+
+class ProcessSlot:
+    """A single, lazily started and recyclable worker process."""
+
+    def __init__(self, max_tasks: int = 0, start_method: str = 'spawn') -> None:
+        self.max_tasks = max_tasks
+        self._ctx = multiprocessing.get_context(start_method)
+        self._process = None
+        self._conn = None
+        self._tasks = 0
+
+    @property
+    def alive(self) -> bool:
+        return self._process is not None and self._process.is_alive()
+
+    def _start(self) -> None:
+        parent, child = self._ctx.Pipe()
+        process = self._ctx.Process(
+            target=_child_main, args=(child, self.max_tasks), daemon=True
+        )
+        try:
+            process.start()
+        finally:
+            child.close()
+        self._process = process
+        self._conn = parent
+        self._tasks = 0
+
+    def stop(self) -> None:
+        """Terminate the child process (if any)."""
+        if self._process is None:
+            return
+        if self._process.is_alive():
+            self._process.terminate()
+        self._process.join(5)
+        self._conn.close()
+        self._process = None
+        self._conn = None
+
+    def run(self, func, *args, timeout: float | None = None):
+        """Run ``func(*args)`` in the child and return its result.
+
+        Exceptions raised by ``func`` are re-raised here.  If no result
+        arrives within ``timeout`` seconds the child is killed and
+        :class:`JobTimeout` is raised; the next job starts a fresh child.
+        """
+        if not self.alive or (self.max_tasks and self._tasks >= self.max_tasks):
+            self.stop()
+            self._start()
+        self._tasks += 1
+        self._conn.send((func, args))
+
+        if not self._conn.poll(timeout):
+            self.stop()
+            raise JobTimeout(f"El trabajo superó el tiempo límite de {timeout}s")
+        try:
+            ok, value = self._conn.recv()
+        except EOFError:
+            self.stop()
+            raise RuntimeError("El proceso de trabajo terminó inesperadamente")
+        if ok:
+            return value
+        raise value
+
+
+class SlotPool:
+    """A fixed number of :class:`ProcessSlot` shared by the calling threads."""
+
+    def __init__(self, size: int, max_tasks: int = 0, start_method: str = 'spawn') -> None:
+        self.size = max(size, 1)
+        self._slots = []
+        # LIFO: the most recently used (already started) child is reused first
+        self._free: queue.LifoQueue[ProcessSlot] = queue.LifoQueue()
+        for _ in range(self.size):
+            slot = ProcessSlot(max_tasks, start_method)
+            self._slots.append(slot)
+            self._free.put(slot)
+        self._executor: ThreadPoolExecutor | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def alive(self) -> int:
+        return sum(slot.alive for slot in self._slots)
+
+    def run(self, func, *args, timeout: float | None = None):
+        """Run ``func(*args)`` in the first free slot (see :meth:`ProcessSlot.run`)."""
+        slot = self._free.get()
+        try:
+            return slot.run(func, *args, timeout=timeout)
+        finally:
+            self._free.put(slot)
+
+    def submit(self, func, *args, timeout: float | None = None) -> Future:
+        """Run ``func(*args)`` in the next free slot without waiting for it."""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.size, thread_name_prefix='slot-pool')
+        return self._executor.submit(self.run, func, *args, timeout=timeout)
+
+    def map(self, func, arglist: list[tuple], timeout: float | None = None) -> list[Future]:
+        """Run ``func`` once per argument tuple, concurrently, and wait for all.
+
+        Returns the finished futures in the order of ``arglist``; a failure
+        only affects its own future.
+        """
+        if not arglist:
+            return []
+        with ThreadPoolExecutor(max_workers=min(self.size, len(arglist))) as threads:
+            return [threads.submit(self.run, func, *args, timeout=timeout) for args in arglist]
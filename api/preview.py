@@ -0,0 +1,148 @@
+"""Sheet names, dimensions and first rows of an upload, without converting it.
+
+Used to choose the sheet and header row before calling ``convert/``.
+``.xlsx`` workbooks are opened read-only: every sheet is read only up to
+the preview rows and its dimensions come from the sheet's ``<dimension>``
+element (``None`` when the file has none).  ``.xls`` sheets are loaded one
+at a time by xlrd, and a CSV file is a single sheet whose lines are counted
+without parsing them.
+"""
+
+from __future__ import annotations
+
+import datetime
+import math
+import os
+
+from common.detection import MIN_CONFIDENCE
+
+from .banks.detect import detect_rows
+from .conversion import read_head, sheet_name
+
+# Rows returned per sheet unless the request asks for another number.
+PREVIEW_ROWS = int(os.getenv('EXCEL_PREVIEW_ROWS', '20'))
+MAX_PREVIEW_ROWS = 200
+
+
+def _cell(value):
+    """Return ``value`` as a JSON-friendly cell."""
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    return value
+
+
+def suggest_header(rows: list[list]) -> dict:
+    """Return the likely ``header_row`` of ``rows`` and the bank it belongs to.
+
+    A bank header (see :func:`api.banks.detect.detect_rows`) wins; otherwise
+    the first row with the most text cells is suggested.
+    """
+    detection = detect_rows(rows)
+    if detection is not None and detection.confidence >= MIN_CONFIDENCE:
+        return {
+            'header_row': detection.header_row,
+            'bank': detection.bank,
+            'confidence': detection.confidence,
+        }
+    labels = [sum(isinstance(v, str) and v.strip() != '' for v in row) for row in rows]
+    best = max(labels, default=0)
+    return {'header_row': labels.index(best) if best >= 2 else 0, 'bank': None, 'confidence': None}
+
+
+def _selected(names: list[str], sheet) -> list[int]:
+    """Return the indexes of the sheets to preview (all when ``sheet`` is empty)."""
+    if sheet is None or str(sheet).strip() == '':
+        return list(range(len(names)))
+    wanted = sheet_name(sheet)
+    if isinstance(wanted, int):
+        if wanted >= len(names):
+            raise ValueError(f'La hoja {wanted} no existe')
+        return [wanted]
+    if wanted not in names:
+        raise ValueError(f'La hoja "{wanted}" no existe')
+    return [names.index(wanted)]
+
+
+def _xlsx_sheets(file, rows: int, sheet):
+    import openpyxl
+
+    wb = openpyxl.load_workbook(file, read_only=True, data_only=True)
+    try:
+        for index in _selected(wb.sheetnames, sheet):
+            ws = wb.worksheets[index]
+            head = [list(r) for r in ws.iter_rows(max_row=rows, values_only=True)] if rows else []
+            yield index, ws.title, ws.max_row, ws.max_column, head
+    finally:
+        wb.close()
+
+
+def _xls_sheets(file, rows: int, sheet):
+    import xlrd
+
+    book = xlrd.open_workbook(file_contents=file.read(), on_demand=True)
+    try:
+        for index in _selected(book.sheet_names(), sheet):
+            sh = book.sheet_by_index(index)
+            head = [[_xls_value(book, c) for c in sh.row(r)] for r in range(min(rows, sh.nrows))]
+            yield index, sh.name, sh.nrows, sh.ncols, head
+            book.unload_sheet(index)
+    finally:
+        book.release_resources()
+
+
+def _xls_value(book, cell):
+    import xlrd
+
+    if cell.ctype in (xlrd.XL_CELL_EMPTY, xlrd.XL_CELL_BLANK, xlrd.XL_CELL_ERROR):
+        return None
+    if cell.ctype == xlrd.XL_CELL_DATE:
+        return xlrd.xldate_as_datetime(cell.value, book.datemode)
+    if cell.ctype == xlrd.XL_CELL_BOOLEAN:
+        return bool(cell.value)
+    if cell.ctype == xlrd.XL_CELL_NUMBER and cell.value.is_integer():
+        return int(cell.value)
+    return cell.value
+
+
+def _csv_sheets(file, rows: int):
+    head = read_head(file, '.csv', None, rows) if rows else []
+    lines = 0
+    last = b'\n'
+    for block in iter(lambda: file.read(1024 * 1024), b''):
+        lines += block.count(b'\n')
+        last = block[-1:]
+    file.seek(0)
+    if last != b'\n':
+        lines += 1
+    name = os.path.splitext(os.path.basename(getattr(file, 'name', None) or 'csv'))[0]
+    yield 0, name, lines, max((len(r) for r in head), default=0), head
+
+
+def preview(file, ext: str, rows: int = PREVIEW_ROWS, sheet=None) -> list[dict]:
+    """Return one entry per sheet: name, dimensions, first ``rows`` rows and
+    the suggested ``header_row`` (and bank, if one is recognised).
+
+    ``sheet`` limits the preview to one sheet (name or index).  Raises
+    ``ValueError`` for unknown sheets.
+    """
+    rows = max(0, min(rows, MAX_PREVIEW_ROWS))
+    if ext == '.csv':
+        sheets = _csv_sheets(file, rows)
+    elif ext == '.xls':
+        sheets = _xls_sheets(file, rows, sheet)
+    else:
+        sheets = _xlsx_sheets(file, rows, sheet)
+
+    result = []
+    for index, name, nrows, ncols, head in sheets:
+        result.append({
+            'index': index,
+            'name': name,
+            'rows': nrows,
+            'columns': ncols,
+            'preview': [[_cell(v) for v in row] for row in head],
+            **suggest_header(head),
+        })
+    return result
@@ -1,123 +1,166 @@
 import threading
-import queue
 import os
-import time
-from io import BytesIO
-import requests
-import pandas as pd
 
-from .banks.registry import get_processor
-
-WEBHOOK_URL = "https://automatizacion.commerk.com:4444/webhook/8dafec2e-f35a-4c3c-bcae-2a395effe7e6"
-MAX_RETRIES = 3
+from django.db import close_old_connections
 
+from jobs.delivery import deliver, encode
+from jobs.dispatcher import dispatcher
+from jobs.models import Job
+from jobs.queues import JobQueue
+from jobs.retry import NO_RETRY
 
-def _read_file(file, ext, sheet, header, skip):
-    if ext == '.csv':
-        return pd.read_csv(file, header=header, skiprows=skip)
-    engine = 'openpyxl'
-    if ext == '.xls':
-        engine = 'xlrd'
-    return pd.read_excel(
-        file,
-        sheet_name=(int(sheet) if sheet and str(sheet).isdigit() else sheet),
-        header=header,
-        skiprows=skip,
-        engine=engine,
-    )
+from .conversion import EXTENSIONS, build_payload, build_sheets_payload, requested_sheets
+from .pool import JobTimeout, ProcessSlot, SlotPool
 
+WEBHOOK_URL = "https://automatizacion.commerk.com:4444/webhook/8dafec2e-f35a-4c3c-bcae-2a395effe7e6"
 
-def process_and_send(file_name: str, data: bytes, params: dict) -> None:
-    """Parse the Excel file and send the JSON payload to the webhook."""
-    base = os.path.basename(file_name)
-    ext = os.path.splitext(base)[1].lower()
-
-    branch = str(params.get('branch', '')).lower()
-    sheet = params.get('worksheet')
-    header = int(params.get('header_row', 0)) if str(params.get('header_row', '0')).isdigit() else 0
-    skip = int(params.get('skip_rows')) if str(params.get('skip_rows', '')).isdigit() else None
-    remove_unnamed = str(params.get('remove_unnamed', 'true')).lower() == 'true'
-
-    with BytesIO(data) as f:
-        df = _read_file(f, ext, sheet, header, skip)
+# Worker processes parsing uploads in parallel (one worker thread each).
+POOL_SIZE = int(os.getenv('EXCEL_WORKER_PROCESSES', str(os.cpu_count() or 1)))
+# Jobs handled by a child before it is replaced (0 = never recycle).
+MAX_TASKS_PER_CHILD = int(os.getenv('EXCEL_WORKER_MAX_TASKS_PER_CHILD', '50'))
+# Seconds a single parse may take before its child process is killed.
+JOB_TIMEOUT = float(os.getenv('EXCEL_WORKER_JOB_TIMEOUT', '300'))
+START_METHOD = os.getenv('EXCEL_WORKER_START_METHOD', 'spawn')
+# Limits of the unfinished Excel jobs (0 = no limit); past them uploads are
+# refused with 429 and a Retry-After.
+QUEUE_MAX_JOBS = int(os.getenv('EXCEL_QUEUE_MAX_JOBS', '1000'))
+QUEUE_MAX_BYTES = int(os.getenv('EXCEL_QUEUE_MAX_MB', '2048')) * 1024 * 1024
+# Worker processes converting the sheets of ``worksheet=all`` / multi-sheet
+# requests concurrently (shared by the views and the upload worker).
+SHEET_PROCESSES = int(os.getenv('EXCEL_SHEET_PROCESSES', str(os.cpu_count() or 1)))
 
-    processor = get_processor(branch)
-    if processor:
-        df = processor(df)
+sheet_pool = SlotPool(SHEET_PROCESSES, MAX_TASKS_PER_CHILD, START_METHOD)
 
-    if remove_unnamed:
-        df = df.loc[:, ~df.columns.str.contains(r'^Unnamed')]
-    df.dropna(how='all', inplace=True)
-    df.fillna('', inplace=True)
-    df = df.astype(str)
 
-    records = df.to_dict(orient='records')
-    key = 'data' if branch in ('occidente', 'agrario', 'alianza', 'bbva', 'avvillas', 'itau') else 'movimientos'
+def send_payload(payload: dict) -> None:
+    """Send a payload produced by :func:`build_payload` to the webhook."""
+    response = dispatcher.post(WEBHOOK_URL, **encode(payload))
+    print(f">>> WEBHOOK RESPONSE for {payload['file_name']}: {response.status_code}")
 
-    payload = {
-        'bank_key': branch,
-        'file_name': base,
-        'params': params,
-        key: records,
-    }
 
-    response = requests.post(WEBHOOK_URL, json=payload, timeout=10)
-    print(f">>> WEBHOOK RESPONSE for {base}: {response.status_code}")
+def process_and_send(file_name: str, data: bytes, params: dict) -> None:
+    """Parse the Excel file and send the JSON payload to the webhook."""
+    send_payload(build_payload(file_name, data, params))
 
 
 class UploadWorker:
-    """Background worker to process Excel uploads."""
-
-    def __init__(self) -> None:
-        self.queue: 'queue.Queue[tuple[str, str, bytes, dict]]' = queue.Queue()
-        self.thread = threading.Thread(target=self._run, daemon=True)
-        self.thread.start()
-
-    def enqueue(self, file_name: str, data: bytes, params: dict) -> None:
-        print(f">>> ENQUEUING EXCEL: {file_name}, queue size before: {self.queue.qsize()}")
-        self.queue.put((file_name, data, params))
-        print(f">>> EXCEL ENQUEUED: {file_name}, queue size after: {self.queue.qsize()}")
+    """Background worker to process Excel uploads.
+
+    Jobs are stored in the shared ``excel`` :class:`jobs.queues.JobQueue`
+    and taken by ``size`` worker threads.  Each thread owns a
+    :class:`api.pool.ProcessSlot` and parses the upload in that child
+    process (multi-sheet uploads are spread over :data:`sheet_pool`
+    instead).  Spooled uploads are passed by path and read by the child,
+    so the file never goes through the worker thread; the payload is stored on the job and handed to
+    :func:`jobs.delivery.deliver`, so the thread can take the next job while
+    the webhook calls are in flight.
+    Failures are rescheduled by the queue (see :mod:`jobs.retry`) instead of
+    being retried inline.
+    """
+
+    def __init__(self, size: int = POOL_SIZE, max_tasks_per_child: int = MAX_TASKS_PER_CHILD,
+                 job_timeout: float = JOB_TIMEOUT) -> None:
+        # Parsing the same workbook again would time out again
+        self.queue = JobQueue('excel', policies={JobTimeout: NO_RETRY},
+                              max_jobs=QUEUE_MAX_JOBS, max_bytes=QUEUE_MAX_BYTES)
+        self.job_timeout = job_timeout or None
+        self.slots = [ProcessSlot(max_tasks_per_child, START_METHOD) for _ in range(max(size, 1))]
+        self._busy = 0
+        self._lock = threading.Lock()
+        self.threads: list[threading.Thread] = []
+
+    def start(self) -> None:
+        """Start the worker threads (once)."""
+        with self._lock:
+            if self.threads:
+                return
+            self.threads = [
+                threading.Thread(target=self._run, args=(slot,), daemon=True, name=f'excel-worker-{i}')
+                for i, slot in enumerate(self.slots)
+            ]
+        for thread in self.threads:
+            thread.start()
+
+    def enqueue(self, file_name: str, data, params: dict) -> str:
+        """Enqueue ``data`` (bytes or an uploaded file) and return the job id."""
+        print(f">>> ENQUEUING EXCEL: {file_name}")
+        job = self.queue.put(file_name, data, params)
+        print(f">>> EXCEL ENQUEUED: {file_name}, job {job.pk}")
+        return str(job.pk)
+
+    def enqueue_archive(self, file, params: dict) -> tuple[Job, list[Job]]:
+        """Enqueue every spreadsheet of the ZIP upload ``file`` (see
+        :meth:`jobs.queues.JobQueue.put_archive`)."""
+        print(f">>> ENQUEUING ZIP: {file.name}")
+        batch, jobs = self.queue.put_archive(file, file.name, EXTENSIONS, params)
+        print(f">>> ZIP ENQUEUED: {file.name}, job {batch.pk} with {len(jobs)} file(s)")
+        return batch, jobs
 
     def get_queue_status(self) -> dict:
         return {
             'queue_size': self.queue.qsize(),
-            'thread_alive': self.thread.is_alive(),
-            'thread_daemon': self.thread.daemon,
+            'jobs': self.queue.stats(),
+            'limits': self.queue.limits(),
+            'pool_size': len(self.slots),
+            'busy_workers': self._busy,
+            'processes_alive': sum(slot.alive for slot in self.slots),
+            'sheet_processes_alive': sheet_pool.alive,
+            'threads_alive': sum(t.is_alive() for t in self.threads),
+            'webhook': dispatcher.stats(),
         }
 
-    def _run(self) -> None:
-        print(">>> EXCEL WORKER THREAD STARTED")
+    def _run(self, slot: ProcessSlot) -> None:
+        print(f">>> EXCEL WORKER THREAD STARTED: {threading.current_thread().name}")
         while True:
+            job = self.queue.get()
+            with self._lock:
+                self._busy += 1
             try:
-                file_name, data, params = self.queue.get()
-                print(f">>> PROCESSING EXCEL: {file_name}")
-                success = False
-                for attempt in range(1, MAX_RETRIES + 1):
-                    try:
-                        process_and_send(file_name, data, params)
-                        success = True
-                        break
-                    except Exception as e:
-                        print(f">>> ERROR on attempt {attempt} for {file_name}: {e}")
-                        if attempt < MAX_RETRIES:
-                            time.sleep(2)
-                        else:
-                            self._report_error(file_name, e)
-                if success:
-                    print(f">>> ✅ COMPLETED: {file_name}")
+                payload = self.queue.load_result(job)
+                if payload is None:
+                    print(f">>> PROCESSING EXCEL: {job.file_name} (attempt {job.attempts})")
+                    sheets = requested_sheets(job.params.get('worksheet'))
+                    if sheets:
+                        payload = build_sheets_payload(job.file_name, job.source(), job.params, sheets,
+                                                       sheet_pool, timeout=self.job_timeout)
+                    else:
+                        payload = slot.run(build_payload, job.file_name, job.source(), job.params,
+                                           timeout=self.job_timeout)
+                    self.queue.save_result(job, payload)
                 else:
-                    print(f">>> ❌ FAILED: {file_name}")
+                    print(f">>> RESENDING PARSED EXCEL: {job.file_name} (attempt {job.attempts})")
             except Exception as e:
-                print(f">>> CRITICAL ERROR in excel worker thread: {e}")
+                self._finish(job, e)
+            else:
+                deliver(WEBHOOK_URL, job, payload, lambda error, job=job: self._delivered(job, error))
             finally:
-                try:
-                    self.queue.task_done()
-                except Exception:
-                    pass
+                with self._lock:
+                    self._busy -= 1
+
+    def _delivered(self, job, error: BaseException | None) -> None:
+        if error is None:
+            print(f">>> ✅ COMPLETED: {job.file_name}")
+        self._finish(job, error)
+
+    def _finish(self, job, error: BaseException | None) -> None:
+        # Also runs on the long-lived webhook sender threads
+        close_old_connections()
+        try:
+            state = self.queue.task_done(job, error)
+        except Exception as e:
+            print(f">>> Error marking job {job.pk} done: {e}")
+            return
+        finally:
+            close_old_connections()
+        if state == Job.RETRYING:
+            print(f">>> ERROR on attempt {job.attempts} for {job.file_name}: {error}, retrying at {job.run_after}")
+        elif state == Job.FAILED:
+            print(f">>> ❌ FAILED: {job.file_name}: {error}")
+            self._report_error(job.file_name, error)
 
     def _report_error(self, file_name: str, exc: Exception) -> None:
         try:
-            requests.post(WEBHOOK_URL, json={'error': str(exc), 'file': file_name}, timeout=10)
+            dispatcher.post(WEBHOOK_URL, json={'error': str(exc), 'file': file_name})
         except Exception as e2:
             print("Webhook error after failure:", e2)
 
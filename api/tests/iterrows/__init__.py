@@ -0,0 +1,3 @@
+"""Frozen copies of the ``iterrows()`` bank processors that the vectorised
+:mod:`api.banks` implementations replaced; the reference of
+``test_bank_parity``.  Do not change them."""
@@ -0,0 +1,55 @@
+from io import BytesIO
+
+import pandas as pd
+from django.test import SimpleTestCase
+
+from api.banks.registry import read_options
+from api.banks.schema import EMPTY_ROWS
+from api.conversion import build_payload, iter_frames
+
+COLUMNS = ['NOTA', 'FECHA', 'IMPORTE (COP)', 'CONCEPTO', 'OBSERVACIONES']
+
+
+def _movement(day: int) -> list:
+    return ['', f'{day:02d}/06/2024', f'{day * 1000}.5', f'DEPOSITO {day}', f'REF {day:03d}']
+
+
+def _statement() -> pd.DataFrame:
+    """A BBVA statement whose end-of-data rows only show in a column the
+    schema does not read (``NOTA``)."""
+    rows = [_movement(1), _movement(2)]
+    # Not blank: only the unread column has text
+    rows += [['revisado', '', '', '', '']] * EMPTY_ROWS
+    rows += [_movement(3)]
+    # Blank run shorter than the limit, kept between movements
+    rows += [[''] * 5] * 3
+    rows += [_movement(4)]
+    rows += [['Total movimientos', '', '', '', ''], _movement(5)]
+    return pd.DataFrame(rows, columns=COLUMNS)
+
+
+def _files(df: pd.DataFrame) -> dict[str, bytes]:
+    xlsx = BytesIO()
+    df.to_excel(xlsx, index=False)
+    return {'.xlsx': xlsx.getvalue(), '.csv': df.to_csv(index=False).encode('utf-8')}
+
+
+class EndOfDataTests(SimpleTestCase):
+    """``.xlsx`` and CSV files end the statement at the same row."""
+
+    def test_same_payload(self):
+        payloads = {ext: build_payload(f'extracto{ext}', data, {'branch': 'bbva'})
+                    for ext, data in _files(_statement()).items()}
+        self.assertEqual(payloads['.csv']['data'], payloads['.xlsx']['data'])
+        self.assertEqual(payloads['.xlsx']['data'][-1]['Info_detallada'], 'DEPOSITO 4')
+
+    def test_same_frames(self):
+        options = read_options('bbva')
+        for chunk_rows in (2, 7, 1000):
+            frames = {}
+            for ext, data in _files(_statement()).items():
+                frame = pd.concat(iter_frames(BytesIO(data), ext, 0, 0, None, chunk_rows, **options))
+                frames[ext] = frame.dropna(how='all').reset_index(drop=True)
+            with self.subTest(chunk_rows=chunk_rows):
+                self.assertEqual(list(frames['.csv'].columns), ['FECHA', 'IMPORTE (COP)', 'CONCEPTO', 'OBSERVACIONES'])
+                pd.testing.assert_frame_equal(frames['.csv'], frames['.xlsx'])
@@ -0,0 +1,60 @@
+from concurrent.futures import Future
+from io import BytesIO
+from unittest import mock
+
+import pandas as pd
+from django.test import SimpleTestCase
+
+from api import conversion
+from api.conversion import build_payload, build_sheets_payload
+
+
+class InlinePool:
+    """A sheet pool running every group in the calling thread."""
+
+    size = 2
+
+    def map(self, func, arglist, timeout=None) -> list[Future]:
+        futures = []
+        for args in arglist:
+            future = Future()
+            future.set_result(func(*args))
+            futures.append(future)
+        return futures
+
+
+def _workbook() -> bytes:
+    out = BytesIO()
+    with pd.ExcelWriter(out, engine='openpyxl') as writer:
+        for i in range(5):
+            pd.DataFrame({'Fecha': ['2024-06-01', '2024-06-02'], 'Valor': [i, -1.5]}).to_excel(
+                writer, sheet_name=f'Hoja{i}', index=False)
+    return out.getvalue()
+
+
+class SheetsPayloadTests(SimpleTestCase):
+
+    def test_each_group_opens_the_workbook_once(self):
+        data = _workbook()
+        with mock.patch.object(conversion, 'open_book', wraps=conversion.open_book) as open_book:
+            payload = build_sheets_payload('extracto.xlsx', data, {}, ['all'], InlinePool())
+        self.assertEqual(open_book.call_count, 2)
+        # Each child gets a path, not the file contents
+        self.assertTrue(all(isinstance(call.args[0], str) for call in open_book.call_args_list))
+
+        self.assertEqual(list(payload['sheets']), [f'Hoja{i}' for i in range(5)])
+        for name, result in payload['sheets'].items():
+            expected = build_payload('extracto.xlsx', data, {'worksheet': name})
+            del expected['file_name'], expected['params']
+            self.assertEqual(result, expected)
+
+    def test_sheet_errors(self):
+        payload = build_sheets_payload('extracto.xlsx', _workbook(), {}, ['Hoja1', 'nope', 0],
+                                       InlinePool(), view=True)
+        self.assertEqual(set(payload['sheets']['nope']), {'error'})
+        self.assertEqual(len(payload['sheets']['Hoja1']['data']), 2)
+        self.assertEqual(payload['sheets']['0']['data'][0]['Valor'], '0.0')
+
+    def test_csv(self):
+        with self.assertRaises(ValueError):
+            build_sheets_payload('extracto.csv', b'a,b\n1,2\n', {}, ['all'], InlinePool())
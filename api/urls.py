@@ -6,4 +6,6 @@ app_name = 'excel'
 urlpatterns = [
     path('convert/', views.ExcelToJsonView.as_view(), name='convert_excel'),
     path('upload/', views.ExcelUploadView.as_view(), name='upload_excel'),
+    path('preview/', views.ExcelPreviewView.as_view(), name='preview_excel'),
+    path('cache/status/', views.CacheStatusView.as_view(), name='cache_status'),
 ]
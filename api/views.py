@@ -1,14 +1,26 @@
 import os
-import pandas as pd
+import json
+from itertools import chain
+
+from django.http import HttpResponse, HttpResponseNotModified, StreamingHttpResponse
+from django.utils.http import parse_etags
+from rest_framework.renderers import JSONRenderer
 from rest_framework.views import APIView
 from rest_framework.parsers import MultiPartParser, FormParser
 from rest_framework.response import Response
 from rest_framework import status
 
-from .tasks import worker as excel_worker
+from common.archives import is_archive
+from jobs.queues import QueueFull
+
+from .tasks import JOB_TIMEOUT, sheet_pool, worker as excel_worker
+from .conversion import (read_file, iter_frames, convert_frame, iter_converted, resolve_branch, sheet_name,
+                         requested_sheets, build_sheets_payload, SCHEMA_BANKS)
+from .cache import CACHE_ENABLED, cache_key, result_cache
+from .preview import PREVIEW_ROWS, preview
 
 
-from .banks.registry import get_processor
+from .banks.registry import get_processor, read_options
 
 class ExcelToJsonView(APIView):
   
@@ -27,47 +39,161 @@ class ExcelToJsonView(APIView):
 
         # Parámetros comunes
         branch = request.data.get('branch', '').lower()
-        sheet  = request.data.get('worksheet')
-        header = int(request.data.get('header_row', 0)) if request.data.get('header_row', '').isdigit() else 0
+        sheet  = _worksheet(request.data)
+        header = int(request.data.get('header_row')) if request.data.get('header_row', '').isdigit() else None
         skip   = int(request.data.get('skip_rows')) if request.data.get('skip_rows', '').isdigit() else None
         remove_unnamed = request.data.get('remove_unnamed', 'true').lower() == 'true'
 
+        # worksheet=all o lista de hojas: cada hoja se convierte en paralelo
+        sheets = requested_sheets(sheet)
+        if sheets:
+            params = {
+                'branch': branch,
+                'header_row': request.data.get('header_row'),
+                'skip_rows': request.data.get('skip_rows'),
+                'remove_unnamed': request.data.get('remove_unnamed', 'true'),
+            }
+            try:
+                # Uploads already on disk are read by the children from there
+                source = (excel_file.temporary_file_path() if hasattr(excel_file, 'temporary_file_path')
+                          else excel_file.read())
+                payload = build_sheets_payload(excel_file.name, source, params, sheets,
+                                               sheet_pool, timeout=JOB_TIMEOUT or None, view=True)
+            except ValueError as e:
+                return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+            except Exception as e:
+                return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+            return Response({'sheets': payload['sheets']})
+
+        # branch=auto: banco (y fila de encabezado) detectados con las primeras filas
+        try:
+            branch, header, detection = resolve_branch(excel_file, ext, sheet, branch, header)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        except Exception as e:
+            return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+        fmt = request.data.get('format', 'json').lower()
+        key = 'movimientos' if branch in SCHEMA_BANKS else 'data'
+
+        if fmt in ('ndjson', 'json-stream'):
+            response = self._stream(excel_file, ext, sheet, header, skip, branch, remove_unnamed, key, fmt)
+            return _with_detection(response, detection)
+
+        # Caché por contenido: mismo archivo + mismos parámetros = mismo resultado
+        digest = None
+        if CACHE_ENABLED:
+            digest = cache_key(excel_file, {
+                'ext': ext,
+                'branch': branch,
+                'worksheet': sheet_name(sheet),
+                'header_row': header,
+                'skip_rows': skip,
+                'remove_unnamed': remove_unnamed,
+            })
+            etag = f'"{digest}"'
+            if etag in parse_etags(request.headers.get('If-None-Match', '')):
+                response = HttpResponseNotModified()
+                response['ETag'] = etag
+                return _with_detection(response, detection)
+            body = result_cache.get(digest)
+            if body is not None:
+                return _with_detection(_json_response(body, digest, 'HIT'), detection)
+
         try:
             # Leer el archivo
-            df = self._read_file(excel_file, ext, sheet, header, skip)
+            # Solo las columnas que usa el banco, leídas con su tipo
+            df = read_file(excel_file, ext, sheet, header, skip, **read_options(branch))
 
             # Aplicar procesamiento específico del banco si existe
-            processor = get_processor(branch)
-            if processor:
-                df = processor(df)
-
-            if remove_unnamed:
-                df = df.loc[:, ~df.columns.str.contains(r'^Unnamed')]
-            df.dropna(how='all', inplace=True)
-            df.fillna('', inplace=True)
-            df = df.astype(str)
+            df = convert_frame(df, get_processor(branch), remove_unnamed)
 
             # Respuesta JSON
             records = df.to_dict(orient='records')
-            key = 'movimientos' if branch in ('occidente', 'agrario','alianza','bbva','avvillas','itau') else 'data'
-            return Response({key: records}, status=status.HTTP_200_OK)
+            body = JSONRenderer().render({key: records})
+            if digest:
+                result_cache.set(digest, body)
+            return _with_detection(_json_response(body, digest, 'MISS'), detection)
 
         except Exception as e:
             return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-    def _read_file(self, file, ext, sheet, header, skip):
-        if ext == '.csv':
-            return pd.read_csv(file, header=header, skiprows=skip)
-        engine = 'openpyxl'
-        if ext == '.xls':
-            engine = 'xlrd'
-        return pd.read_excel(
-            file,
-            sheet_name=(int(sheet) if sheet and sheet.isdigit() else sheet),
-            header=header,
-            skiprows=skip,
-            engine=engine,
+    def _stream(self, excel_file, ext, sheet, header, skip, branch, remove_unnamed, key, fmt):
+        """Return a ``StreamingHttpResponse`` converting the file chunk by chunk.
+
+        The first chunk is converted before the response starts so that
+        errors such as missing columns still produce a regular 500 response.
+        """
+        chunks = iter_converted(
+            iter_frames(excel_file, ext, sheet, header, skip, **read_options(branch)),
+            branch, remove_unnamed
         )
+        try:
+            first = next(chunks, None)
+        except Exception as e:
+            return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+        frames = chain([first], chunks) if first is not None else iter(())
+        if fmt == 'ndjson':
+            content, content_type = _ndjson_body(frames), 'application/x-ndjson'
+        else:
+            content, content_type = _json_array_body(frames, key), 'application/json'
+        return StreamingHttpResponse(content, content_type=content_type)
+
+
+def _json_response(body: bytes, digest: str | None, cache_status: str) -> HttpResponse:
+    response = HttpResponse(body, content_type='application/json')
+    if digest:
+        response['ETag'] = f'"{digest}"'
+        response['X-Cache'] = cache_status
+    return response
+
+
+def _with_detection(response, detection):
+    """Report the bank chosen by ``branch=auto`` in the response headers."""
+    if detection is not None:
+        response['X-Bank'] = detection.bank
+        response['X-Bank-Confidence'] = str(detection.confidence)
+        response['X-Header-Row'] = str(detection.header_row)
+    return response
+
+
+def _worksheet(data):
+    """Return the ``worksheet`` parameter (a list when it is repeated)."""
+    sheets = data.getlist('worksheet') if hasattr(data, 'getlist') else []
+    return sheets if len(sheets) > 1 else data.get('worksheet')
+
+
+def _dumps(obj) -> str:
+    # Mismo formato que el JSONRenderer de DRF (UTF-8, compacto)
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':'))
+
+
+def _ndjson_body(frames):
+    """Yield one JSON document per record; a failure ends with an error line."""
+    try:
+        for df in frames:
+            lines = [_dumps(r) for r in df.to_dict(orient='records')]
+            if lines:
+                yield '\n'.join(lines) + '\n'
+    except Exception as e:
+        yield _dumps({'error': str(e)}) + '\n'
+
+
+def _json_array_body(frames, key):
+    """Yield ``{key: [...]}`` incrementally; a failure adds an ``error`` key."""
+    yield '{' + _dumps(key) + ':['
+    sep = ''
+    try:
+        for df in frames:
+            records = [_dumps(r) for r in df.to_dict(orient='records')]
+            if records:
+                yield sep + ','.join(records)
+                sep = ','
+    except Exception as e:
+        yield '],"error":' + _dumps(str(e)) + '}'
+        return
+    yield ']}'
 
 
 class ExcelUploadView(APIView):
@@ -89,22 +215,43 @@ class ExcelUploadView(APIView):
 
         params = {
             'branch': request.data.get('branch', '').lower(),
-            'worksheet': request.data.get('worksheet'),
-            'header_row': request.data.get('header_row', 0),
+            'worksheet': _worksheet(request.data),
+            'header_row': request.data.get('header_row'),
             'skip_rows': request.data.get('skip_rows'),
             'remove_unnamed': request.data.get('remove_unnamed', 'true'),
         }
 
         enqueued = []
         failed = []
+        batches = []
+        job_ids = []
+        full = None
         for f in files:
+            if full is not None:
+                failed.append({'file': f.name, 'error': str(full)})
+                continue
             try:
-                excel_worker.enqueue(f.name, f.read(), params)
-                enqueued.append(f.name)
+                if is_archive(f.name):
+                    # ZIP: cada hoja de cálculo del archivo se encola por separado
+                    batch, jobs = excel_worker.enqueue_archive(f, params)
+                    batches.append({'file': f.name, 'job_id': str(batch.pk), 'files': len(jobs)})
+                    enqueued.extend(job.file_name for job in jobs)
+                    job_ids.extend({'file': job.file_name, 'job_id': str(job.pk)} for job in jobs)
+                else:
+                    job_id = excel_worker.enqueue(f.name, f, params)
+                    enqueued.append(f.name)
+                    job_ids.append({'file': f.name, 'job_id': job_id})
+            except QueueFull as e:
+                # Cola llena: el resto de archivos tampoco se encola
+                full = e
+                failed.append({'file': f.name, 'error': str(e)})
             except Exception as e:
                 failed.append({'file': f.name, 'error': str(e)})
 
-        if enqueued and not failed:
+        if full is not None:
+            message = f"⏳ Cola llena: {len(enqueued)} archivo(s) encolado(s), reintente en {full.retry_after} s"
+            status_code = status.HTTP_429_TOO_MANY_REQUESTS
+        elif enqueued and not failed:
             message = f"✅ {len(enqueued)} archivo(s) encolado(s)"
             status_code = status.HTTP_202_ACCEPTED
         elif enqueued and failed:
@@ -117,7 +264,52 @@ class ExcelUploadView(APIView):
         return Response({
             'message': message,
             'enqueued_files': enqueued,
+            'jobs': job_ids,
             'failed_files': failed,
+            'archives': batches,
             'queue_size': excel_worker.get_queue_status()['queue_size'],
             'params': params,
-        }, status=status_code)
+        }, status=status_code, headers={'Retry-After': str(full.retry_after)} if full else None)
+
+
+class ExcelPreviewView(APIView):
+    """Sheets, dimensions, first rows and suggested ``header_row`` of a file.
+
+    Nothing is converted, so the UI can choose the sheet and header row
+    before calling ``convert/``.
+    """
+
+    parser_classes = (MultiPartParser, FormParser)
+
+    def post(self, request, *args, **kwargs):
+        excel_file = request.FILES.get('file')
+        if not excel_file:
+            return Response({'error': 'No se proporcionó ningún archivo'},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        ext = os.path.splitext(excel_file.name)[1].lower()
+        if ext not in ('.csv', '.xls', '.xlsx'):
+            return Response({'error': 'Formato no soportado'},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        rows = request.data.get('rows', '')
+        rows = int(rows) if rows.isdigit() else PREVIEW_ROWS
+
+        try:
+            sheets = preview(excel_file, ext, rows, request.data.get('worksheet'))
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        except Exception as e:
+            return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+        return Response({'file_name': excel_file.name, 'sheets': sheets}, status=status.HTTP_200_OK)
+
+
+class CacheStatusView(APIView):
+    """Hit/miss counters of the conversion result cache."""
+
+    def get(self, request, *args, **kwargs):
+        return Response({
+            'enabled': CACHE_ENABLED,
+            'cache': result_cache.stats(),
+        }, status=status.HTTP_200_OK)
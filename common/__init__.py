@@ -0,0 +1 @@
+"""Helpers shared by the Excel (``api``) and PDF (``pdfconvert``) converters."""
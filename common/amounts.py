@@ -0,0 +1,249 @@
+"""Locale-aware parsing of amounts into integer cents.
+
+Statements write amounts either as ``1,234.56`` (:data:`DOT` decimal) or as
+``1.234,56`` (:data:`COMMA` decimal).  Most values say which one they use:
+
+* with both separators the last one marks the decimals;
+* a separator repeated (``1.234.567``) groups thousands;
+* a single separator followed by anything but three digits (``12,5``,
+  ``1.50``) marks the decimals.
+
+Only a single separator followed by exactly three digits (``1.234``) is
+ambiguous.  :func:`parse_cents` settles those with the convention the rest
+of the column uses (:func:`detect_decimal`), or ``default`` when the column
+gives no hint.  Currency symbols and spaces are ignored; ``-`` (leading or
+trailing) and ``(…)`` make the value negative.  Anything that is not an
+amount is ``0``.
+
+Amounts are kept as ``int64`` cents so sums and signs are exact; decimals
+after the second are rounded half up.  :func:`to_cents` is the memoized
+scalar version for the line-by-line text parsers.
+"""
+
+from __future__ import annotations
+
+import re
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+from functools import lru_cache
+from typing import Iterable
+
+import numpy as np
+import pandas as pd
+
+DOT = '.'
+COMMA = ','
+
+_MINUS = str.maketrans({'−': '-', '–': '-', '—': '-'})
+_NOT_AMOUNT = re.compile(r'[^\d.,]')
+_NUMBER = re.compile(r'^(\d*)(?:\.(\d*))?$')
+_EXPONENT = re.compile(r'^-?\d+(?:\.\d*)?[eE][-+]?\d+$')
+_IGNORED = re.compile(r'[$\s]')
+_AMBIGUOUS = '?'
+
+
+def _opposite(decimal: str) -> str:
+    return COMMA if decimal == DOT else DOT
+
+
+# --- scalar path -----------------------------------------------------------
+
+def _number_cents(values: np.ndarray) -> np.ndarray:
+    scaled = np.nan_to_num(values.astype(float)) * 100
+    cents = np.round(scaled)
+    # ``12.345 * 100`` is ``1234.4999…``: round halves on the decimal digits
+    half = np.abs(np.abs(scaled - np.trunc(scaled)) - 0.5) < 1e-6
+    if half.any():
+        cents[half] = [
+            (Decimal(repr(float(v))) * 100).to_integral_value(ROUND_HALF_UP)
+            for v in values[half]
+        ]
+    return cents.astype('int64')
+
+
+def _sign_and_body(text: str) -> tuple[bool, str]:
+    text = _IGNORED.sub('', text.translate(_MINUS))
+    negative = False
+    if text.startswith('(') and text.endswith(')'):
+        negative, text = True, text[1:-1]
+    if text.endswith('-'):
+        negative, text = True, text[:-1]
+    if text.startswith('-'):
+        negative, text = True, text[1:]
+    return negative, _NOT_AMOUNT.sub('', text)
+
+
+def _decimal_of(body: str) -> str:
+    """Return the decimal separator of ``body``: ``.``, ``,``, ``''`` (none)
+    or ``?`` (ambiguous)."""
+    dot, comma = body.rfind(DOT), body.rfind(COMMA)
+    if dot >= 0 and comma >= 0:
+        return DOT if dot > comma else COMMA
+    if dot < 0 and comma < 0:
+        return ''
+    sep = DOT if dot >= 0 else COMMA
+    if body.count(sep) > 1:
+        return ''
+    if len(body) - body.index(sep) - 1 == 3:
+        return _AMBIGUOUS
+    return sep
+
+
+def _cents(negative: bool, units: str, fraction: str) -> int:
+    fraction = fraction.ljust(3, '0')
+    cents = int(units or '0') * 100 + int(fraction[:2]) + (fraction[2] >= '5')
+    return -cents if negative else cents
+
+
+@lru_cache(maxsize=65536)
+def _to_cents(text: str, default: str) -> int:
+    if _EXPONENT.match(text):
+        try:
+            return int((Decimal(text) * 100).to_integral_value(ROUND_HALF_UP))
+        except InvalidOperation:
+            return 0
+    negative, body = _sign_and_body(text)
+    decimal = _decimal_of(body)
+    if decimal == _AMBIGUOUS:
+        decimal = default
+    thousands = _opposite(decimal) if decimal else None
+    if thousands:
+        body = body.replace(thousands, '')
+    body = body.replace(decimal, '.') if decimal else body.replace(DOT, '').replace(COMMA, '')
+    match = _NUMBER.match(body)
+    if not match:
+        return 0
+    return _cents(negative, match.group(1), match.group(2) or '')
+
+
+def to_cents(raw, default: str = DOT) -> int:
+    """Return ``raw`` in cents; ambiguous values use the ``default`` decimal."""
+    if raw is None or isinstance(raw, bool):
+        return 0
+    if isinstance(raw, (int, float, np.integer, np.floating)):
+        return int(_number_cents(np.array([raw]))[0])
+    return _to_cents(str(raw).strip(), default)
+
+
+# --- vectorised path -------------------------------------------------------
+
+def _factorize(values: Iterable) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Return ``(codes, uniques, counts)``; missing values have code ``-1``."""
+    if not isinstance(values, pd.Series):
+        values = pd.Series(list(values), dtype=object)
+    codes, uniques = pd.factorize(values)
+    counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+    return codes, np.asarray(uniques, dtype=object), counts
+
+
+def _classify(text: pd.Series) -> tuple[pd.Series, pd.Series, pd.Series]:
+    """Return ``(negative, body, decimal)`` for every value of ``text``.
+
+    ``decimal`` is as in :func:`_decimal_of`.
+    """
+    text = text.str.translate(_MINUS).str.replace(_IGNORED, '', regex=True)
+    paren = text.str.startswith('(') & text.str.endswith(')')
+    text = text.mask(paren, text.str[1:-1])
+    trailing = text.str.endswith('-')
+    text = text.mask(trailing, text.str[:-1])
+    leading = text.str.startswith('-')
+    text = text.mask(leading, text.str[1:])
+    negative = paren | trailing | leading
+    body = text.str.replace(_NOT_AMOUNT, '', regex=True)
+
+    dot, comma = body.str.rfind(DOT), body.str.rfind(COMMA)
+    single = np.where(dot >= 0, DOT, COMMA)
+    count = np.where(dot >= 0, body.str.count(r'\.'), body.str.count(COMMA))
+    after = body.str.len() - np.maximum(dot, comma) - 1
+    decimal = np.select(
+        [(dot >= 0) & (comma >= 0), (dot < 0) & (comma < 0), count > 1, after == 3],
+        [np.where(dot > comma, DOT, COMMA), '', '', _AMBIGUOUS],
+        default=single,
+    )
+    return negative, body, pd.Series(decimal, index=text.index, dtype=object)
+
+
+def _vote(body: pd.Series, decimal: pd.Series, weights: np.ndarray) -> str | None:
+    """Return the decimal separator the unambiguous values agree on."""
+    # ``1.234.567`` says the other separator is the decimal one
+    grouped = ((decimal == '') & body.str.contains(r'[.,]', regex=True)).to_numpy()
+    grouped_dot = grouped & body.str.contains(DOT, regex=False).to_numpy()
+    dot = weights[(decimal == DOT).to_numpy() | (grouped & ~grouped_dot)].sum()
+    comma = weights[(decimal == COMMA).to_numpy() | grouped_dot].sum()
+    if dot == comma:
+        return None
+    return DOT if dot > comma else COMMA
+
+
+def _text_uniques(uniques: np.ndarray) -> tuple[np.ndarray, pd.Series]:
+    """Split ``uniques`` into a mask of numbers and the stripped text of the rest."""
+    numeric = np.fromiter(
+        (isinstance(u, (int, float, np.integer, np.floating)) and not isinstance(u, bool) for u in uniques),
+        dtype=bool, count=len(uniques),
+    )
+    text = pd.Series(uniques[~numeric], dtype=object).map(str).str.strip()
+    return numeric, text
+
+
+def detect_decimal(values: Iterable, default: str = DOT) -> str:
+    """Return the decimal separator used by ``values`` (``default`` if unknown)."""
+    _, uniques, counts = _factorize(values)
+    numeric, text = _text_uniques(uniques)
+    _, body, decimal = _classify(text)
+    return _vote(body, decimal, counts[~numeric]) or default
+
+
+def parse_cents(values: Iterable, default: str = DOT) -> pd.Series:
+    """Return ``values`` as an ``int64`` Series of cents.
+
+    Ambiguous values follow the convention of the rest of the column, or
+    ``default`` when the column gives no hint.  Numbers (``int``/``float``
+    cells) are taken as they are.  Text is parsed once per distinct value.
+    """
+    index = values.index if isinstance(values, pd.Series) else None
+    if isinstance(values, pd.Series) and values.dtype.kind in 'iuf':
+        return pd.Series(_number_cents(values.to_numpy()), index=index)
+
+    codes, uniques, counts = _factorize(values)
+    numeric, text = _text_uniques(uniques)
+    cents = np.zeros(len(uniques) + 1, dtype='int64')  # last slot: missing
+    if numeric.any():
+        cents[:-1][numeric] = _number_cents(uniques[numeric])
+
+    if len(text):
+        negative, body, decimal = _classify(text)
+        ambiguous = decimal == _AMBIGUOUS
+        if ambiguous.any():
+            column = _vote(body, decimal, counts[~numeric]) or default
+            decimal = decimal.mask(ambiguous, column)
+
+        normal = body.mask(decimal == COMMA, body.str.replace(DOT, '', regex=False).str.replace(COMMA, DOT, regex=False))
+        normal = normal.mask(decimal == DOT, body.str.replace(COMMA, '', regex=False))
+        normal = normal.mask(decimal == '', body.str.replace(r'[.,]', '', regex=True))
+
+        parts = normal.str.extract(_NUMBER)
+        units = parts[0].fillna('').str.lstrip('0').replace('', '0')
+        fraction = parts[1].fillna('').str.ljust(3, '0')
+        text_cents = (
+            pd.to_numeric(units).astype('int64') * 100
+            + pd.to_numeric(fraction.str[:2]).astype('int64')
+            + (fraction.str[2] >= '5').astype('int64')
+        )
+        text_cents = text_cents.where(~negative, -text_cents).where(parts[0].notna(), 0)
+
+        # Scientific notation is rare: one value at a time
+        exponent = text.str.match(_EXPONENT)
+        if exponent.any():
+            text_cents[exponent] = text[exponent].map(lambda v: _to_cents(v, default))
+        cents[:-1][~numeric] = text_cents.to_numpy()
+
+    return pd.Series(cents[codes], index=index, dtype='int64')
+
+
+def format_cents(cents):
+    """Return cents as ``"1234.56"`` (a ``str``, or a Series of them)."""
+    if not isinstance(cents, pd.Series):
+        sign = '-' if cents < 0 else ''
+        return f"{sign}{abs(cents) // 100}.{abs(cents) % 100:02d}"
+    magnitude = cents.abs()
+    text = (magnitude // 100).astype(str) + '.' + (magnitude % 100).astype(str).str.zfill(2)
+    return text.where(cents >= 0, '-' + text).astype(object)
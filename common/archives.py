@@ -0,0 +1,58 @@
+"""Lazy extraction of uploaded ZIP archives.
+
+Django keeps uploads larger than ``FILE_UPLOAD_MAX_MEMORY_SIZE`` in a
+temporary file on disk.  :func:`iter_members` reads the archive's central
+directory from that file and decompresses one member at a time while it is
+streamed into the job spool, so members are never held in memory whole.
+"""
+
+from __future__ import annotations
+
+import os
+import posixpath
+import zipfile
+from typing import IO, Iterator
+
+ZIP_EXTENSION = '.zip'
+# Limits guarding against archives that expand to huge amounts of data.
+MAX_MEMBERS = int(os.getenv('ZIP_MAX_MEMBERS', '2000'))
+MAX_MEMBER_BYTES = int(os.getenv('ZIP_MAX_MEMBER_MB', '100')) * 1024 * 1024
+
+
+def is_archive(file_name: str) -> bool:
+    """Return ``True`` for ``.zip`` uploads (``.xlsx`` files are ZIPs too, so
+    only the extension counts)."""
+    return os.path.splitext(file_name)[1].lower() == ZIP_EXTENSION
+
+
+def _wanted(info: zipfile.ZipInfo, extensions: tuple[str, ...]) -> bool:
+    name = posixpath.basename(info.filename)
+    if info.is_dir() or not name or name.startswith(('.', '~$')) or info.filename.startswith('__MACOSX/'):
+        return False
+    return os.path.splitext(name)[1].lower() in extensions
+
+
+def iter_members(file, extensions: tuple[str, ...]) -> Iterator[tuple[str, IO[bytes]]]:
+    """Yield ``(name, member)`` for the members of the ZIP ``file`` with one
+    of ``extensions``; ``member`` is open for reading until the next member
+    is yielded.
+
+    Folders, hidden files and macOS metadata are skipped.  Raises
+    ``ValueError`` for invalid archives and for archives over the
+    ``ZIP_MAX_MEMBERS`` / ``ZIP_MAX_MEMBER_MB`` limits.
+    """
+    try:
+        archive = zipfile.ZipFile(file)
+    except zipfile.BadZipFile as e:
+        raise ValueError(f'Archivo ZIP inválido: {e}')
+    with archive:
+        members = [info for info in archive.infolist() if _wanted(info, extensions)]
+        if len(members) > MAX_MEMBERS:
+            raise ValueError(f'El ZIP tiene {len(members)} archivos (máximo {MAX_MEMBERS})')
+        too_big = [info.filename for info in members if info.file_size > MAX_MEMBER_BYTES]
+        if too_big:
+            raise ValueError(f'Archivos demasiado grandes en el ZIP: {", ".join(too_big)}')
+        for info in members:
+            # Reads stop at the declared (already checked) size
+            with archive.open(info) as member:
+                yield info.filename, member
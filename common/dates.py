@@ -0,0 +1,111 @@
+"""Vectorised date normalisation.
+
+Statements use one date format per file, so the format of a column is
+detected once from a sample (:func:`detect_format`) and the whole column is
+converted in a single ``pd.to_datetime`` call.  Values the detected format
+does not understand fall back to ISO 8601 and then to pandas' per-value
+parser, once per distinct value.
+
+Dates stay typed (``datetime64``) for sorting and are only turned into
+strings when building the output (:func:`format_dates`).
+"""
+
+from __future__ import annotations
+
+import warnings
+from typing import Iterable
+
+import pandas as pd
+
+OUTPUT_FORMAT = '%d/%m/%Y'
+SAMPLE_SIZE = 200
+
+# Text that stands for a missing cell rather than an invalid date.
+NA_STRINGS = frozenset({'', 'nan', 'NaN', 'NaT', 'None'})
+
+# Candidate formats, in order of preference.  ``ISO8601`` covers
+# ``YYYY-MM-DD`` and ``YYYY/MM/DD`` with or without a time part.
+_DAY_FIRST = (
+    'ISO8601', '%d/%m/%Y', '%d-%m-%Y', '%d.%m.%Y', '%d/%m/%y',
+    '%d/%m/%Y %H:%M:%S', '%d/%m/%Y %H:%M', '%m/%d/%Y',
+)
+_MONTH_FIRST = (
+    'ISO8601', '%m/%d/%Y', '%d/%m/%Y', '%m-%d-%Y', '%d-%m-%Y', '%m/%d/%y',
+    '%m/%d/%Y %H:%M:%S', '%m/%d/%Y %H:%M',
+)
+
+
+def _as_text(values: Iterable) -> pd.Series:
+    if not isinstance(values, pd.Series):
+        values = pd.Series(list(values), dtype=object)
+    return values.astype(object).map(str).str.strip()
+
+
+def detect_format(values: Iterable, dayfirst: bool = False,
+                  sample_size: int = SAMPLE_SIZE) -> str | None:
+    """Return the format that parses a sample of ``values`` best.
+
+    The first candidate that parses every sampled value wins; when none
+    does, the one parsing the most values is used.  ``None`` means no
+    candidate recognised anything.
+    """
+    text = _as_text(values)
+    sample = text[~text.isin(NA_STRINGS)].drop_duplicates().head(sample_size)
+    if sample.empty:
+        return None
+
+    best, best_count = None, 0
+    for fmt in (_DAY_FIRST if dayfirst else _MONTH_FIRST):
+        count = int(pd.to_datetime(sample, format=fmt, errors='coerce').notna().sum())
+        if count == len(sample):
+            return fmt
+        if count > best_count:
+            best, best_count = fmt, count
+    return best
+
+
+def _parse_one(value: str, dayfirst: bool):
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        return pd.to_datetime(value, dayfirst=dayfirst, errors='coerce')
+
+
+def parse_dates(values: Iterable, dayfirst: bool = False, fmt: str | None = None,
+                strict: bool = False) -> pd.Series:
+    """Return ``values`` as a ``datetime64`` Series (``NaT`` when not a date).
+
+    ``fmt`` skips the detection step when the format is known; ``strict``
+    also skips the fallback, so only values in ``fmt`` are converted.
+    """
+    text = _as_text(values)
+    if fmt is None:
+        fmt = detect_format(text, dayfirst)
+    if fmt is None:
+        parsed = pd.Series(pd.NaT, index=text.index, dtype='datetime64[ns]')
+    else:
+        parsed = pd.to_datetime(text, format=fmt, errors='coerce')
+        if getattr(parsed.dt, 'tz', None) is not None:
+            parsed = parsed.dt.tz_localize(None)
+
+    leftover = parsed.isna() & ~text.isin(NA_STRINGS)
+    if leftover.any() and not strict:
+        codes, uniques = pd.factorize(text[leftover])
+        # ISO dates are never day first, whatever the rest of the column is
+        iso = pd.to_datetime(pd.Series(uniques, dtype=object), format='ISO8601', errors='coerce')
+        converted = [d if not pd.isna(d) else _parse_one(u, dayfirst) for u, d in zip(uniques, iso)]
+        fallback = pd.Series([converted[c] for c in codes], index=text.index[leftover], dtype=object)
+        parsed = parsed.astype(object)
+        parsed[leftover] = fallback
+        parsed = pd.to_datetime(parsed, errors='coerce')
+    return parsed
+
+
+def format_dates(dates: pd.Series, fmt: str = OUTPUT_FORMAT, default='') -> pd.Series:
+    """Format ``dates`` with ``fmt``; ``NaT`` becomes ``default``.
+
+    ``default`` may be a scalar or a Series aligned with ``dates`` (e.g.
+    the original text, to keep values that are not dates).
+    """
+    formatted = dates.dt.strftime(fmt).astype(object)
+    return formatted.where(dates.notna(), default)
+
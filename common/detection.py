@@ -0,0 +1,44 @@
+"""Result type shared by the Excel and text bank detectors."""
+
+from __future__ import annotations
+
+import os
+from dataclasses import asdict, dataclass, field
+
+# Below this confidence ``branch=auto`` / ``bank_key=auto`` is rejected
+# instead of guessing.
+MIN_CONFIDENCE = float(os.getenv('BANK_DETECT_MIN_CONFIDENCE', '0.6'))
+
+
+@dataclass(frozen=True)
+class Detection:
+    """The bank a file most likely belongs to.
+
+    ``confidence`` is the share of the bank's signature found in the file
+    (halved when another bank matches exactly as well); ``candidates`` has
+    the confidence of every bank that matched something.
+    """
+
+    bank: str
+    confidence: float
+    header_row: int | None = None
+    candidates: dict[str, float] = field(default_factory=dict)
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+def rank(scores: dict[str, tuple[float, int]]) -> tuple[str, float] | None:
+    """Return the best ``(bank, confidence)`` of ``scores``.
+
+    ``scores`` maps banks to ``(coverage, matches)``: the share of the
+    signature found and how many markers matched.  Coverage decides; more
+    matches break ties (the more specific bank wins).
+    """
+    if not scores:
+        return None
+    ordered = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+    bank, (coverage, _) = ordered[0]
+    if len(ordered) > 1 and ordered[1][1] == ordered[0][1]:
+        coverage /= 2
+    return bank, round(coverage, 3)
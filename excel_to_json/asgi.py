@@ -14,3 +14,11 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'excel_to_json.settings')
 
 application = get_asgi_application()
+
+# Job queue consumers run in the web processes unless JOBS_WORKERS_ENABLED=false
+# (then ``manage.py run_jobs`` runs them); management commands never start them.
+from jobs.queues import WORKERS_ENABLED  # noqa: E402
+from jobs.workers import start_workers  # noqa: E402
+
+if WORKERS_ENABLED:
+    start_workers()
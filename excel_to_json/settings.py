@@ -32,6 +32,7 @@ INSTALLED_APPS = [
     'django.contrib.messages',
     'django.contrib.staticfiles',
     'corsheaders',
+    'jobs',
     'api',
     'authapp',
     'rest_framework',
@@ -97,6 +98,16 @@ DATABASES = {
     }
 }
 
+# DB_ENGINE=sqlite runs everything (including the job queue) on a local file
+if os.getenv('DB_ENGINE', 'postgresql') == 'sqlite':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.getenv('SQLITE_NAME', BASE_DIR / 'db.sqlite3'),
+            'OPTIONS': {'timeout': 20},
+        }
+    }
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -54,5 +54,6 @@ urlpatterns = [
     
     path('api/pdf/', include('pdfconvert.urls')),
     path('api/ocr/', include('ocr.urls')),
+    path('api/jobs/', include('jobs.urls')),
 ]
 
@@ -0,0 +1,118 @@
+"""Delivery of parsed payloads: gzip bodies and paged (chunked) mode.
+
+With ``WEBHOOK_CHUNK_ROWS`` set, the records of a payload are split into
+pages of that many rows.  Every page repeats the payload metadata and adds
+``job_id``, ``page`` (1-based) and ``pages`` so the receiver can put the
+statement back together.  Pages are sent concurrently through
+:data:`jobs.dispatcher.dispatcher`; the pages that were delivered are saved on
+the job, so a retry only sends the missing ones.  Together with the parsed
+result stored on the job (see :meth:`jobs.queues.JobQueue.save_result`) a
+failed page never triggers a new parse.
+
+``WEBHOOK_GZIP=true`` sends the JSON bodies with ``Content-Encoding: gzip``.
+Both options are off by default because the receiver has to support them.
+"""
+
+from __future__ import annotations
+
+import gzip
+import json
+import os
+import threading
+from typing import Callable
+
+from django.db import close_old_connections
+
+from .dispatcher import dispatcher
+from .models import Job
+
+GZIP_ENABLED = os.getenv('WEBHOOK_GZIP', 'false').lower() == 'true'
+# Records per webhook request (0 = whole payload in one request).
+CHUNK_ROWS = int(os.getenv('WEBHOOK_CHUNK_ROWS', '0'))
+
+# Payload keys holding the list of records, by producer.
+RECORD_KEYS = ('data', 'movimientos', 'results')
+
+
+def encode(payload: dict, compress: bool = GZIP_ENABLED) -> dict:
+    """Return the ``requests`` arguments used to post ``payload``."""
+    if not compress:
+        return {'json': payload}
+    body = json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    return {
+        'data': gzip.compress(body, compresslevel=6),
+        'headers': {'Content-Type': 'application/json', 'Content-Encoding': 'gzip'},
+    }
+
+
+def paginate(payload: dict, job_id: str, chunk_rows: int = CHUNK_ROWS) -> list[dict]:
+    """Split ``payload`` into pages of ``chunk_rows`` records."""
+    key = next((k for k in RECORD_KEYS if isinstance(payload.get(k), list)), None)
+    if not chunk_rows or key is None:
+        return [payload]
+
+    records = payload[key]
+    total = max((len(records) + chunk_rows - 1) // chunk_rows, 1)
+    pages = []
+    for index in range(total):
+        page = dict(payload)
+        page[key] = records[index * chunk_rows:(index + 1) * chunk_rows]
+        page.update({'job_id': job_id, 'page': index + 1, 'pages': total})
+        pages.append(page)
+    return pages
+
+
+class _PageTracker:
+    """Collect the outcome of the pages of one delivery."""
+
+    def __init__(self, job: Job, pending: int, callback: Callable[[BaseException | None], None]) -> None:
+        self.job = job
+        self.pending = pending
+        self.callback = callback
+        self.delivered = list(job.pages_delivered)
+        self.error: BaseException | None = None
+        self._lock = threading.Lock()
+
+    def page_done(self, page: int, future) -> None:
+        error = future.exception()
+        with self._lock:
+            if error is None:
+                self.delivered.append(page)
+            elif self.error is None:
+                self.error = error
+            self.pending -= 1
+            if self.pending:
+                return
+        try:
+            # Runs on a long-lived webhook sender thread
+            close_old_connections()
+            self.job.pages_delivered = sorted(self.delivered)
+            Job.objects.filter(pk=self.job.pk, locked_by=self.job.locked_by).update(
+                pages_delivered=self.job.pages_delivered)
+        except Exception as e:
+            print(f">>> Error saving delivered pages for job {self.job.pk}: {e}")
+        self.callback(self.error)
+
+
+def deliver(url: str, job: Job, payload: dict,
+            callback: Callable[[BaseException | None], None]) -> None:
+    """Send ``payload`` for ``job`` and call ``callback(error)`` when done.
+
+    Pages already delivered in a previous attempt are skipped.
+    """
+    pages = paginate(payload, str(job.pk))
+    if len(pages) != job.pages_total:
+        # Different page size than the previous attempt: start over
+        job.pages_total = len(pages)
+        job.pages_delivered = []
+        Job.objects.filter(pk=job.pk, locked_by=job.locked_by).update(pages_total=len(pages), pages_delivered=[])
+
+    pending = [(i + 1, page) for i, page in enumerate(pages) if i + 1 not in job.pages_delivered]
+    if not pending:
+        callback(None)
+        return
+
+    tracker = _PageTracker(job, len(pending), callback)
+    for number, page in pending:
+        future = dispatcher.submit(url, **encode(page))
+        future.add_done_callback(lambda f, number=number: tracker.page_done(number, f))
@@ -0,0 +1,114 @@
+"""Webhook delivery decoupled from parsing.
+
+Workers hand finished payloads to :data:`dispatcher` and move on to the
+next job.  A fixed number of sender threads deliver them through one
+``requests.Session`` whose connection pool keeps the TLS connections to the
+webhook alive, so each delivery costs one round trip instead of a new
+handshake.  The send queue is bounded: when the webhook falls behind,
+``submit`` blocks and the workers stop pulling new jobs.
+"""
+
+from __future__ import annotations
+
+import os
+import queue
+import threading
+from concurrent.futures import Future
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Deliveries in flight at the same time (sender threads / pooled connections).
+CONCURRENCY = int(os.getenv('WEBHOOK_CONCURRENCY', '8'))
+# Payloads waiting to be sent before ``submit`` blocks.
+QUEUE_SIZE = int(os.getenv('WEBHOOK_QUEUE_SIZE', '100'))
+TIMEOUT = float(os.getenv('WEBHOOK_TIMEOUT', '10'))
+
+
+class WebhookDispatcher:
+    """Deliver webhook requests from a bounded queue over pooled connections."""
+
+    def __init__(self, concurrency: int = CONCURRENCY, queue_size: int = QUEUE_SIZE,
+                 timeout: float = TIMEOUT) -> None:
+        self.concurrency = max(concurrency, 1)
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.concurrency, pool_block=True)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.queue: 'queue.Queue[tuple[Future, str, dict]]' = queue.Queue(maxsize=queue_size)
+        self.threads: list[threading.Thread] = []
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._sent = 0
+        self._errors = 0
+
+    def start(self) -> None:
+        """Start the sender threads (once)."""
+        with self._lock:
+            if self.threads:
+                return
+            self.threads = [
+                threading.Thread(target=self._run, daemon=True, name=f'webhook-sender-{i}')
+                for i in range(self.concurrency)
+            ]
+        for thread in self.threads:
+            thread.start()
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        """Send a request right away on the calling thread."""
+        kwargs.setdefault('timeout', self.timeout)
+        return self.session.post(url, **kwargs)
+
+    def submit(self, url: str, **kwargs) -> Future:
+        """Queue a POST to ``url`` and return a ``Future`` of its response.
+
+        ``kwargs`` are passed to ``requests``.  The future fails when the
+        request fails or the webhook answers ``429`` or ``5xx`` (an outage
+        worth retrying); retrying is up to the caller.
+        """
+        self.start()
+        future: Future = Future()
+        self.queue.put((future, url, kwargs))
+        return future
+
+    def stats(self) -> dict:
+        return {
+            'pending': self.queue.qsize(),
+            'in_flight': self._in_flight,
+            'sent': self._sent,
+            'errors': self._errors,
+            'concurrency': self.concurrency,
+        }
+
+    def _run(self) -> None:
+        while True:
+            future, url, kwargs = self.queue.get()
+            with self._lock:
+                self._in_flight += 1
+            try:
+                if not future.set_running_or_notify_cancel():
+                    continue
+                try:
+                    response = self.post(url, **kwargs)
+                    if response.status_code == 429 or response.status_code >= 500:
+                        raise requests.HTTPError(
+                            f"Webhook respondió {response.status_code}", response=response
+                        )
+                except Exception as e:
+                    with self._lock:
+                        self._errors += 1
+                    future.set_exception(e)
+                else:
+                    with self._lock:
+                        self._sent += 1
+                    future.set_result(response)
+            except Exception as e:
+                print(f">>> CRITICAL ERROR in webhook sender: {e}")
+            finally:
+                with self._lock:
+                    self._in_flight -= 1
+                self.queue.task_done()
+
+
+dispatcher = WebhookDispatcher()
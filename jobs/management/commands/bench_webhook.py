@@ -0,0 +1,76 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+from django.core.management.base import BaseCommand
+
+from jobs.dispatcher import WebhookDispatcher
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive
+    disable_nagle_algorithm = True
+    latency = 0.0
+    connections: set = set()
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        type(self).connections.add(self.client_address)
+        time.sleep(self.latency)
+        self.send_response(200)
+        self.send_header('Content-Length', '2')
+        self.end_headers()
+        self.wfile.write(b'ok')
+
+    def log_message(self, *args):
+        pass
+
+
+class Command(BaseCommand):
+    help = "Benchmark webhook delivery (bare requests.post vs. the dispatcher) against a local stub."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200)
+        parser.add_argument('--rows', type=int, default=200, help="Records per payload.")
+        parser.add_argument('--latency', type=float, default=20, help="Stub response time in ms.")
+        parser.add_argument('--concurrency', type=int, default=8)
+
+    def handle(self, *args, **options):
+        _StubHandler.latency = options['latency'] / 1000
+        server = ThreadingHTTPServer(('127.0.0.1', 0), _StubHandler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = f'http://127.0.0.1:{server.server_port}/'
+
+        payload = {
+            'bank_key': 'bench',
+            'file_name': 'bench.xlsx',
+            'data': [
+                {'Fecha': '01/01/2024', 'Descripcion': f'MOVIMIENTO {i}', 'importe_credito': '1000.00'}
+                for i in range(options['rows'])
+            ],
+        }
+        n = options['requests']
+
+        _StubHandler.connections = set()
+        start = time.perf_counter()
+        for _ in range(n):
+            requests.post(url, json=payload, timeout=10)
+        self._report('requests.post', n, time.perf_counter() - start)
+
+        _StubHandler.connections = set()
+        dispatcher = WebhookDispatcher(concurrency=options['concurrency'])
+        start = time.perf_counter()
+        futures = [dispatcher.submit(url, json=payload) for _ in range(n)]
+        for future in futures:
+            future.result()
+        self._report(f"dispatcher x{options['concurrency']}", n, time.perf_counter() - start)
+
+        server.shutdown()
+
+    def _report(self, label, n, elapsed):
+        self.stdout.write(
+            f"{label:<16} {n} requests in {elapsed:.2f}s "
+            f"({n / elapsed:.0f} req/s, {len(_StubHandler.connections)} connections)"
+        )
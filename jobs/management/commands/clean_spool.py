@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from jobs.spool import sweep
+
+
+class Command(BaseCommand):
+    help = (
+        "Remove spool files no unfinished job uses and the temporary files "
+        "of interrupted uploads."
+    )
+
+    def handle(self, *args, **options):
+        count = sweep()
+        self.stdout.write(f">>> {count} archivo(s) eliminado(s) del spool")
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from jobs import spool
+from jobs.queues import RESULT_TTL, purge
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete finished jobs older than JOBS_RESULT_TTL together with their "
+        "results, then remove the spool files no unfinished job uses."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--ttl', type=int, default=RESULT_TTL,
+                            help="Seconds finished jobs are kept (default: JOBS_RESULT_TTL).")
+        parser.add_argument('--kind', choices=['excel', 'pdf'])
+
+    def handle(self, *args, **options):
+        count = purge(ttl=options['ttl'], kind=options['kind'])
+        self.stdout.write(f">>> {count} trabajo(s) eliminado(s)")
+        files = spool.sweep()
+        self.stdout.write(f">>> {files} archivo(s) eliminado(s) del spool")
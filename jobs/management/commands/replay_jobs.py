@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from jobs.queues import replay
+
+
+class Command(BaseCommand):
+    help = "Queue failed (dead-letter) jobs again."
+
+    def add_arguments(self, parser):
+        parser.add_argument('ids', nargs='*', help="Job ids to replay.")
+        parser.add_argument('--kind', choices=['excel', 'pdf'])
+        parser.add_argument('--all', action='store_true', help="Replay every failed job.")
+
+    def handle(self, *args, **options):
+        if not options['ids'] and not options['all']:
+            raise CommandError("Indique los ids de los trabajos o --all")
+        count = replay(ids=options['ids'] or None, kind=options['kind'])
+        self.stdout.write(f">>> {count} trabajo(s) reencolado(s)")
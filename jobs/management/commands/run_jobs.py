@@ -0,0 +1,28 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from jobs.workers import KINDS, start_workers
+
+
+class Command(BaseCommand):
+    help = (
+        "Run the background workers on this node. Use together with "
+        "JOBS_WORKERS_ENABLED=false on the web processes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--kind', action='append', choices=KINDS,
+            help="Job kinds to process (default: all).",
+        )
+
+    def handle(self, *args, **options):
+        kinds = start_workers(options['kind'])
+        self.stdout.write(f">>> JOB WORKERS RUNNING: {', '.join(kinds)}")
+
+        try:
+            while True:
+                time.sleep(60)
+        except KeyboardInterrupt:
+            self.stdout.write(">>> JOB WORKERS STOPPED")
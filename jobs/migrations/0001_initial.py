@@ -0,0 +1,40 @@
+# Generated by Django 4.2.10 on 2026-10-18 04:24
+
+from django.db import migrations, models
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Job',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('kind', models.CharField(max_length=32)),
+                ('file_name', models.CharField(max_length=255)),
+                ('data', models.BinaryField(null=True)),
+                ('spool_path', models.CharField(blank=True, default='', max_length=500)),
+                ('size', models.BigIntegerField(default=0)),
+                ('params', models.JSONField(blank=True, default=dict)),
+                ('state', models.CharField(choices=[('queued', 'En cola'), ('running', 'Procesando'), ('done', 'Completado'), ('failed', 'Fallido')], default='queued', max_length=16)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('error', models.TextField(blank=True, default='')),
+                ('locked_by', models.CharField(blank=True, default='', max_length=255)),
+                ('locked_until', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'ordering': ['created_at'],
+                'indexes': [models.Index(fields=['kind', 'state', 'created_at'], name='jobs_job_claim_idx')],
+            },
+        ),
+    ]
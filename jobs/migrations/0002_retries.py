@@ -0,0 +1,23 @@
+# Generated by Django 4.2.10 on 2026-10-18 04:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='run_after',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='job',
+            name='state',
+            field=models.CharField(choices=[('queued', 'En cola'), ('running', 'Procesando'), ('retrying', 'Reintentando'), ('done', 'Completado'), ('failed', 'Fallido')], default='queued', max_length=16),
+        ),
+    ]
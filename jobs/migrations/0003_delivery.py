@@ -0,0 +1,28 @@
+# Generated by Django 4.2.10 on 2026-10-18 04:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0002_retries'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='pages_delivered',
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='pages_total',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='result',
+            field=models.BinaryField(null=True),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 4.2.10 on 2026-10-18 05:02
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0003_delivery'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='parent',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='children', to='jobs.job'),
+        ),
+    ]
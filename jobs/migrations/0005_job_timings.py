@@ -0,0 +1,23 @@
+# Generated by Django 4.2.10 on 2026-10-18 05:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0004_batches'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='parse_seconds',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='parsed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,75 @@
+import uuid
+from io import BytesIO
+
+from django.db import models
+
+
+class Job(models.Model):
+    """A file waiting to be (or being) processed by a background worker."""
+
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    RETRYING = 'retrying'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATES = [
+        (QUEUED, 'En cola'),
+        (RUNNING, 'Procesando'),
+        (RETRYING, 'Reintentando'),
+        (DONE, 'Completado'),
+        (FAILED, 'Fallido'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    kind = models.CharField(max_length=32)
+    # Archive (batch job) the file was extracted from
+    parent = models.ForeignKey('self', null=True, blank=True, on_delete=models.SET_NULL,
+                               related_name='children')
+    file_name = models.CharField(max_length=255)
+    data = models.BinaryField(null=True)
+    spool_path = models.CharField(max_length=500, blank=True, default='')
+    size = models.BigIntegerField(default=0)
+    params = models.JSONField(default=dict, blank=True)
+    state = models.CharField(max_length=16, choices=STATES, default=QUEUED)
+    attempts = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True, default='')
+    result = models.BinaryField(null=True)
+    # When the parsed result was stored and how long parsing took
+    parsed_at = models.DateTimeField(null=True, blank=True)
+    parse_seconds = models.FloatField(null=True, blank=True)
+    pages_total = models.PositiveIntegerField(default=0)
+    pages_delivered = models.JSONField(default=list, blank=True)
+    locked_by = models.CharField(max_length=255, blank=True, default='')
+    locked_until = models.DateTimeField(null=True, blank=True)
+    run_after = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['kind', 'state', 'created_at'], name='jobs_job_claim_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.kind}:{self.file_name} ({self.state})'
+
+    def payload(self) -> bytes:
+        """Return the uploaded file contents."""
+        if self.spool_path:
+            with open(self.spool_path, 'rb') as f:
+                return f.read()
+        return bytes(self.data or b'')
+
+    def source(self) -> str | bytes:
+        """Return the spool file path, or the contents when the file is
+        stored in the row (for code that opens the file itself)."""
+        return self.spool_path or bytes(self.data or b'')
+
+    def open(self):
+        """Open the uploaded file for reading without loading it first."""
+        if self.spool_path:
+            return open(self.spool_path, 'rb')
+        return BytesIO(bytes(self.data or b''))
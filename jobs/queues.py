@@ -0,0 +1,423 @@
+"""Durable job queues stored in the ``jobs_job`` table.
+
+Every gunicorn process and every worker node shares the same table, so
+pending files survive restarts and any number of consumers can pull work.
+On PostgreSQL a job is claimed with ``SELECT ... FOR UPDATE SKIP LOCKED``;
+backends without ``SKIP LOCKED`` (SQLite, used for local testing) claim
+with a conditional ``UPDATE`` instead.
+
+A claimed job is leased for ``JOBS_LEASE_SECONDS`` to the claim recorded
+in ``locked_by``.  While the job is parsed and delivered, a heartbeat
+thread of its queue renews the lease every third of it; when its worker
+dies without finishing it, the lease expires and another worker picks it
+up.  The outcome is only written while the claim still holds the job, so
+a worker that lost its lease cannot overwrite the new owner's.
+
+Failed jobs are rescheduled according to :mod:`jobs.retry`; once their
+retries are exhausted they stay in the table as ``failed`` together with
+their file, which makes the ``failed`` rows the dead-letter store that
+:func:`replay` puts back in the queue.  ``done`` jobs keep their parsed
+result (``jobs/<id>/result/``) for ``JOBS_RESULT_TTL`` seconds, after
+which :func:`purge` deletes them.
+
+A queue may be bounded by the number and total size of its unfinished
+jobs.  :meth:`JobQueue.admit` raises :class:`QueueFull` past those limits,
+with the seconds the queue needs to drain enough work at the rate it
+finished jobs over the last ``JOBS_DRAIN_WINDOW`` seconds; the upload
+views turn it into ``429 Too Many Requests`` with ``Retry-After``.
+"""
+
+from __future__ import annotations
+
+import gzip
+import json
+import math
+import os
+import socket
+import threading
+import time
+import uuid
+from datetime import timedelta
+
+from django.db import close_old_connections, connection, transaction
+from django.db.models import Count, F, Q, Sum
+from django.utils import timezone
+
+from common.archives import iter_members
+
+from . import spool
+from .models import Job
+from .retry import DEFAULT_POLICIES, RetryPolicy, policy_for
+
+# Seconds an idle consumer waits before polling the table again.
+POLL_INTERVAL = float(os.getenv('JOBS_POLL_INTERVAL', '1'))
+# Seconds a claimed job stays reserved for its worker.
+LEASE_SECONDS = int(os.getenv('JOBS_LEASE_SECONDS', '900'))
+# Start the consumer threads in the web processes (see jobs.workers; disable
+# on web-only nodes and run ``manage.py run_jobs`` on worker nodes instead).
+WORKERS_ENABLED = os.getenv('JOBS_WORKERS_ENABLED', 'true').lower() == 'true'
+# Kind suffix of the parent jobs recording an uploaded archive.
+BATCH_SUFFIX = ':zip'
+# Seconds of finished jobs used to estimate how fast a full queue drains.
+DRAIN_WINDOW = int(os.getenv('JOBS_DRAIN_WINDOW', '300'))
+# Bounds of the ``Retry-After`` suggested when a queue is full.
+MIN_RETRY_AFTER = 1
+MAX_RETRY_AFTER = int(os.getenv('JOBS_MAX_RETRY_AFTER', '600'))
+# Seconds finished jobs and their results are kept (0 keeps them forever).
+RESULT_TTL = int(os.getenv('JOBS_RESULT_TTL', str(7 * 24 * 3600)))
+
+
+class QueueFull(Exception):
+    """The queue is over its job or byte limit; retry after ``retry_after``
+    seconds."""
+
+    def __init__(self, kind: str, retry_after: int) -> None:
+        super().__init__(f'La cola "{kind}" está llena; reintente en {retry_after} s')
+        self.kind = kind
+        self.retry_after = retry_after
+
+
+def worker_id() -> str:
+    return f'{socket.gethostname()}:{os.getpid()}:{threading.current_thread().name}'
+
+
+def _size(data) -> int:
+    if isinstance(data, (bytes, bytearray)):
+        return len(data)
+    return getattr(data, 'size', None) or 0
+
+
+class JobQueue:
+    """Queue of the jobs of one ``kind``, with a ``queue.Queue``-like API.
+
+    ``max_jobs`` and ``max_bytes`` bound the unfinished (queued, running or
+    retrying) jobs accepted by :meth:`admit`; ``0`` means no limit.
+    """
+
+    def __init__(self, kind: str, poll_interval: float = POLL_INTERVAL,
+                 lease: int = LEASE_SECONDS, policies: dict[type, RetryPolicy] | None = None,
+                 max_jobs: int = 0, max_bytes: int = 0) -> None:
+        self.kind = kind
+        self.max_jobs = max_jobs
+        self.max_bytes = max_bytes
+        self.poll_interval = poll_interval
+        self.lease = lease
+        self.policies = {**DEFAULT_POLICIES, **(policies or {})}
+        # Wakes local consumers right away when this process enqueues
+        self._wakeup = threading.Event()
+        # Claims (``locked_by``) of the jobs this process holds, renewed by
+        # the heartbeat thread until ``task_done``
+        self._held: set[str] = set()
+        self._held_lock = threading.Lock()
+        self._heartbeat: threading.Thread | None = None
+
+    def _pending(self):
+        return Job.objects.filter(kind=self.kind, state__in=(Job.QUEUED, Job.RUNNING, Job.RETRYING))
+
+    def load(self) -> dict:
+        """Unfinished jobs and their total size."""
+        totals = self._pending().aggregate(jobs=Count('pk'), bytes=Sum('size'))
+        return {'jobs': totals['jobs'], 'bytes': totals['bytes'] or 0}
+
+    def drain_rate(self, window: int = DRAIN_WINDOW) -> dict:
+        """Jobs and bytes finished per second over the last ``window`` seconds."""
+        since = timezone.now() - timedelta(seconds=window)
+        totals = (
+            Job.objects.filter(kind=self.kind, finished_at__gte=since)
+            .aggregate(jobs=Count('pk'), bytes=Sum('size'))
+        )
+        return {'jobs': totals['jobs'] / window, 'bytes': (totals['bytes'] or 0) / window}
+
+    def admit(self, jobs: int = 1, size: int = 0) -> None:
+        """Raise :class:`QueueFull` if ``jobs`` more jobs of ``size`` bytes
+        would exceed the queue limits.
+
+        ``ValueError`` is raised when ``size`` alone is over ``max_bytes``,
+        since waiting would not help.
+        """
+        if not self.max_jobs and not self.max_bytes:
+            return
+        if self.max_bytes and size > self.max_bytes:
+            raise ValueError(f'El archivo ({size} bytes) supera el límite de la cola ({self.max_bytes} bytes)')
+        load = self.load()
+        excess = {
+            'jobs': load['jobs'] + jobs - self.max_jobs if self.max_jobs else 0,
+            'bytes': load['bytes'] + size - self.max_bytes if self.max_bytes else 0,
+        }
+        if max(excess.values()) <= 0:
+            return
+        rate = self.drain_rate()
+        waits = [
+            excess[key] / rate[key] if rate[key] else MAX_RETRY_AFTER
+            for key in excess if excess[key] > 0
+        ]
+        retry_after = min(max(math.ceil(max(waits)), MIN_RETRY_AFTER), MAX_RETRY_AFTER)
+        raise QueueFull(self.kind, retry_after)
+
+    def limits(self) -> dict:
+        """Limits, current load and drain rate, for the status endpoints."""
+        rate = self.drain_rate()
+        return {
+            'max_jobs': self.max_jobs,
+            'max_bytes': self.max_bytes,
+            'pending': self.load(),
+            'drain_per_second': {key: round(value, 3) for key, value in rate.items()},
+        }
+
+    def put(self, file_name: str, data, params: dict | None = None,
+            parent: Job | None = None, admit: bool = True) -> Job:
+        """Enqueue ``data`` (bytes or a readable file such as a Django upload).
+
+        The file is streamed into the :mod:`jobs.spool` and the job only
+        references it; without a spool directory it is stored in the row.
+        Unless ``admit`` is false, :meth:`admit` checks the limits first.
+        """
+        if admit:
+            self.admit(1, _size(data))
+        pin = None
+        if spool.enabled():
+            spool_path, size, pin = spool.store(data)
+            data = None
+        else:
+            if not isinstance(data, (bytes, bytearray)):
+                data.seek(0)
+                data = data.read()
+            spool_path, size = '', len(data)
+        job = Job.objects.create(
+            kind=self.kind,
+            file_name=file_name,
+            data=data,
+            spool_path=spool_path,
+            size=size,
+            params=params or {},
+            parent=parent,
+        )
+        if pin:
+            # Once other processes can see the job (see jobs.spool)
+            transaction.on_commit(lambda: spool.unpin(spool_path, pin))
+        self._wakeup.set()
+        return job
+
+    def put_archive(self, file, file_name: str, extensions: tuple[str, ...],
+                    params: dict | None = None) -> tuple[Job, list[Job]]:
+        """Enqueue the members of the ZIP ``file`` and return ``(batch, jobs)``.
+
+        ``batch`` is a parent job (kind ``<kind>:zip``, never claimed) that
+        records the archive; every member becomes a regular job pointing to
+        it.  Members are extracted one at a time and consumers start on them
+        while the rest of the archive is still being read.  ``ValueError``
+        is raised for invalid archives; members enqueued before the error
+        stay queued.
+        """
+        # The archive is admitted as a whole; its members are not refused halfway
+        self.admit(1, _size(file))
+        now = timezone.now()
+        batch = Job.objects.create(
+            kind=f'{self.kind}{BATCH_SUFFIX}',
+            file_name=file_name,
+            size=getattr(file, 'size', 0) or 0,
+            params=params or {},
+            state=Job.RUNNING,
+            started_at=now,
+        )
+        jobs = []
+        try:
+            for name, data in iter_members(file, extensions):
+                jobs.append(self.put(name, data, params, parent=batch, admit=False))
+        except Exception as e:
+            batch.state = Job.FAILED
+            batch.error = str(e)
+            raise
+        else:
+            batch.state = Job.DONE
+        finally:
+            batch.finished_at = timezone.now()
+            batch.save(update_fields=['state', 'error', 'finished_at', 'updated_at'])
+        return batch, jobs
+
+    def get(self) -> Job:
+        """Block until a job can be claimed and return it."""
+        while True:
+            close_old_connections()
+            try:
+                job = self.claim()
+            except Exception as e:
+                print(f">>> JOB QUEUE ERROR ({self.kind}): {e}")
+                connection.close()
+                job = None
+            if job is not None:
+                self._hold(job)
+                return job
+            self._wakeup.wait(self.poll_interval)
+            self._wakeup.clear()
+
+    def _hold(self, job: Job) -> None:
+        with self._held_lock:
+            self._held.add(job.locked_by)
+            if self._heartbeat is None:
+                self._heartbeat = threading.Thread(target=self._renew_leases, daemon=True,
+                                                   name=f'{self.kind}-heartbeat')
+                self._heartbeat.start()
+
+    def _renew_leases(self) -> None:
+        while True:
+            time.sleep(self.lease / 3)
+            with self._held_lock:
+                held = list(self._held)
+            if not held:
+                continue
+            close_old_connections()
+            try:
+                self.heartbeat(held)
+            except Exception as e:
+                print(f">>> JOB HEARTBEAT ERROR ({self.kind}): {e}")
+
+    def heartbeat(self, claims) -> int:
+        """Extend the lease of the running jobs claimed as ``claims``
+        (``locked_by`` values); return how many are still held."""
+        now = timezone.now()
+        return Job.objects.filter(locked_by__in=claims, state=Job.RUNNING).update(
+            locked_until=now + timedelta(seconds=self.lease), updated_at=now,
+        )
+
+    def _claimable(self, now):
+        return Job.objects.filter(kind=self.kind).filter(
+            Q(state=Job.QUEUED)
+            | Q(state=Job.RETRYING, run_after__lte=now)
+            | Q(state=Job.RUNNING, locked_until__lt=now)
+        ).order_by('created_at')
+
+    def claim(self) -> Job | None:
+        """Reserve the oldest available job, or return ``None``."""
+        now = timezone.now()
+        changes = {
+            'state': Job.RUNNING,
+            # Unique per claim: a thread may claim its own expired job again
+            'locked_by': f'{worker_id()}:{uuid.uuid4().hex[:12]}',
+            'locked_until': now + timedelta(seconds=self.lease),
+            'started_at': now,
+        }
+
+        if connection.features.has_select_for_update_skip_locked:
+            with transaction.atomic():
+                job = self._claimable(now).select_for_update(skip_locked=True).first()
+                if job is None:
+                    return None
+                for field, value in changes.items():
+                    setattr(job, field, value)
+                job.attempts += 1
+                job.save(update_fields=[*changes, 'attempts', 'updated_at'])
+                return job
+
+        candidates = self._claimable(now).values_list('pk', 'state', 'locked_until')[:10]
+        for pk, state, locked_until in candidates:
+            claimed = Job.objects.filter(pk=pk, state=state, locked_until=locked_until).update(
+                attempts=F('attempts') + 1, updated_at=now, **changes
+            )
+            if claimed:
+                return Job.objects.get(pk=pk)
+        return None
+
+    def save_result(self, job: Job, payload: dict) -> None:
+        """Store the parsed ``payload`` (gzip JSON) so retries skip parsing."""
+        body = json.dumps(payload, ensure_ascii=False, separators=(',', ':'), default=str)
+        job.result = gzip.compress(body.encode('utf-8'), compresslevel=5)
+        job.parsed_at = timezone.now()
+        job.parse_seconds = round((job.parsed_at - job.started_at).total_seconds(), 3) if job.started_at else None
+        Job.objects.filter(pk=job.pk, locked_by=job.locked_by).update(
+            result=job.result, parsed_at=job.parsed_at, parse_seconds=job.parse_seconds,
+            updated_at=job.parsed_at,
+        )
+
+    def load_result(self, job: Job) -> dict | None:
+        """Return the payload stored by :meth:`save_result`, if any."""
+        if not job.result:
+            return None
+        return json.loads(gzip.decompress(bytes(job.result)))
+
+    def task_done(self, job: Job, error: BaseException | None = None) -> str | None:
+        """Record the outcome of ``job`` and return its new state.
+
+        Without ``error`` the job is ``done``.  Otherwise it is scheduled
+        for another attempt when its retry policy allows it, or left as
+        ``failed`` (dead letter) with its file kept for :func:`replay`.
+
+        Returns ``None`` and records nothing when the lease was lost and
+        another worker claimed the job in the meantime.
+        """
+        with self._held_lock:
+            self._held.discard(job.locked_by)
+        now = timezone.now()
+        changes = {'locked_until': None, 'error': str(error) if error else '', 'updated_at': now}
+        if error is None:
+            changes['state'] = Job.DONE
+            changes['finished_at'] = now
+            # The file is no longer needed once processed
+            changes['data'] = None
+        else:
+            policy = policy_for(error, self.policies)
+            if job.attempts <= policy.retries:
+                changes['state'] = Job.RETRYING
+                changes['run_after'] = now + timedelta(seconds=policy.delay(job.attempts))
+            else:
+                changes['state'] = Job.FAILED
+                changes['finished_at'] = now
+        if not Job.objects.filter(pk=job.pk, locked_by=job.locked_by).update(**changes):
+            print(f">>> JOB {job.pk} LEASE LOST: outcome not recorded")
+            return None
+        for field, value in changes.items():
+            setattr(job, field, value)
+        if job.state == Job.DONE and job.spool_path:
+            try:
+                spool.release(job.spool_path)
+            except Exception as e:
+                print(f">>> SPOOL RELEASE ERROR ({job.spool_path}): {e}")
+        return job.state
+
+    def qsize(self) -> int:
+        return Job.objects.filter(kind=self.kind, state=Job.QUEUED).count()
+
+    def stats(self) -> dict:
+        """Job counts per state, across every process and node."""
+        counts = dict(
+            Job.objects.filter(kind=self.kind)
+            .order_by()
+            .values_list('state')
+            .annotate(n=Count('pk'))
+            .values_list('state', 'n')
+        )
+        return {state: counts.get(state, 0) for state, _ in Job.STATES}
+
+
+def replay(ids=None, kind: str | None = None) -> int:
+    """Put dead-letter (``failed``) jobs back in the queue.
+
+    ``ids`` limits the replay to those jobs; ``kind`` to one queue.  Returns
+    the number of jobs queued again.
+    """
+    # Batch jobs only record an archive; there is nothing to run again
+    jobs = Job.objects.filter(state=Job.FAILED).exclude(kind__endswith=BATCH_SUFFIX)
+    if ids is not None:
+        jobs = jobs.filter(pk__in=ids)
+    if kind:
+        jobs = jobs.filter(kind=kind)
+    return jobs.update(
+        state=Job.QUEUED, attempts=0, error='', run_after=None,
+        finished_at=None, updated_at=timezone.now(),
+    )
+
+
+def purge(ttl: int = RESULT_TTL, kind: str | None = None) -> int:
+    """Delete the ``done`` jobs finished more than ``ttl`` seconds ago,
+    with their stored results; ``kind`` limits it to one queue (and its
+    archives).  Returns the number of jobs deleted.
+
+    Failed jobs are kept for :func:`replay`.
+    """
+    if ttl <= 0:
+        return 0
+    jobs = Job.objects.filter(state=Job.DONE, finished_at__lt=timezone.now() - timedelta(seconds=ttl))
+    if kind:
+        jobs = jobs.filter(Q(kind=kind) | Q(kind=kind + BATCH_SUFFIX))
+    count, _ = jobs.delete()
+    return count
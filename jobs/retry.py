@@ -0,0 +1,52 @@
+"""Retry policies for failed jobs.
+
+A failed job is not retried inline: it goes back to the table as
+``retrying`` with a ``run_after`` computed here (exponential backoff with
+jitter), so the worker moves on to the next job immediately.  The policy is
+chosen by the class of the error, most specific class first.
+"""
+
+from __future__ import annotations
+
+import os
+import random
+from dataclasses import dataclass
+
+import requests
+
+BASE_DELAY = float(os.getenv('JOBS_RETRY_BASE_DELAY', '2'))
+MAX_DELAY = float(os.getenv('JOBS_RETRY_MAX_DELAY', '300'))
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    retries: int
+    base: float = BASE_DELAY
+    cap: float = MAX_DELAY
+
+    def delay(self, attempt: int) -> float:
+        """Seconds to wait before retry number ``attempt`` (1-based)."""
+        ceiling = min(self.cap, self.base * 2 ** (attempt - 1))
+        # "Equal jitter": never less than half the backoff, spread the rest
+        return ceiling / 2 + random.uniform(0, ceiling / 2)
+
+
+NO_RETRY = RetryPolicy(retries=0)
+
+# Webhook outages and network errors are worth waiting for; invalid input
+# (missing columns, unknown bank, ...) fails the same way every time;
+# anything else gets the historical three attempts.
+DEFAULT_POLICIES: dict[type, RetryPolicy] = {
+    requests.ConnectionError: RetryPolicy(retries=6),
+    requests.Timeout: RetryPolicy(retries=6),
+    requests.HTTPError: RetryPolicy(retries=6),
+    ValueError: NO_RETRY,
+    Exception: RetryPolicy(retries=2),
+}
+
+
+def policy_for(error: BaseException, policies: dict[type, RetryPolicy]) -> RetryPolicy:
+    for cls in type(error).__mro__:
+        if cls in policies:
+            return policies[cls]
+    return NO_RETRY
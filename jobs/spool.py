@@ -0,0 +1,172 @@
+"""Content-addressed spool of the files waiting in the job queues.
+
+Uploads are streamed into ``JOBS_SPOOL_DIR`` while their SHA-256 is
+computed and stored as ``<dir>/<digest[:2]>/<digest>``; the job row only
+keeps the path, so queued files cost disk space instead of memory in the
+web processes and the database.  Identical uploads share one file, which is
+removed as soon as its last unfinished job is done (``failed`` jobs keep it
+for :func:`jobs.queues.replay`).
+
+A file can be released while an identical upload is being enqueued, before
+its job row exists.  :func:`store` therefore returns a *pin*, a hard link to
+the same bytes that :func:`unpin` turns back into the file if it was
+removed in the meantime, and :func:`release` moves the file aside before
+checking the jobs a second time.
+
+Web and worker nodes must see the same directory (e.g. a shared volume).
+``JOBS_SPOOL_DIR=`` (empty) stores the files in the ``jobs_job`` table as
+before.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import os
+import shutil
+import tempfile
+import time
+import uuid
+from typing import Iterator
+
+from django.conf import settings
+
+SPOOL_DIR = os.getenv('JOBS_SPOOL_DIR', str(settings.BASE_DIR / 'spool'))
+# Age after which :func:`sweep` removes temporary and pin files left behind
+# by interrupted uploads.
+GRACE_SECONDS = int(os.getenv('JOBS_SPOOL_GRACE_SECONDS', '300'))
+CHUNK_SIZE = 1024 * 1024
+
+_TEMP_PREFIX = '.upload-'
+_RELEASE_PREFIX = '.release-'
+
+
+def enabled() -> bool:
+    return bool(SPOOL_DIR)
+
+
+def _chunks(source) -> Iterator[bytes]:
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        yield bytes(source)
+        return
+    if hasattr(source, 'seek'):
+        source.seek(0)
+    if hasattr(source, 'chunks'):
+        # Django uploads (in memory or in a temporary file)
+        yield from source.chunks(CHUNK_SIZE)
+        return
+    yield from iter(lambda: source.read(CHUNK_SIZE), b'')
+
+
+def store(source) -> tuple[str, int, str]:
+    """Write ``source`` (bytes or a readable file) to the spool and return
+    ``(path, size, pin)``.
+
+    Call :func:`unpin` with ``pin`` once the job referencing ``path`` is
+    committed.
+    """
+    os.makedirs(SPOOL_DIR, exist_ok=True)
+    digest = hashlib.sha256()
+    size = 0
+    fd, temp = tempfile.mkstemp(dir=SPOOL_DIR, prefix=_TEMP_PREFIX)
+    try:
+        with os.fdopen(fd, 'wb') as out:
+            for chunk in _chunks(source):
+                digest.update(chunk)
+                out.write(chunk)
+                size += len(chunk)
+        name = digest.hexdigest()
+        folder = os.path.join(SPOOL_DIR, name[:2])
+        os.makedirs(folder, exist_ok=True)
+        path = os.path.join(folder, name)
+        _link(temp, path)
+    except BaseException:
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(temp)
+        raise
+    return path, size, temp
+
+
+def _link(pin: str, path: str) -> None:
+    """Make ``path`` a copy of ``pin`` unless it exists (same name, same bytes)."""
+    try:
+        os.link(pin, path)
+    except FileExistsError:
+        pass
+    except OSError:
+        # Volumes without hard links
+        fd, copy = tempfile.mkstemp(dir=SPOOL_DIR, prefix=_TEMP_PREFIX)
+        os.close(fd)
+        shutil.copyfile(pin, copy)
+        os.replace(copy, path)
+
+
+def unpin(path: str, pin: str) -> None:
+    """Drop the ``pin`` returned by :func:`store`, restoring ``path`` from it
+    if the file was released before its job was committed."""
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        _link(pin, path)
+    with contextlib.suppress(FileNotFoundError):
+        os.unlink(pin)
+
+
+def _in_use(path: str) -> bool:
+    from .models import Job
+
+    return Job.objects.filter(spool_path=path).exclude(state=Job.DONE).exists()
+
+
+def _expired(path: str, now: float) -> bool:
+    try:
+        return now - os.stat(path).st_mtime > GRACE_SECONDS
+    except FileNotFoundError:
+        return False
+
+
+def release(path: str) -> bool:
+    """Delete the spool file ``path`` when no unfinished job uses it.
+
+    Returns ``True`` when the file was removed.
+    """
+    if not path or _in_use(path):
+        return False
+    # Move the file aside, then check again: a job committed in between
+    # gets its file back (and a later one restores it from its pin)
+    aside = os.path.join(os.path.dirname(path), f'{_RELEASE_PREFIX}{os.path.basename(path)}-{uuid.uuid4().hex}')
+    try:
+        os.rename(path, aside)
+    except FileNotFoundError:
+        return False
+    if _in_use(path):
+        os.replace(aside, path)
+        return False
+    os.unlink(aside)
+    return True
+
+
+def sweep() -> int:
+    """Remove the spool files no unfinished job uses, and the temporary,
+    pin and released files interrupted uploads left behind; return how
+    many were removed."""
+    if not enabled() or not os.path.isdir(SPOOL_DIR):
+        return 0
+    now = time.time()
+    removed = 0
+    for folder, _, names in os.walk(SPOOL_DIR):
+        for name in names:
+            path = os.path.join(folder, name)
+            if name.startswith(_RELEASE_PREFIX):
+                # Interrupted release(): put the file back if a job needs it
+                original = os.path.join(folder, name[len(_RELEASE_PREFIX):].rsplit('-', 1)[0])
+                if not os.path.exists(original) and _in_use(original):
+                    os.replace(path, original)
+                    continue
+            elif not name.startswith(_TEMP_PREFIX):
+                removed += release(path)
+                continue
+            if _expired(path, now):
+                with contextlib.suppress(FileNotFoundError):
+                    os.unlink(path)
+                    removed += 1
+    return removed
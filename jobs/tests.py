@@ -0,0 +1,65 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase
+from django.utils import timezone
+
+from . import spool
+from .models import Job
+from .queues import JobQueue
+
+
+@mock.patch.object(spool, 'SPOOL_DIR', '')
+class LeaseTests(TestCase):
+
+    def setUp(self):
+        self.queue = JobQueue('excel', lease=60)
+        self.queue.put('a.csv', b'a,b\n1,2\n')
+
+    def expire(self, job: Job) -> None:
+        Job.objects.filter(pk=job.pk).update(locked_until=timezone.now() - timedelta(seconds=1))
+
+    def test_outcome_of_lost_lease_not_recorded(self):
+        first = self.queue.claim()
+        self.expire(first)
+        # Claimed again, here even by the same thread
+        second = self.queue.claim()
+        self.assertEqual(second.pk, first.pk)
+        self.assertNotEqual(second.locked_by, first.locked_by)
+
+        self.queue.save_result(first, {'data': ['old']})
+        self.assertIsNone(self.queue.task_done(first, RuntimeError('late')))
+        job = Job.objects.get(pk=first.pk)
+        self.assertEqual((job.state, job.error, job.attempts), (Job.RUNNING, '', 2))
+        self.assertIsNone(job.result)
+
+        self.queue.save_result(second, {'data': ['new']})
+        self.assertEqual(self.queue.task_done(second), Job.DONE)
+        job = Job.objects.get(pk=first.pk)
+        self.assertEqual(job.state, Job.DONE)
+        self.assertEqual(self.queue.load_result(job), {'data': ['new']})
+
+    def test_failed_outcome(self):
+        job = self.queue.claim()
+        self.assertEqual(self.queue.task_done(job, RuntimeError('boom')), Job.RETRYING)
+        job = Job.objects.get(pk=job.pk)
+        self.assertEqual((job.state, job.error), (Job.RETRYING, 'boom'))
+        self.assertIsNotNone(job.run_after)
+        self.assertIsNone(job.locked_until)
+
+    def test_heartbeat_extends_lease(self):
+        job = self.queue.claim()
+        self.expire(job)
+        self.assertEqual(self.queue.heartbeat([job.locked_by]), 1)
+        self.assertGreater(Job.objects.get(pk=job.pk).locked_until, timezone.now() + timedelta(seconds=50))
+        self.assertIsNone(self.queue.claim())
+
+        self.queue.task_done(job)
+        self.assertEqual(self.queue.heartbeat([job.locked_by]), 0)
+
+    def test_get_holds_job_until_done(self):
+        job = self.queue.get()
+        self.assertEqual(self.queue._held, {job.locked_by})
+        self.assertTrue(self.queue._heartbeat.is_alive())
+        self.queue.task_done(job)
+        self.assertEqual(self.queue._held, set())
@@ -0,0 +1,13 @@
+from django.urls import path
+
+from .views import DeadLetterReplayView, DeadLetterView, JobDetailView, JobListView, JobResultView
+
+app_name = 'jobs'
+
+urlpatterns = [
+    path('', JobListView.as_view(), name='job_list'),
+    path('<uuid:job_id>/', JobDetailView.as_view(), name='job_detail'),
+    path('<uuid:job_id>/result/', JobResultView.as_view(), name='job_result'),
+    path('dead-letter/', DeadLetterView.as_view(), name='dead_letter'),
+    path('dead-letter/replay/', DeadLetterReplayView.as_view(), name='dead_letter_replay'),
+]
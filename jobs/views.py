@@ -0,0 +1,209 @@
+import gzip
+import hashlib
+import uuid
+
+from django.db.models import BooleanField, Count, ExpressionWrapper, Q
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .models import Job
+from .queues import BATCH_SUFFIX, replay
+
+# Jobs per request of the list endpoint (``?ids=``).
+MAX_LIST_JOBS = 100
+
+
+def _jobs():
+    """Jobs without their file or result, flagging whether a result is stored."""
+    return Job.objects.defer('data', 'result').annotate(
+        has_result=ExpressionWrapper(Q(result__isnull=False), output_field=BooleanField())
+    )
+
+
+def _seconds(start, end):
+    return round((end - start).total_seconds(), 3) if start and end else None
+
+
+def describe(job: Job) -> dict:
+    """Return the state, attempts and stage timings (seconds) of ``job``.
+
+    ``waiting`` runs from the upload to the start of the last attempt,
+    ``parsing`` is the parse that produced the stored result and
+    ``delivery`` runs from then (or the start of the attempt, for files
+    sent unparsed) to the end of the job.
+    """
+    done = job.state == Job.DONE
+    info = {
+        'id': str(job.pk),
+        'kind': job.kind,
+        'file_name': job.file_name,
+        'state': job.state,
+        'attempts': job.attempts,
+        'error': job.error,
+        'size': job.size,
+        'parent': str(job.parent_id) if job.parent_id else None,
+        'has_result': bool(getattr(job, 'has_result', job.result)),
+        'pages': {'total': job.pages_total, 'delivered': len(job.pages_delivered)},
+        'created_at': job.created_at,
+        'started_at': job.started_at,
+        'parsed_at': job.parsed_at,
+        'finished_at': job.finished_at,
+        'run_after': job.run_after if job.state == Job.RETRYING else None,
+        'timings': {
+            'waiting': _seconds(job.created_at, job.started_at),
+            'parsing': job.parse_seconds,
+            'delivery': _seconds(job.parsed_at or job.started_at, job.finished_at) if done else None,
+            'total': _seconds(job.created_at, job.finished_at),
+        },
+    }
+    if job.kind.endswith(BATCH_SUFFIX):
+        counts = dict(job.children.order_by().values_list('state').annotate(n=Count('pk')))
+        info['children'] = {state: counts.get(state, 0) for state, _ in Job.STATES}
+    return info
+
+
+def _etag(job: Job) -> str:
+    version = f'{job.state}:{job.attempts}:{job.updated_at.isoformat()}:{len(job.pages_delivered)}'
+    return '"%s"' % hashlib.md5(version.encode()).hexdigest()
+
+
+def _parse_ids(text: str) -> list[str]:
+    ids = [i.strip() for i in text.split(',') if i.strip()]
+    for i in ids:
+        uuid.UUID(i)
+    return ids
+
+
+class JobListView(APIView):
+    """State of several jobs: ``?ids=<id>,<id>`` or ``?parent=<batch id>``."""
+
+    def get(self, request, *args, **kwargs):
+        try:
+            ids = _parse_ids(request.query_params.get('ids', ''))
+            parent = request.query_params.get('parent')
+            if parent:
+                uuid.UUID(parent)
+        except ValueError:
+            return Response({'error': 'Identificador de trabajo inválido'}, status=status.HTTP_400_BAD_REQUEST)
+        if not ids and not parent:
+            return Response({'error': "Debe indicar 'ids' o 'parent'"}, status=status.HTTP_400_BAD_REQUEST)
+        if len(ids) > MAX_LIST_JOBS:
+            return Response(
+                {'error': f'Máximo {MAX_LIST_JOBS} trabajos por consulta'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        jobs = _jobs()
+        if ids:
+            jobs = jobs.filter(pk__in=ids)
+        if parent:
+            jobs = jobs.filter(parent_id=parent)
+        found = [describe(job) for job in jobs[:MAX_LIST_JOBS]]
+        missing = sorted(set(ids) - {job['id'] for job in found})
+        return Response({'jobs': found, 'missing': missing}, status=status.HTTP_200_OK)
+
+
+class JobDetailView(APIView):
+    """State, attempts and stage timings of one job.
+
+    Responses carry an ``ETag``; polling with ``If-None-Match`` gets ``304``
+    until the job changes.
+    """
+
+    def get(self, request, job_id, *args, **kwargs):
+        job = _jobs().filter(pk=job_id).first()
+        if job is None:
+            return Response({'error': 'Trabajo no encontrado'}, status=status.HTTP_404_NOT_FOUND)
+        etag = _etag(job)
+        if etag in parse_etags(request.headers.get('If-None-Match', '')):
+            return HttpResponseNotModified(headers={'ETag': etag})
+        return Response(describe(job), status=status.HTTP_200_OK, headers={'ETag': etag})
+
+
+class JobResultView(APIView):
+    """The parsed payload stored for a job (the body sent to the webhook).
+
+    The result is kept gzip-compressed and sent as is to clients accepting
+    ``gzip``.  Unfinished jobs without a result get ``409``; finished ones
+    without a result (files sent unparsed) get ``404``, like the jobs
+    purged ``JOBS_RESULT_TTL`` seconds after finishing.
+    """
+
+    def get(self, request, job_id, *args, **kwargs):
+        job = Job.objects.defer('data').filter(pk=job_id).first()
+        if job is None:
+            return Response({'error': 'Trabajo no encontrado'}, status=status.HTTP_404_NOT_FOUND)
+        if not job.result:
+            pending = job.state in (Job.QUEUED, Job.RUNNING, Job.RETRYING)
+            return Response(
+                {'error': 'El trabajo todavía no tiene resultado' if pending else 'El trabajo no tiene resultado',
+                 'state': job.state},
+                status=status.HTTP_409_CONFLICT if pending else status.HTTP_404_NOT_FOUND
+            )
+
+        body = bytes(job.result)
+        if 'gzip' in request.headers.get('Accept-Encoding', ''):
+            response = HttpResponse(body, content_type='application/json')
+            response['Content-Encoding'] = 'gzip'
+        else:
+            response = HttpResponse(gzip.decompress(body), content_type='application/json')
+        response['Vary'] = 'Accept-Encoding'
+        response['X-Job-State'] = job.state
+        return response
+
+
+class DeadLetterView(APIView):
+    """List the jobs that exhausted their retries (``?kind=excel|pdf``)."""
+
+    def get(self, request, *args, **kwargs):
+        jobs = Job.objects.filter(state=Job.FAILED).order_by('-finished_at')
+        kind = request.query_params.get('kind')
+        if kind:
+            jobs = jobs.filter(kind=kind)
+        limit = request.query_params.get('limit', '100')
+        limit = int(limit) if str(limit).isdigit() else 100
+
+        return Response({
+            'count': jobs.count(),
+            'jobs': [
+                {
+                    'id': str(job.pk),
+                    'kind': job.kind,
+                    'file_name': job.file_name,
+                    'error': job.error,
+                    'attempts': job.attempts,
+                    'size': job.size,
+                    'created_at': job.created_at,
+                    'finished_at': job.finished_at,
+                }
+                for job in jobs.defer('data')[:limit]
+            ],
+        }, status=status.HTTP_200_OK)
+
+
+class DeadLetterReplayView(APIView):
+    """Queue dead-letter jobs again: ``{"ids": [...]}`` or ``{"all": true}``."""
+
+    def post(self, request, *args, **kwargs):
+        ids = request.data.get('ids')
+        replay_all = str(request.data.get('all', 'false')).lower() == 'true'
+        if not ids and not replay_all:
+            return Response(
+                {'error': "Debe indicar 'ids' o 'all'"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if ids and not isinstance(ids, list):
+            ids = [ids]
+
+        try:
+            count = replay(ids=ids or None, kind=request.data.get('kind'))
+        except Exception as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response({
+            'message': f"{count} trabajo(s) reencolado(s)",
+            'replayed': count,
+        }, status=status.HTTP_200_OK)
@@ -0,0 +1,85 @@
+"""Start the consumer threads of the job queues in this process.
+
+Workers only run where they are started explicitly: in the web processes
+(``excel_to_json.wsgi`` / ``asgi``, unless ``JOBS_WORKERS_ENABLED=false``)
+and in ``manage.py run_jobs``.  Importing the task modules never starts
+them, so other management commands (``migrate``, ``replay_jobs``, the
+benchmarks, ...) do not claim jobs from the shared table.
+
+Every process running workers also runs the periodic maintenance every
+``JOBS_MAINTENANCE_INTERVAL`` seconds: :func:`jobs.queues.purge` of the
+expired results and :func:`jobs.spool.sweep`.  Both are safe to run from
+several processes at once.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+
+from django.db import close_old_connections
+
+logger = logging.getLogger(__name__)
+
+# Seconds between two purges of expired jobs and spool sweeps (0 disables them).
+MAINTENANCE_INTERVAL = int(os.getenv('JOBS_MAINTENANCE_INTERVAL', '3600'))
+
+_maintenance_lock = threading.Lock()
+_maintenance: threading.Thread | None = None
+
+
+def _workers() -> dict:
+    from api.tasks import worker as excel_worker
+    from pdfconvert.tasks import worker as pdf_worker
+
+    return {'excel': excel_worker, 'pdf': pdf_worker}
+
+
+KINDS = ('excel', 'pdf')
+
+
+def maintain() -> tuple[int, int]:
+    """Purge the expired jobs and sweep the spool; return how many jobs
+    and spool files were removed."""
+    from . import spool
+    from .queues import purge
+
+    return purge(), spool.sweep()
+
+
+def _run_maintenance(interval: int) -> None:
+    while True:
+        time.sleep(interval)
+        close_old_connections()
+        try:
+            jobs, files = maintain()
+            if jobs or files:
+                logger.info("Mantenimiento: %d trabajo(s) y %d archivo(s) del spool eliminados", jobs, files)
+        except Exception:
+            logger.exception("Error en el mantenimiento de la cola de trabajos")
+
+
+def start_maintenance(interval: int = MAINTENANCE_INTERVAL) -> None:
+    """Start the maintenance thread of this process (once)."""
+    global _maintenance
+    if interval <= 0:
+        return
+    with _maintenance_lock:
+        if _maintenance is not None:
+            return
+        _maintenance = threading.Thread(target=_run_maintenance, args=(interval,), daemon=True,
+                                        name='jobs-maintenance')
+    _maintenance.start()
+
+
+def start_workers(kinds=None) -> list[str]:
+    """Start the workers of ``kinds`` (default: all) and the maintenance
+    thread, and return their kinds."""
+    workers = _workers()
+    kinds = list(kinds or KINDS)
+    for kind in kinds:
+        workers[kind].start()
+    start_maintenance()
+    return kinds
@@ -1,6 +1,12 @@
-
 """Utilities for processing PDFs and sending them to the webhook."""
 
-from .tasks import process_and_send
-
 __all__ = ["process_and_send"]
+
+
+def __getattr__(name):
+    # ``tasks`` uses the job models, so it can only be imported once the
+    # app registry is ready.
+    if name == "process_and_send":
+        from .tasks import process_and_send
+        return process_and_send
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
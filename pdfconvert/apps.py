@@ -6,6 +6,6 @@ class PdfconvertConfig(AppConfig):
     name = 'pdfconvert'
 
     def ready(self):
-        # Import tasks to ensure the background worker starts when the app is
-        # loaded. The import has side effects (spawns the worker thread).
+        # Import tasks so the worker exists; its threads are started by
+        # jobs.workers.start_workers() (web processes and ``run_jobs`` only).
         from . import tasks  # noqa: F401
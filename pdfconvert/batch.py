@@ -0,0 +1,178 @@
+"""Batch conversion of statement texts (``convert_batch/``).
+
+A batch is a stream of documents, each with its own ``bank_key``: NDJSON
+lines ``{"id", "bank_key", "text", "views"}`` or the files of a multipart
+upload.  Every document is parsed by :func:`convert_document` in a child
+of :data:`pdfconvert.tasks.batch_pool`, and :func:`iter_results` yields
+one NDJSON line per document as soon as it is parsed (not in input
+order).  Documents are read while earlier ones are being parsed and at
+most ``2 x`` the pool size are in flight, so memory does not grow with
+the batch.
+
+:func:`convert_document` runs in the worker processes, so this module
+must stay free of import side effects.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from concurrent.futures import FIRST_COMPLETED, wait
+from typing import Iterable, Iterator
+
+# Documents accepted per request.
+MAX_DOCUMENTS = int(os.getenv('PDF_BATCH_MAX_DOCUMENTS', '1000'))
+# Seconds a single document may take before its process is killed.
+DOCUMENT_TIMEOUT = float(os.getenv('PDF_BATCH_TIMEOUT', '60'))
+
+# Form fields holding documents whose bank comes from ``bank_key``; any
+# other field name is the bank key of its files.
+FILE_FIELDS = ('file', 'files')
+
+
+def _setup() -> None:
+    # Spawned children only inherit DJANGO_SETTINGS_MODULE; the serializers
+    # need the app registry.
+    from django.apps import apps
+
+    if not apps.ready:
+        import django
+
+        django.setup()
+
+
+def convert_document(bank_key: str, text: str, views) -> dict:
+    """Parse one statement text as ``convert/<bank_key>/`` does.
+
+    Returns ``{'status', 'bank_key', 'result' | 'error', ...}`` with the
+    HTTP status the single-document endpoint would have answered.
+    """
+    _setup()
+    from pdfconvert.detect import resolve_bank_key
+    from pdfconvert.outputs import RAW
+    from pdfconvert.registry import get_handler, handler_views
+
+    try:
+        bank_key, detection = resolve_bank_key(bank_key, text)
+    except ValueError as e:
+        return {'status': 400, 'bank_key': bank_key, 'error': str(e)}
+    handler = get_handler(bank_key)
+    if not handler:
+        return {'status': 404, 'bank_key': bank_key, 'error': f'Banco "{bank_key}" no soportado.'}
+
+    views = handler_views(handler, views)
+    try:
+        payload = handler['parser'].parse(text, views=views)
+    except Exception as e:
+        return {'status': 400, 'bank_key': bank_key, 'error': 'Error al parsear el texto', 'detail': str(e)}
+
+    result = {'status': 200, 'bank_key': bank_key, 'result': payload}
+    if detection is not None:
+        result['detection'] = {'bank': detection.bank, 'confidence': detection.confidence}
+    serializer_class = handler.get('serializer') if RAW in views else None
+    if serializer_class is not None:
+        serializer = serializer_class(data=payload)
+        if not serializer.is_valid():
+            return {'status': 400, 'bank_key': bank_key, 'error': 'Datos inválidos',
+                    'detail': serializer.errors}
+    return result
+
+
+def ndjson_documents(lines: Iterable[bytes | str], bank_key: str | None, views) -> Iterator[dict]:
+    """Yield the documents of an NDJSON body (``bank_key``/``views`` are the
+    defaults of the query string); lines are decoded here, one at a time."""
+    for index, line in enumerate(lines):
+        try:
+            doc = json.loads(line.decode('utf-8') if isinstance(line, bytes) else line)
+            if not isinstance(doc, dict):
+                raise ValueError('se esperaba un objeto JSON')
+        except ValueError as e:
+            # UnicodeDecodeError included: a line that is not UTF-8
+            yield {'index': index, 'id': None, 'error': f'Línea NDJSON inválida: {e}'}
+            continue
+        yield {
+            'index': index,
+            'id': doc.get('id', index),
+            'bank_key': doc.get('bank_key') or bank_key,
+            'text': doc.get('text'),
+            'views': doc.get('views', views),
+        }
+
+
+def multipart_documents(files, bank_key: str | None, views) -> Iterator[dict]:
+    """Yield the documents of a multipart upload (``files`` is a Django
+    ``MultiValueDict``); files are read one at a time."""
+    index = 0
+    for field in files:
+        for f in files.getlist(field):
+            doc = {
+                'index': index,
+                'id': f.name,
+                'bank_key': bank_key if field in FILE_FIELDS else field,
+                'views': views,
+            }
+            try:
+                doc['text'] = f.read().decode('utf-8')
+            except UnicodeDecodeError as e:
+                doc['error'] = f'El archivo no es texto UTF-8: {e}'
+            yield doc
+            index += 1
+
+
+def _invalid(doc: dict) -> str | None:
+    if doc.get('error'):
+        return doc['error']
+    if not doc.get('bank_key'):
+        return "Falta 'bank_key'"
+    if not isinstance(doc.get('text'), str):
+        return "Falta 'text'"
+    if doc.get('views') is not None:
+        from pdfconvert.outputs import parse_views
+        try:
+            doc['views'] = parse_views(doc['views'])
+        except ValueError as e:
+            return str(e)
+    return None
+
+
+def _line(doc: dict, result: dict) -> str:
+    body = {'index': doc['index'], 'id': doc['id'], **result}
+    return json.dumps(body, ensure_ascii=False, separators=(',', ':'), default=str) + '\n'
+
+
+def iter_results(documents: Iterable[dict], pool, timeout: float | None = DOCUMENT_TIMEOUT,
+                 max_documents: int = MAX_DOCUMENTS) -> Iterator[str]:
+    """Parse ``documents`` in ``pool`` and yield one NDJSON line per
+    document, in completion order."""
+    in_flight = {}
+    limit = pool.size * 2
+
+    def finished(futures):
+        for future in futures:
+            doc = in_flight.pop(future)
+            error = future.exception()
+            if error is None:
+                yield _line(doc, future.result())
+            else:
+                yield _line(doc, {'status': 500, 'bank_key': doc['bank_key'], 'error': str(error)})
+
+    for doc in documents:
+        if doc['index'] >= max_documents:
+            yield _line(doc, {'status': 413, 'error': f'Máximo {max_documents} documentos por lote'})
+            break
+        error = _invalid(doc)
+        if error:
+            yield _line(doc, {'status': 400, 'bank_key': doc.get('bank_key'), 'error': error})
+            continue
+        future = pool.submit(convert_document, doc['bank_key'], doc.pop('text'), doc['views'],
+                             timeout=timeout)
+        in_flight[future] = doc
+        # Send what is already parsed before reading the next document,
+        # and only wait for a result when the limit is reached
+        yield from finished([f for f in in_flight if f.done()])
+        if len(in_flight) >= limit:
+            done, _ = wait(list(in_flight), return_when=FIRST_COMPLETED)
+            yield from finished(done)
+    while in_flight:
+        done, _ = wait(list(in_flight), return_when=FIRST_COMPLETED)
+        yield from finished(done)
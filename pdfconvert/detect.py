@@ -0,0 +1,79 @@
+"""Detect the bank of a PDF text export from its first lines.
+
+The signatures of :data:`pdfconvert.registry.SIGNATURES` are compiled once;
+detection only reads the first ``PDF_DETECT_LINES`` non-empty lines of the
+text (peeked, for a streamed :class:`pdfconvert.lines.TextLines` body).
+``bank_key=auto`` resolves to the base parser of the detected bank
+and ``bank_key=auto_transformado`` to its ``_transformado`` variant.
+"""
+
+from __future__ import annotations
+
+import io
+import os
+import re
+from itertools import islice
+
+from common.detection import MIN_CONFIDENCE, Detection, rank
+
+from .lines import TextLines
+from .registry import HANDLERS, SIGNATURES
+
+DETECT_LINES = int(os.getenv('PDF_DETECT_LINES', '80'))
+
+AUTO_KEY = 'auto'
+
+_PATTERNS = [
+    (bank, number, re.compile(pattern))
+    for bank, patterns in SIGNATURES.items()
+    for number, pattern in enumerate(patterns)
+]
+
+
+def detect_text(text, lines: int = DETECT_LINES) -> Detection | None:
+    """Return the bank whose signature best matches the start of ``text``
+    (a string or a :class:`pdfconvert.lines.TextLines`)."""
+    if isinstance(text, TextLines):
+        head = text.peek(lines)
+    else:
+        head = islice((l.strip() for l in io.StringIO(text) if l.strip()), lines)
+    found: dict[str, set[int]] = {}
+    pending = list(_PATTERNS)
+    for line in head:
+        remaining = []
+        for bank, number, pattern in pending:
+            if pattern.search(line):
+                found.setdefault(bank, set()).add(number)
+            else:
+                remaining.append((bank, number, pattern))
+        pending = remaining
+        if not pending:
+            break
+
+    scores = {bank: (len(hits) / len(SIGNATURES[bank]), len(hits)) for bank, hits in found.items()}
+    ranked = rank(scores)
+    if ranked is None:
+        return None
+    bank, confidence = ranked
+    return Detection(
+        bank=bank,
+        confidence=confidence,
+        candidates={b: round(s[0], 3) for b, s in scores.items()},
+    )
+
+
+def resolve_bank_key(bank_key: str, text) -> tuple[str, Detection | None]:
+    """Return the handler key for ``bank_key`` (detecting it when ``auto``).
+
+    Raises ``ValueError`` when no bank matches with enough confidence.
+    """
+    if bank_key not in (AUTO_KEY, f'{AUTO_KEY}_transformado'):
+        return bank_key, None
+    detection = detect_text(text)
+    if detection is None or detection.confidence < MIN_CONFIDENCE:
+        candidates = detection.candidates if detection else {}
+        raise ValueError(f"No se pudo identificar el banco del texto (candidatos: {candidates})")
+    key = detection.bank + bank_key[len(AUTO_KEY):]
+    if key not in HANDLERS:
+        raise ValueError(f'Banco "{key}" no soportado.')
+    return key, detection
@@ -0,0 +1,65 @@
+"""Line iteration shared by the text parsers.
+
+The parsers in :mod:`pdfconvert.utils` consume a statement as an iterator
+of stripped, non-empty lines (:func:`iter_lines`), split like
+``str.splitlines()``.  :class:`TextLines` produces them from the request
+body while it is being read, so a statement is parsed as it is uploaded
+and only the current movement block is held in memory.
+"""
+
+from __future__ import annotations
+
+import codecs
+from typing import Iterable, Iterator
+
+# Bytes read from the request stream at a time.
+CHUNK_SIZE = 64 * 1024
+
+
+def iter_lines(source: str | Iterable[str]) -> Iterator[str]:
+    """Yield the stripped, non-empty lines of ``source``: a string, a
+    :class:`TextLines` or any iterable of lines."""
+    if isinstance(source, str):
+        source = source.splitlines()
+    for line in source:
+        line = line.strip()
+        if line:
+            yield line
+
+
+class TextLines:
+    """The lines of a byte stream, decoded incrementally.
+
+    :meth:`peek` returns the first lines without consuming them (bank
+    detection, logging); iterating yields every line once.  Decoding errors
+    are raised while iterating.
+    """
+
+    def __init__(self, stream, encoding: str = 'utf-8', chunk_size: int = CHUNK_SIZE) -> None:
+        self._lines = iter_lines(self._read(stream, encoding, chunk_size))
+        self._head: list[str] = []
+
+    @staticmethod
+    def _read(stream, encoding: str, chunk_size: int) -> Iterator[str]:
+        decoder = codecs.getincrementaldecoder(encoding)()
+        pending = ''
+        for block in iter(lambda: stream.read(chunk_size), b''):
+            parts = (pending + decoder.decode(block)).splitlines(keepends=True)
+            # The last part may continue in the next block
+            pending = parts.pop() if parts else ''
+            yield from parts
+        yield from (pending + decoder.decode(b'', final=True)).splitlines()
+
+    def peek(self, count: int) -> list[str]:
+        """Return the first ``count`` lines (fewer if the text is shorter)."""
+        while len(self._head) < count:
+            line = next(self._lines, None)
+            if line is None:
+                break
+            self._head.append(line)
+        return self._head[:count]
+
+    def __iter__(self) -> Iterator[str]:
+        while self._head:
+            yield self._head.pop(0)
+        yield from self._lines
@@ -0,0 +1,74 @@
+import json
+import random
+import time
+
+from django.core.management.base import BaseCommand
+
+from pdfconvert.tests.line_parser import parse_bancolombia as reference_parse
+from pdfconvert.utils.parse_bancolombia import parse_bancolombia
+
+DESCRIPTIONS = [
+    'CNB REDESCONSIG {n} EFECTIVO',
+    'TRANSFERENCIA DESDE NEQUI JUAN PEREZ',
+    'IVA COMIS TRASL {n}',
+    'SUCURSAL CENTRO PAGO PSE {n}',
+    'ABONO INTERESES AHORROS',
+    'RECAUDO *{n} CONVENIO',
+    'IMPTO GOBIERNO X',
+]
+
+
+def statement(movements: int, seed: int = 0) -> str:
+    """Return a synthetic statement export with ``movements`` movements."""
+    rnd = random.Random(seed)
+    lines = [
+        'Empresa: EMPRESA DE PRUEBA S.A.S.',
+        'Número de Cuenta:', '123-456789-01',
+        'Fecha y Hora Actual: 2024/06/30 10:15',
+        'NIT: 900123456',
+        'Tipo de cuenta: Ahorros',
+        'Saldo Total Actual: $12,345,678.90',
+        'FECHA DESCRIPCIÓN SUCURSAL REFERENCIA VALOR',
+    ]
+    for i in range(movements):
+        lines.append(f'2024/{rnd.randint(1, 12):02d}/{rnd.randint(1, 28):02d}')
+        lines.append(rnd.choice(DESCRIPTIONS).format(n=rnd.randint(100, 99999999)))
+        for _ in range(rnd.randint(0, 2)):
+            lines.append(str(rnd.randint(1000, 10 ** 12)))
+        value = f'{rnd.uniform(-5e6, 5e6):,.2f}'
+        if rnd.random() < 0.3:
+            lines[-1] = f'{lines[-1]} {value}'
+        else:
+            lines.append(value)
+    return '\n'.join(lines)
+
+
+class Command(BaseCommand):
+    help = "Benchmark the Bancolombia text parser against the previous line-based implementation."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--movements', type=int, action='append',
+                            help="Movements per statement (repeatable, default: 1000 5000 20000).")
+        parser.add_argument('--repeat', type=int, default=3)
+
+    def handle(self, *args, **options):
+        for movements in options['movements'] or [1000, 5000, 20000]:
+            text = statement(movements)
+            reference, current = reference_parse(text), parse_bancolombia(text)
+            old = self._best(reference_parse, text, options['repeat'])
+            new = self._best(parse_bancolombia, text, options['repeat'])
+            same = json.dumps(reference, ensure_ascii=False) == json.dumps(current, ensure_ascii=False)
+            self.stdout.write(
+                f">>> {movements} movimientos ({len(text) / 1e6:.1f} MB): "
+                f"anterior {old * 1000:.0f} ms, actual {new * 1000:.0f} ms "
+                f"(x{old / new:.2f}), salida idéntica: {same}"
+            )
+
+    @staticmethod
+    def _best(func, text: str, repeat: int) -> float:
+        best = float('inf')
+        for _ in range(max(repeat, 1)):
+            start = time.perf_counter()
+            func(text)
+            best = min(best, time.perf_counter() - start)
+        return best
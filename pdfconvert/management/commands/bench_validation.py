@@ -0,0 +1,120 @@
+import copy
+import random
+import time
+
+from django.core.management.base import BaseCommand
+
+from pdfconvert.serializers.bancolombia import BancolombiaSerializer
+from pdfconvert.serializers.compiled import compile_serializer
+
+# Values substituted into the payload by the parity check.
+EDGE_VALUES = [
+    None, '', ' ', '\t', 0, 1, 1.5, True, [], {}, 'abc', 'x\x00y', '\ud800',
+    '1', '-1', '+1', ' 12.50 ', '1.234', '1e3', '1,000.00', 'NaN', 'Infinity', '.5', '5.',
+    '0.00', '-0', '12345678901234567', '1234567890123456.78', '00000000000000001.5',
+    '2024-06-30', '2024-6-3', '2024-13-01', '2024-02-30', '30-06-2024 10:15:00',
+    '30-06-2024 25:00:00', '2024-06-30T10:15:00', ' 2024-06-30', '٣٠-٠٦-٢٠٢٤ 10:15:00',
+]
+
+
+def payload(movements: int, seed: int = 0) -> dict:
+    """Return a valid Bancolombia payload with ``movements`` movements."""
+    rnd = random.Random(seed)
+    return {
+        'empresa': 'EMPRESA DE PRUEBA S.A.S.',
+        'numero_cuenta': '123-456789-01',
+        'fecha_hora_actual': '30-06-2024 10:15:00',
+        'nit': '900123456',
+        'tipo_cuenta': 'Ahorros',
+        'fecha_hora_consulta': '30-06-2024 10:16:00',
+        'impreso_por': 'USUARIO',
+        'saldo_efectivo_actual': '12345678.90',
+        'saldo_canje_actual': '0.00',
+        'saldo_total_actual': '12345678.90',
+        'movimientos': [
+            {
+                'fecha': f'2024-{rnd.randint(1, 12):02d}-{rnd.randint(1, 28):02d}',
+                'descripcion': rnd.choice(['PAGO PSE', 'ABONO INTERESES AHORROS', 'IVA COMIS TRASL']),
+                'sucursal_canal': rnd.choice(['', 'CNB REDES', 'SUCURSAL CENTRO']),
+                'referencia1': str(rnd.randint(1000, 10 ** 12)),
+                'referencia2': '',
+                'documento': '',
+                'valor': f'{rnd.uniform(-5e6, 5e6):.2f}',
+            }
+            for _ in range(movements)
+        ],
+    }
+
+
+def mutate(data: dict, rnd: random.Random) -> dict:
+    """Return a copy of ``data`` with one or two values replaced or removed."""
+    data = copy.deepcopy(data)
+    for _ in range(rnd.randint(1, 2)):
+        target = data
+        rows = [row for row in data.get('movimientos') or () if isinstance(row, dict)] \
+            if isinstance(data.get('movimientos'), list) else []
+        if rnd.random() < 0.6 and rows:
+            target = rnd.choice(rows)
+        if not target:
+            continue
+        key = rnd.choice(list(target))
+        if key == 'movimientos' and rnd.random() < 0.5:
+            data['movimientos'] = rnd.choice([None, 'x', {}, [None], [1], [[]]])
+        elif rnd.random() < 0.15:
+            del target[key]
+        else:
+            target[key] = rnd.choice(EDGE_VALUES)
+    return data
+
+
+class Command(BaseCommand):
+    help = "Benchmark the compiled Bancolombia validation and check it against BancolombiaSerializer."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--movements', type=int, action='append',
+                            help="Movements per payload (repeatable, default: 1000 5000 20000).")
+        parser.add_argument('--repeat', type=int, default=3)
+        parser.add_argument('--cases', type=int, default=2000, help="Mutated payloads checked against DRF.")
+
+    def handle(self, *args, **options):
+        compiled = compile_serializer(BancolombiaSerializer)
+        for movements in options['movements'] or [1000, 5000, 20000]:
+            data = payload(movements)
+            drf = self._best(BancolombiaSerializer, data, options['repeat'])
+            fast = self._best(compiled, data, options['repeat'])
+            self.stdout.write(
+                f">>> {movements} movimientos: DRF {drf * 1000:.0f} ms, "
+                f"compilado {fast * 1000:.1f} ms (x{drf / fast:.0f})"
+            )
+
+        # DRF is the reference: the checker may only accept what it accepts
+        rnd = random.Random(0)
+        check = compiled.checker()
+        base = payload(5)
+        accepted = mismatches = 0
+        for _ in range(options['cases']):
+            data = mutate(base, rnd)
+            serializer = BancolombiaSerializer(data=data)
+            valid = serializer.is_valid()
+            if check([data]):
+                accepted += 1
+                if not valid:
+                    mismatches += 1
+                    self.stderr.write(f">>> ACEPTADO POR EL COMPILADO, RECHAZADO POR DRF: {serializer.errors}")
+            candidate = compiled(data=data)
+            if candidate.is_valid() != valid or candidate.errors != serializer.errors:
+                mismatches += 1
+                self.stderr.write(f">>> RESULTADO DISTINTO DE DRF: {data}")
+        self.stdout.write(
+            f">>> {options['cases']} casos mutados: {accepted} aceptados por el validador compilado, "
+            f"{mismatches} diferencias con DRF"
+        )
+
+    @staticmethod
+    def _best(serializer_class, data: dict, repeat: int) -> float:
+        best = float('inf')
+        for _ in range(max(repeat, 1)):
+            start = time.perf_counter()
+            assert serializer_class(data=data).is_valid()
+            best = min(best, time.perf_counter() - start)
+        return best
@@ -0,0 +1,28 @@
+"""Output views of the text parsers.
+
+Every parser in :mod:`pdfconvert.utils` produces the statement header
+fields plus two representations of the movements: ``raw`` (``movimientos``
+and, where the bank prints them, ``totales``) and the normalised
+``transformado`` view built from them.  Callers name the views they want
+(``?views=raw,transformado``) and only those are built and returned; the
+``<bank>_transformado`` handlers default to ``transformado`` alone.
+"""
+
+from __future__ import annotations
+
+RAW = 'raw'
+TRANSFORMED = 'transformado'
+ALL_VIEWS = (RAW, TRANSFORMED)
+
+
+def parse_views(value) -> tuple[str, ...] | None:
+    """Return the views listed in ``value`` (comma-separated text or a list),
+    or ``None`` when it is empty.  Raises ``ValueError`` for unknown views."""
+    if not value:
+        return None
+    items = value.split(',') if isinstance(value, str) else value
+    views = tuple(dict.fromkeys(v.strip().lower() for v in items if v.strip()))
+    unknown = [v for v in views if v not in ALL_VIEWS]
+    if unknown:
+        raise ValueError(f"Vistas no soportadas: {', '.join(unknown)} (use {', '.join(ALL_VIEWS)})")
+    return views or None
@@ -1,4 +1,5 @@
 # pdfconvert/parsers/bancolombia.py
+from pdfconvert.outputs import ALL_VIEWS
 from pdfconvert.utils.parse_bancolombia import parse_bancolombia, parse_bancolombia_transformado
 
 class ParserBancolombia:
@@ -8,5 +9,5 @@ class ParserBancolombia:
     def __init__(self, parse_func=None):
         self.parse_func = parse_func or parse_bancolombia
 
-    def parse(self, text: str) -> dict:
-        return self.parse_func(text)
+    def parse(self, text: str, views=ALL_VIEWS) -> dict:
+        return self.parse_func(text, views=views)
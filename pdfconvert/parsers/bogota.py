@@ -1,3 +1,4 @@
+from pdfconvert.outputs import ALL_VIEWS
 from pdfconvert.utils.parse_bogota import parse_bogota, parse_bogota_transformado
 
 class ParserBogota:
@@ -6,5 +7,5 @@ class ParserBogota:
     def __init__(self, parse_func=None):
         self.parse_func = parse_func or parse_bogota
 
-    def parse(self, text: str) -> dict:
-        return self.parse_func(text)
\ No newline at end of file
+    def parse(self, text: str, views=ALL_VIEWS) -> dict:
+        return self.parse_func(text, views=views)
\ No newline at end of file
@@ -1,3 +1,4 @@
+from pdfconvert.outputs import ALL_VIEWS
 from pdfconvert.utils.parse_casa_bolsa import parse_casa_bolsa, parse_casa_bolsa_transformado
 
 
@@ -7,5 +8,5 @@ class ParserCasaBolsa:
     def __init__(self, parse_func=None):
         self.parse_func = parse_func or parse_casa_bolsa
 
-    def parse(self, text: str) -> dict:
-        return self.parse_func(text)
\ No newline at end of file
+    def parse(self, text: str, views=ALL_VIEWS) -> dict:
+        return self.parse_func(text, views=views)
\ No newline at end of file
@@ -1,3 +1,4 @@
+from pdfconvert.outputs import ALL_VIEWS
 from pdfconvert.utils.parse_davivienda import parse_davivienda, parse_davivienda_transformado
 
 
@@ -7,5 +8,5 @@ class ParserDavivienda:
     def __init__(self, parse_func=None):
         self.parse_func = parse_func or parse_davivienda
 
-    def parse(self, text: str) -> dict:
-        return self.parse_func(text)
\ No newline at end of file
+    def parse(self, text: str, views=ALL_VIEWS) -> dict:
+        return self.parse_func(text, views=views)
\ No newline at end of file
@@ -0,0 +1,24 @@
+# pdfconvert/parsers/ndjson.py
+from rest_framework.parsers import BaseParser
+
+
+class NDJSONParser(BaseParser):
+    """Expose an ``application/x-ndjson`` body as an iterator of its lines,
+    read one at a time (see :mod:`pdfconvert.batch`).
+
+    Lines are split on ``\\n`` only: JSON strings may contain other line
+    separators such as U+2028.  They are yielded as bytes and decoded by
+    :func:`pdfconvert.batch.ndjson_documents`, so a line that is not UTF-8
+    only fails its own document.
+    """
+    media_type = 'application/x-ndjson'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        return _lines(stream) if stream is not None else iter(())
+
+
+def _lines(stream):
+    for line in iter(stream.readline, b''):
+        line = line.strip()
+        if line:
+            yield line
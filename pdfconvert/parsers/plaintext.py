@@ -1,8 +1,13 @@
 # pdfconvert/parsers/plaintext.py
 from rest_framework.parsers import BaseParser
 
+from pdfconvert.lines import TextLines
+
+
 class PlainTextParser(BaseParser):
+    """Expose a ``text/plain`` body as :class:`pdfconvert.lines.TextLines`,
+    so the statement is parsed while it is read."""
     media_type = 'text/plain'
 
     def parse(self, stream, media_type=None, parser_context=None):
-        return stream.read().decode('utf-8')
+        return TextLines(stream)
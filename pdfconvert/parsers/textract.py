@@ -4,7 +4,11 @@ import uuid
 import time
 import re
 import json
-from datetime import datetime
+
+import pandas as pd
+
+from common.amounts import format_cents, to_cents
+from common.dates import format_dates, parse_dates
 
 
 def _is_amount(text: str) -> bool:
@@ -18,63 +22,10 @@ def _is_amount(text: str) -> bool:
     return bool(re.match(amount_pattern, text))
 
 
-def _parse_amount(raw: str) -> float:
-    """Return numeric value from raw with decimal point as '.', treating commas as thousand separators."""
-    text = str(raw or "").strip()
-    for ch in ('−', '–', '—'):
-        text = text.replace(ch, '-')
-
-    negative = False
-    if text.startswith('(') and text.endswith(')'):
-        negative = True
-        text = text[1:-1].strip()
-    if text.endswith('-'):
-        negative = True
-        text = text[:-1].strip()
-    if text.startswith('-'):
-        negative = True
-        text = text[1:].strip()
-
-    text = re.sub(r'[^\d\.,]', '', text)
-
-    if ',' in text and '.' in text:
-        if text.rfind(',') > text.rfind('.'):
-            text = text.replace('.', '')
-            text = text.replace(',', '.')
-        else:
-            text = text.replace(',', '')
-    elif ',' in text:
-        text = text.replace(',', '')
-
-    try:
-        value = float(text)
-    except ValueError:
-        value = 0.0
-
-    return -value if negative else value
-
-
-def _format_date(raw: str) -> tuple[str, datetime | None]:
-    """Return (formatted_date, datetime_obj) from various raw formats."""
-    if not raw:
-        return "", None
-    text = str(raw).strip()
-    for fmt in ("%Y-%m-%d", "%Y/%m/%d", "%d/%m/%Y", "%d-%m-%Y"):
-        try:
-            dt = datetime.strptime(text, fmt)
-            return dt.strftime("%d/%m/%Y"), dt
-        except Exception:
-            continue
-    try:
-        dt = datetime.fromisoformat(text)
-        return dt.strftime("%d/%m/%Y"), dt
-    except Exception:
-        return text, None
-
-
 def parse_func(movimientos):
     """Transform Textract rows into the final ordered structure."""
     registros = []
+    fechas = []
 
     for mov in movimientos:
         ref1 = mov.get("referencia1", "").strip()
@@ -122,19 +73,18 @@ def parse_func(movimientos):
             raw_val = amount_from_ref
             print(f"Using amount from reference as valor: {amount_from_ref}")
 
-        val = _parse_amount(raw_val)
-        print(f"Raw value: {raw_val}, parsed value: {val}")
+        cents = to_cents(raw_val)
+        print(f"Raw value: {raw_val}, parsed value: {format_cents(cents)}")
         raw_str = str(raw_val).strip()
-        fecha_fmt, fecha_dt = _format_date(mov.get("fecha", ""))
-        if val >= 0:
-            importe_credito = f"{val:.2f}"
+        if cents >= 0:
+            importe_credito = format_cents(cents)
             importe_debito = 0.0
         else:
             importe_credito = 0.0
-            importe_debito = f"{abs(val):.2f}"
+            importe_debito = format_cents(-cents)
 
         registro = {
-            "Fecha": fecha_fmt,
+            "Fecha": "",
             "importe_credito": importe_credito,
             "importe_debito": importe_debito,
             "referencia": nombre,
@@ -142,10 +92,17 @@ def parse_func(movimientos):
             "Info_detallada2": mov.get("sucursal_canal", ""),
         }
 
-        registros.append((fecha_dt or datetime.max, registro))
-    registros.sort(key=lambda r: r[0])
+        registros.append(registro)
+        fechas.append(str(mov.get("fecha", "") or "").strip())
+
+    # One date format per statement: detect it once and convert the column
+    fechas_dt = parse_dates(fechas, dayfirst=True)
+    for registro, fecha in zip(registros, format_dates(fechas_dt, default=pd.Series(fechas))):
+        registro["Fecha"] = fecha
+    # Stable sort, movements without a valid date last
+    orden = fechas_dt.sort_values(na_position="last", kind="stable").index
 
-    return {"results": [r[1] for r in registros]}
+    return {"results": [registros[i] for i in orden]}
 
 class TextractParser:
     """Parser that extracts tables from PDF files using Amazon Textract.
@@ -1,34 +1,29 @@
 from pdfconvert.parsers.bancolombia import ParserBancolombia
 from pdfconvert.serializers.bancolombia import BancolombiaSerializer
+from pdfconvert.serializers.compiled import compile_serializer
 from pdfconvert.parsers.textract import TextractParser
 
-from pdfconvert.utils.parse_bancolombia import parse_bancolombia, parse_bancolombia_transformado
+from pdfconvert.utils.parse_bancolombia import parse_bancolombia
 from pdfconvert.parsers.davivienda import ParserDavivienda
-from pdfconvert.utils.parse_davivienda import (
-    parse_davivienda,
-    parse_davivienda_transformado,
-)
+from pdfconvert.utils.parse_davivienda import parse_davivienda
 from pdfconvert.parsers.bogota import ParserBogota
-from pdfconvert.utils.parse_bogota import (
-    parse_bogota,
-    parse_bogota_transformado,
-)
+from pdfconvert.utils.parse_bogota import parse_bogota
 from pdfconvert.parsers.casa_bolsa import ParserCasaBolsa
-from pdfconvert.utils.parse_casa_bolsa import (
-    parse_casa_bolsa,
-    parse_casa_bolsa_transformado,
-)
+from pdfconvert.utils.parse_casa_bolsa import parse_casa_bolsa
 
 from pdfconvert.parsers.textract import parse_func
+from pdfconvert.outputs import ALL_VIEWS, TRANSFORMED
 
 HANDLERS = {
     'bancolombia': {
         'parser':    ParserBancolombia(parse_func=parse_bancolombia),
-        'serializer': BancolombiaSerializer
+        # Validación compilada; BancolombiaSerializer decide los casos dudosos
+        'serializer': compile_serializer(BancolombiaSerializer)
     },
     'bancolombia_transformado': {
-        'parser':    ParserBancolombia(parse_func=parse_bancolombia_transformado),
-        'serializer': None  # No usamos serializer aquí
+        'parser':    ParserBancolombia(parse_func=parse_bancolombia),
+        'views':     (TRANSFORMED,),
+        'serializer': None,
     },
     'davivienda': {
         'parser':    ParserDavivienda(parse_func=parse_davivienda),
@@ -39,7 +34,8 @@ HANDLERS = {
         'serializer': None,
     },
     'davivienda_transformado': {
-        'parser':    ParserDavivienda(parse_func=parse_davivienda_transformado),
+        'parser':    ParserDavivienda(parse_func=parse_davivienda),
+        'views':     (TRANSFORMED,),
         'serializer': None,
     },
     'bogota': {
@@ -47,17 +43,57 @@ HANDLERS = {
         'serializer': None,
     },
     'bogota_transformado': {
-        'parser':    ParserBogota(parse_func=parse_bogota_transformado),
+        'parser':    ParserBogota(parse_func=parse_bogota),
+        'views':     (TRANSFORMED,),
         'serializer': None,
-    },'casa_bolsa': {
+    },
+    'casa_bolsa': {
         'parser':    ParserCasaBolsa(parse_func=parse_casa_bolsa),
         'serializer': None,
     },
     'casa_bolsa_transformado': {
-        'parser':    ParserCasaBolsa(parse_func=parse_casa_bolsa_transformado),
+        'parser':    ParserCasaBolsa(parse_func=parse_casa_bolsa),
+        'views':     (TRANSFORMED,),
         'serializer': None,
     },
 }
 
+# Firmas de encabezado para ``bank_key=auto``: expresiones que aparecen en
+# las primeras líneas del texto de cada banco (ver pdfconvert.detect).
+SIGNATURES = {
+    'bancolombia': [
+        r'^Empresa:',
+        r'^Número de Cuenta:',
+        r'^Fecha y Hora Actual:',
+        r'^Tipo de cuenta:',
+        r'^Saldo Efectivo Actual:',
+        r'^\d{4}/\d{2}/\d{2}$',
+    ],
+    'davivienda': [
+        r'(?i)^fecha\b.*\bvalor cheque\b',
+        r'(?i)\bterminal\b',
+        r'\s(Normal|Adicional)\s.*\$',
+        r'(?i)^total abonos\b.*\$',
+    ],
+    'bogota': [
+        r'^\d{2}/\d{2}/\d{4}\s',
+        r'^\d[\d\.]*,\d{2}$',
+        r'(?i)^(CR|DR)$',
+        r'(?i)^total abonos\b.*\d,\d{2}',
+    ],
+    'casa_bolsa': [
+        r'(?i)movimiento del periodo',
+        r'(?i)^cuenta\s+[oó]mnibus.*\d{4}-\d{2}-\d{2}',
+        r'\$-?[\d,.]+',
+    ],
+}
+
+
 def get_handler(key: str):
-    return HANDLERS.get(key)
\ No newline at end of file
+    return HANDLERS.get(key)
+
+
+def handler_views(handler: dict, requested=None) -> tuple:
+    """Views to build: the ``requested`` ones, else the handler's default
+    (see :mod:`pdfconvert.outputs`)."""
+    return requested or handler.get('views', ALL_VIEWS)
\ No newline at end of file
@@ -1,6 +1,9 @@
 from .bancolombia import BancolombiaSerializer, MovimientoSerializer
+from .compiled import CompiledSerializer, compile_serializer
 
 __all__ = [
     "BancolombiaSerializer",
+    "CompiledSerializer",
     "MovimientoSerializer",
+    "compile_serializer",
 ]
@@ -0,0 +1,185 @@
+# pdfconvert/serializers/compiled.py
+"""Fast validation of large payloads, compiled from DRF serializers.
+
+DRF validates a ``many=True`` nested serializer one movement and one field
+at a time, which for statements with thousands of movements costs more
+than parsing them.  :func:`compile_serializer` reads the field definitions
+of a serializer once and builds a checker that validates the payload
+column by column: every value of ``movimientos[*].valor`` with one
+precompiled pattern, the distinct dates of a column once each, ...
+
+The checker only ever *accepts*: a payload it cannot prove valid (an
+error, or a value outside its fast paths such as a number sent as a
+float) is validated again by the DRF serializer, which stays the
+reference and produces the error bodies.  Serializers using anything the
+compiler does not understand (other field types, ``validate_<field>``
+methods, validators) are always validated by DRF.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+
+from rest_framework import fields, serializers
+
+# ``false`` validates every payload with the DRF serializers.
+ENABLED = os.getenv('PDF_COMPILED_VALIDATION', 'true').lower() == 'true'
+
+# Characters refused by every CharField (ProhibitNull/SurrogateCharactersValidator).
+_PROHIBITED = re.compile('[\x00\ud800-\udfff]')
+
+
+class Unsupported(Exception):
+    """The serializer definition cannot be compiled."""
+
+
+def _char(field):
+    # Only the two validators every CharField gets
+    if len(field.validators) != 2 or field.max_length is not None or field.min_length is not None:
+        raise Unsupported(field.field_name)
+    blank_ok = field.allow_blank
+    trim = field.trim_whitespace
+
+    def check(values):
+        if any(type(v) is not str for v in values):
+            return False
+        if not blank_ok and not all(v.strip() if trim else v for v in values):
+            return False
+        return not _PROHIBITED.search('\n'.join(values))
+    return check
+
+
+def _decimal(field):
+    if field.validators or field.localize or field.max_whole_digits is None or field.max_whole_digits < 1:
+        raise Unsupported(field.field_name)
+    # Inside these bounds validate_precision() cannot fail
+    pattern = r'[+-]?[0-9]{1,%d}' % field.max_whole_digits
+    if field.decimal_places:
+        pattern += r'(?:\.[0-9]{1,%d})?' % field.decimal_places
+    match = re.compile(pattern).fullmatch
+
+    def check(values):
+        return all(type(v) is str and match(v.strip()) for v in values)
+    return check
+
+
+def _formats(field):
+    input_formats = getattr(field, 'input_formats', None)
+    if field.validators or not input_formats or any(
+            f.lower() == fields.ISO_8601 or '%z' in f or '%Z' in f for f in input_formats):
+        raise Unsupported(field.field_name)
+    parse = field.datetime_parser
+
+    def parses(value):
+        for input_format in input_formats:
+            try:
+                parse(value, input_format)
+                return True
+            except (ValueError, TypeError):
+                pass
+        return False
+
+    def check(values):
+        # Statements repeat few distinct dates
+        if any(type(v) is not str for v in values):
+            return False
+        return all(parses(v) for v in set(values))
+    return check
+
+
+def _list(field):
+    if field.validators or not field.allow_empty or field.max_length is not None or field.min_length is not None:
+        raise Unsupported(field.field_name)
+    check_rows = _rows(field.child)
+
+    def check(values):
+        if any(type(v) is not list for v in values):
+            return False
+        return check_rows([row for value in values for row in value])
+    return check
+
+
+_COMPILERS = {
+    fields.CharField: _char,
+    fields.DecimalField: _decimal,
+    fields.DateField: _formats,
+    fields.DateTimeField: _formats,
+    serializers.ListSerializer: _list,
+}
+
+
+def _rows(serializer):
+    """Return a checker of a list of rows validated by ``serializer``."""
+    if (serializer.validators or serializer.allow_null
+            or type(serializer).validate is not serializers.Serializer.validate):
+        raise Unsupported(type(serializer).__name__)
+    columns = []
+    for name, field in serializer.fields.items():
+        if field.read_only:
+            continue
+        compiler = _COMPILERS.get(type(field))
+        if compiler is None or field.allow_null or field.source != name \
+                or hasattr(serializer, f'validate_{name}'):
+            raise Unsupported(name)
+        columns.append((name, field.required, compiler(field)))
+
+    def check(rows):
+        if any(type(row) is not dict for row in rows):
+            return False
+        for name, required, check_column in columns:
+            values = [row[name] for row in rows if name in row]
+            if required and len(values) != len(rows):
+                return False
+            if values and not check_column(values):
+                return False
+        return True
+    return check
+
+
+class CompiledSerializer:
+    """Validate ``data`` like :attr:`reference` does (``is_valid()`` and
+    ``errors``), through the compiled checker whenever it accepts it."""
+
+    reference = None
+
+    def __init__(self, data):
+        self.initial_data = data
+        self._errors = None
+
+    @classmethod
+    def checker(cls):
+        """Return the compiled checker (``None`` if the reference cannot be
+        compiled); compiled on first use."""
+        if '_check' not in cls.__dict__:
+            try:
+                cls._check = _rows(cls.reference())
+            except Unsupported:
+                cls._check = None
+        return cls._check
+
+    def is_valid(self) -> bool:
+        check = self.checker()
+        if check is not None and check([self.initial_data]):
+            self._errors = {}
+            return True
+        serializer = self.reference(data=self.initial_data)
+        valid = serializer.is_valid()
+        self._errors = serializer.errors
+        return valid
+
+    @property
+    def errors(self):
+        assert self._errors is not None, 'You must call `.is_valid()` before accessing `.errors`.'
+        return self._errors
+
+
+def compile_serializer(serializer_class):
+    """Return a :class:`CompiledSerializer` for ``serializer_class``.
+
+    Returns ``serializer_class`` itself when compiled validation is
+    disabled (``PDF_COMPILED_VALIDATION=false``).
+    """
+    if not ENABLED:
+        return serializer_class
+    return type(f'Compiled{serializer_class.__name__}', (CompiledSerializer,), {'reference': serializer_class})
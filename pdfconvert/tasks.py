@@ -1,125 +1,190 @@
 import threading
-import queue
-import time
 from io import BytesIO
 import os
-import requests
+
+from django.db import close_old_connections
+
+from jobs.delivery import deliver
+from jobs.dispatcher import dispatcher
+from jobs.models import Job
+from jobs.queues import JobQueue
+from api.pool import SlotPool
 
 from .registry import get_handler
 
 WEBHOOK_URL = "https://automatizacion.commerk.com:4444/webhook/8dafec2e-f35a-4c3c-bcae-2a395effe7e6"
-MAX_RETRIES = 3
 
+# Consumer threads; Textract calls are network-bound, so several PDFs
+# (e.g. the members of a ZIP upload) are processed at the same time.
+WORKER_THREADS = int(os.getenv("PDF_WORKER_THREADS", "4"))
+# Limits of the unfinished PDF jobs (0 = no limit); past them uploads are
+# refused with 429 and a Retry-After.
+QUEUE_MAX_JOBS = int(os.getenv("PDF_QUEUE_MAX_JOBS", "1000"))
+QUEUE_MAX_BYTES = int(os.getenv("PDF_QUEUE_MAX_MB", "2048")) * 1024 * 1024
+# Worker processes parsing the documents of ``convert_batch/`` requests.
+BATCH_PROCESSES = int(os.getenv("PDF_BATCH_PROCESSES", str(os.cpu_count() or 1)))
+# Documents parsed by a batch child before it is replaced (0 = never recycle).
+BATCH_MAX_TASKS_PER_CHILD = int(os.getenv("PDF_BATCH_MAX_TASKS_PER_CHILD", "500"))
 
-def process_and_send(bank_key: str, file_name: str, data: bytes) -> None:
-    """Parse the PDF if needed and send it to the webhook."""
+batch_pool = SlotPool(BATCH_PROCESSES, BATCH_MAX_TASKS_PER_CHILD)
+
+
+def build_request(bank_key: str, file_name: str, file) -> dict:
+    """Parse the PDF if needed and return the webhook request arguments.
+
+    ``file`` is the PDF, open for reading (or its contents).
+    """
     file_basename = os.path.basename(file_name)
-    print(f">>> STARTING PROCESS_AND_SEND for: {file_basename} ({len(data)} bytes) with bank_key: {bank_key}")
-    
+    if isinstance(file, (bytes, bytearray)):
+        file = BytesIO(file)
+    print(f">>> BUILDING REQUEST for: {file_basename} with bank_key: {bank_key}")
+
     # Only Bancolombia uses Textract processing
     if bank_key == "bancolombia_textract":
         print(f">>> PROCESSING WITH TEXTRACT: {file_basename}")
         handler = get_handler(bank_key)
         if not handler:
             raise ValueError(f"Banco '{bank_key}' no soportado")
-            
+
         # Process with Textract and send JSON payload
         parser = handler["parser"]
-        with BytesIO(data) as f:
-            print(f">>> CALLING PARSER for: {file_basename}")
-            payload = parser.parse(f)
+        print(f">>> CALLING PARSER for: {file_basename}")
+        payload = parser.parse(file)
         payload["file_name"] = file_basename
         payload["bank_key"] = bank_key
-        
-        print(f">>> SENDING JSON PAYLOAD to webhook for: {file_basename}")
-        response = requests.post(WEBHOOK_URL, json=payload, timeout=10)
-        print(f">>> WEBHOOK RESPONSE for {file_basename}: {response.status_code}")
-        print(f"Sent processed JSON payload for {bank_key}")
-    else:
-        # Send raw PDF file for external processing (all other banks)
-        print(f">>> SENDING RAW PDF to webhook for: {file_basename}")
-        response = requests.post(
-            WEBHOOK_URL,
-            files={"file": (file_basename, data, "application/pdf")},
-            data={"bank_key": bank_key, "file_name": file_basename},
-            timeout=10,
-        )
-        print(f">>> WEBHOOK RESPONSE for {file_basename}: {response.status_code}")
-        print(f"Sent raw PDF file for {bank_key}")
-    
+        return {"json": payload}
+
+    # Send raw PDF file for external processing (all other banks)
+    return {
+        "files": {"file": (file_basename, file.read(), "application/pdf")},
+        "data": {"bank_key": bank_key, "file_name": file_basename},
+    }
+
+
+def process_and_send(bank_key: str, file_name: str, data: bytes) -> None:
+    """Parse the PDF if needed and send it to the webhook."""
+    file_basename = os.path.basename(file_name)
+    request = build_request(bank_key, file_name, data)
+    print(f">>> SENDING to webhook for: {file_basename}")
+    response = dispatcher.post(WEBHOOK_URL, **request)
+    print(f">>> WEBHOOK RESPONSE for {file_basename}: {response.status_code}")
     print(f">>> COMPLETED PROCESS_AND_SEND for: {file_basename}")
 
 
 class UploadWorker:
-    """Background worker that processes uploaded PDFs sequentially."""
+    """Background worker that processes uploaded PDFs.
+
+    Jobs live in the shared ``pdf`` :class:`jobs.queues.JobQueue`, so any
+    process or node running the worker can pick them up; ``size`` threads
+    take jobs concurrently.
+    """
+
+    def __init__(self, size: int = WORKER_THREADS):
+        self.queue = JobQueue("pdf", max_jobs=QUEUE_MAX_JOBS, max_bytes=QUEUE_MAX_BYTES)
+        self.size = max(size, 1)
+        self.threads: list[threading.Thread] = []
+        self._lock = threading.Lock()
 
-    def __init__(self):
-        self.queue: 'queue.Queue[tuple[str, str, bytes]]' = queue.Queue()
-        self.thread = threading.Thread(target=self._run, daemon=True)
-        self.thread.start()
+    def start(self) -> None:
+        """Start the worker threads (once)."""
+        with self._lock:
+            if self.threads:
+                return
+            self.threads = [
+                threading.Thread(target=self._run, daemon=True, name=f"pdf-worker-{i}")
+                for i in range(self.size)
+            ]
+        for thread in self.threads:
+            thread.start()
 
-    def enqueue(self, bank_key: str, file_name: str, data: bytes) -> None:
-        """Add a file to the processing queue."""
-        print(f">>> ENQUEUING FILE: {file_name} for bank: {bank_key}, queue size before: {self.queue.qsize()}")
-        self.queue.put((bank_key, file_name, data))
-        print(f">>> FILE ENQUEUED: {file_name}, queue size after: {self.queue.qsize()}")
+    def enqueue(self, bank_key: str, file_name: str, data) -> str:
+        """Add a file (bytes or an uploaded file) to the processing queue and
+        return its job id."""
+        print(f">>> ENQUEUING FILE: {file_name} for bank: {bank_key}")
+        job = self.queue.put(file_name, data, {"bank_key": bank_key})
+        print(f">>> FILE ENQUEUED: {file_name}, job {job.pk}")
+        return str(job.pk)
+
+    def enqueue_archive(self, bank_key: str, file) -> tuple[Job, list[Job]]:
+        """Enqueue every PDF of the ZIP upload ``file`` (see
+        :meth:`jobs.queues.JobQueue.put_archive`)."""
+        print(f">>> ENQUEUING ZIP: {file.name} for bank: {bank_key}")
+        batch, jobs = self.queue.put_archive(file, file.name, (".pdf",), {"bank_key": bank_key})
+        print(f">>> ZIP ENQUEUED: {file.name}, job {batch.pk} with {len(jobs)} file(s)")
+        return batch, jobs
 
     def get_queue_status(self) -> dict:
         """Get current queue status for monitoring."""
         return {
             "queue_size": self.queue.qsize(),
-            "thread_alive": self.thread.is_alive(),
-            "thread_daemon": self.thread.daemon
+            "jobs": self.queue.stats(),
+            "limits": self.queue.limits(),
+            "threads": self.size,
+            "threads_alive": sum(t.is_alive() for t in self.threads),
+            "webhook": dispatcher.stats(),
         }
 
     def _run(self) -> None:
         print(">>> WORKER THREAD STARTED")
         while True:
+            print(">>> WAITING FOR FILES IN QUEUE")
+            job = self.queue.get()
+            bank_key = job.params.get("bank_key", "")
             try:
-                print(f">>> WAITING FOR FILES IN QUEUE (current size: {self.queue.qsize()})")
-                bank_key, file_name, data = self.queue.get()
-                print(f">>> PROCESSING FILE: {file_name} for bank: {bank_key}")
-                
-                success = False
-                for attempt in range(1, MAX_RETRIES + 1):
-                    try:
-                        print(f">>> ATTEMPT {attempt} for file: {file_name}")
-                        process_and_send(bank_key, file_name, data)
-                        print(f">>> SUCCESS: File {file_name} processed and sent")
-                        success = True
-                        break
-                    except Exception as e:
-                        print(f">>> ERROR on attempt {attempt} for {file_name}: {str(e)}")
-                        if attempt < MAX_RETRIES:
-                            print(f">>> RETRYING in 2 seconds... (attempt {attempt}/{MAX_RETRIES})")
-                            time.sleep(2)
-                        else:
-                            print(f">>> FAILED ALL ATTEMPTS for file: {file_name}")
-                            self._report_error(bank_key, file_name, e)
-
-                if success:
-                    print(f">>> ✅ COMPLETED: {file_name}")
+                # Parsed (Textract) results are stored, so retries skip parsing
+                payload = self.queue.load_result(job)
+                if payload is None:
+                    print(f">>> PROCESSING FILE: {job.file_name} for bank: {bank_key} (attempt {job.attempts})")
+                    # Read from the spool now, not while the job waits
+                    with job.open() as f:
+                        request = build_request(bank_key, job.file_name, f)
+                    payload = request.get("json")
+                    if payload is not None:
+                        self.queue.save_result(job, payload)
                 else:
-                    print(f">>> ❌ FAILED: {file_name}")
-                    
+                    print(f">>> RESENDING PARSED FILE: {job.file_name} (attempt {job.attempts})")
             except Exception as e:
-                print(f">>> CRITICAL ERROR in worker thread: {str(e)}")
-                # Continue processing even if there's a critical error
-            finally:
-                # ALWAYS mark task as done to prevent queue blocking
-                try:
-                    self.queue.task_done()
-                    print(f">>> FINISHED PROCESSING, remaining queue size: {self.queue.qsize()}")
-                except Exception as e:
-                    print(f">>> Error marking task done: {str(e)}")
+                self._finish(bank_key, job, e)
+                continue
+
+            # Delivery happens on the dispatcher threads; this thread moves on
+            callback = lambda error, job=job, bank_key=bank_key: self._delivered(bank_key, job, error)
+            if payload is not None:
+                deliver(WEBHOOK_URL, job, payload, callback)
+            else:
+                # Raw PDF for external processing
+                future = dispatcher.submit(WEBHOOK_URL, **request)
+                future.add_done_callback(lambda f, callback=callback: callback(f.exception()))
+
+    def _delivered(self, bank_key: str, job, error: BaseException | None) -> None:
+        if error is None:
+            print(f">>> ✅ COMPLETED: {job.file_name}")
+        self._finish(bank_key, job, error)
+
+    def _finish(self, bank_key: str, job, error: BaseException | None) -> None:
+        # ALWAYS record the outcome so the job is not left running; this
+        # also runs on the long-lived webhook sender threads
+        close_old_connections()
+        try:
+            state = self.queue.task_done(job, error)
+            print(f">>> FINISHED PROCESSING job {job.pk}: {state}")
+        except Exception as e:
+            print(f">>> Error marking task done: {str(e)}")
+            return
+        finally:
+            close_old_connections()
+        if state == Job.RETRYING:
+            print(f">>> ERROR on attempt {job.attempts} for {job.file_name}: {error}, retrying at {job.run_after}")
+        elif state == Job.FAILED:
+            print(f">>> ❌ FAILED ALL ATTEMPTS for file: {job.file_name}")
+            self._report_error(bank_key, job.file_name, error)
 
     def _report_error(self, bank_key: str, file_name: str, exc: Exception) -> None:
         print(f">>> REPORTING ERROR for file: {file_name}, error: {str(exc)}")
         try:
-            response = requests.post(
+            response = dispatcher.post(
                 WEBHOOK_URL,
                 json={"error": str(exc), "file": file_name, "bank_key": bank_key},
-                timeout=10,
             )
             print(f">>> ERROR REPORTED to webhook for {file_name}: {response.status_code}")
         except Exception as e2:
@@ -0,0 +1,111 @@
+from django.test import SimpleTestCase
+
+from pdfconvert.management.commands.bench_bancolombia import statement
+from pdfconvert.utils.parse_bancolombia import HEADER_MAP, parse_bancolombia
+
+from .line_parser import parse_bancolombia as reference_parse
+
+HEADER = """\
+Empresa: EMPRESA DE PRUEBA S.A.S.
+Número de Cuenta:
+123-456789-01
+Fecha y Hora Actual: 2024/06/30 10:15
+NIT: 900123456
+Tipo de cuenta: Ahorros
+Fecha y Hora Consulta:
+2024/06/30 10:16
+Impreso por: USUARIO
+Saldo Efectivo Actual: $12,345,678.90
+Saldo en Canje Actual: $0.00
+Saldo Total Actual:
+$12,345,678.90
+FECHA DESCRIPCIÓN SUCURSAL REFERENCIA VALOR
+"""
+
+MOVEMENTS = """\
+2024/06/01
+TRANSFERENCIA DESDE NEQUI JUAN PEREZ
+GOMEZ
+3001234567
+150,000.00
+2024/06/02
+CNB REDESCONSIG 12345678 EFECTIVO
+987654321
+-1,250,000.50
+2024/06/02
+SUCURSAL CENTRO IVA COMIS TRASL 555
+*4455 1234567890123 99
+-3,800.00
+2024/06/03
+ABONO INTERESES AHORROS 12.34
+2024/06/04
+PAGO PSE 20240604 EMPRESA
+DE SERVICIOS PUBLICOS
+REF 000123
+-98,765.43
+2024/06/05
+RECAUDO *778899 CONVENIO
+2024/06/06
+2024/06/07
+IMPTO GOBIERNO X
+-0.45
+"""
+
+# Footer of one page and the repeated header of the next one
+PAGE_BREAK = """\
+Página 1 de 2
+Impreso por: USUARIO
+FECHA DESCRIPCIÓN SUCURSAL REFERENCIA VALOR
+"""
+
+TAIL = """\
+2024/06/08
+CONSIGNACION 123
+1,000.00
+Fin del extracto
+"""
+
+
+class BancolombiaParserTests(SimpleTestCase):
+    """The single-pass parser must return what the line-by-line one did."""
+
+    def assert_same_output(self, text: str) -> None:
+        self.assertEqual(parse_bancolombia(text), reference_parse(text))
+
+    def test_statement(self):
+        self.assert_same_output(HEADER + MOVEMENTS)
+
+    def test_page_breaks_and_footer(self):
+        self.assert_same_output(HEADER + MOVEMENTS + PAGE_BREAK + TAIL)
+
+    def test_header_variants(self):
+        # Each header with its value on the same line, on the next one, empty or missing
+        for label in HEADER_MAP:
+            for variant in (f'{label}: valor', f'{label}:\nvalor', f'{label}:', f'{label}: $1,234.50', ''):
+                text = '\n'.join(
+                    variant if line.startswith(f'{label}:') else line
+                    for line in (HEADER + MOVEMENTS).splitlines()
+                    if not line.startswith(('123-456789-01', '2024/06/30 10:16', '$12,345,678.90'))
+                )
+                with self.subTest(variant=variant):
+                    self.assert_same_output(text)
+
+    def test_header_value_on_last_line(self):
+        self.assert_same_output(HEADER + 'Impreso por:')
+
+    def test_without_movements(self):
+        self.assert_same_output(HEADER)
+        self.assert_same_output('')
+
+    def test_windows_line_endings_and_indentation(self):
+        text = HEADER + MOVEMENTS + PAGE_BREAK + TAIL
+        self.assert_same_output('\r\n'.join(f'  {line}\t' for line in text.splitlines()))
+
+    def test_lines_iterable(self):
+        text = HEADER + MOVEMENTS + PAGE_BREAK + TAIL
+        self.assertEqual(parse_bancolombia(iter(text.splitlines(keepends=True))), reference_parse(text))
+
+    def test_random_statements(self):
+        for seed in range(20):
+            with self.subTest(seed=seed):
+                self.assert_same_output(statement(200, seed=seed))
@@ -0,0 +1,96 @@
+import json
+from concurrent.futures import Future
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from pdfconvert import batch
+
+TEXT = """\
+Empresa: EMPRESA DE PRUEBA S.A.S.
+Número de Cuenta: 123-456789-01
+Fecha y Hora Actual: 30-06-2024 10:15:00
+NIT: 900123456
+Tipo de cuenta: Ahorros
+Fecha y Hora Consulta: 30-06-2024 10:16:00
+Impreso por: USUARIO
+Saldo Efectivo Actual: $12,345,678.90
+Saldo en Canje Actual: $0.00
+Saldo Total Actual: $12,345,678.90
+FECHA DESCRIPCIÓN SUCURSAL REFERENCIA VALOR
+2024/06/01
+TRANSFERENCIA DESDE NEQUI JUAN PEREZ
+3001234567
+150,000.00
+2024/06/02
+IMPTO GOBIERNO X
+-0.45
+"""
+
+
+class InlinePool:
+    """A batch pool running every document in the calling thread."""
+
+    size = 2
+
+    def submit(self, func, *args, timeout=None) -> Future:
+        future = Future()
+        try:
+            future.set_result(func(*args))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+
+def _document(doc_id, text=TEXT, bank_key='bancolombia') -> bytes:
+    return json.dumps({'id': doc_id, 'bank_key': bank_key, 'text': text}).encode('utf-8')
+
+
+@mock.patch('pdfconvert.views.batch_pool', InlinePool())
+class BatchConvertViewTests(SimpleTestCase):
+
+    def post(self, lines: list[bytes]) -> dict:
+        response = self.client.post('/api/pdf/convert_batch/', b'\n'.join(lines) + b'\n',
+                                    content_type='application/x-ndjson')
+        self.assertEqual(response.status_code, 200)
+        results = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+        return {result['index']: result for result in results}
+
+    def test_documents(self):
+        results = self.post([_document('a'), _document('b', bank_key='nope')])
+        self.assertEqual(results[0]['status'], 200)
+        self.assertEqual(results[0]['id'], 'a')
+        self.assertEqual(len(results[0]['result']['movimientos']), 2)
+        self.assertEqual(results[1]['status'], 404)
+
+    def test_line_not_utf8(self):
+        # Only the line that is not UTF-8 fails; the stream goes on
+        results = self.post([_document('a'), b'\xff\xfe bad', _document('c')])
+        self.assertEqual(sorted(results), [0, 1, 2])
+        self.assertEqual(results[1]['status'], 400)
+        self.assertTrue(results[1]['error'].startswith('Línea NDJSON inválida'))
+        self.assertEqual(results[0]['status'], 200)
+        self.assertEqual(results[2]['status'], 200)
+
+    def test_line_not_json(self):
+        results = self.post([b'{"id": 1', b'[1, 2]', _document('c')])
+        self.assertEqual([results[i]['status'] for i in range(3)], [400, 400, 200])
+
+
+class IterResultsTests(SimpleTestCase):
+
+    def test_results_sent_before_reading_on(self):
+        # Each result is sent as soon as it is ready, not once the limit
+        # of documents in flight is reached or the body ends
+        read = []
+
+        def documents():
+            for index in range(3):
+                read.append(index)
+                yield {'index': index, 'id': index, 'bank_key': 'bancolombia', 'text': TEXT, 'views': None}
+
+        results = batch.iter_results(documents(), InlinePool())
+        first = json.loads(next(results))
+        self.assertEqual((first['index'], first['status']), (0, 200))
+        self.assertEqual(read, [0])
+        self.assertEqual([json.loads(line)['index'] for line in results], [1, 2])
@@ -0,0 +1,108 @@
+import copy
+import random
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from pdfconvert.management.commands.bench_validation import mutate, payload
+from pdfconvert.serializers import compiled
+from pdfconvert.serializers.bancolombia import BancolombiaFlexibleSerializer, BancolombiaSerializer
+
+MISSING = object()
+
+
+def _with(data: dict, path: tuple, value) -> dict:
+    """Return a copy of ``data`` with the value at ``path`` replaced
+    (removed when ``value`` is :data:`MISSING`)."""
+    data = copy.deepcopy(data)
+    target = data
+    for key in path[:-1]:
+        target = target[key]
+    if value is MISSING:
+        del target[path[-1]]
+    else:
+        target[path[-1]] = value
+    return data
+
+
+# (path, value) replaced in a valid payload
+CASES = [
+    (('empresa',), None),
+    (('empresa',), ''),
+    (('empresa',), '   '),
+    (('empresa',), 12.5),
+    (('empresa',), 'x\ud800'),
+    (('empresa',), 'x\x00y'),
+    (('empresa',), MISSING),
+    (('saldo_total_actual',), 1.5),
+    (('saldo_total_actual',), None),
+    (('saldo_total_actual',), ''),
+    (('saldo_total_actual',), '1.234'),
+    (('saldo_total_actual',), '12345678901234567'),
+    (('saldo_total_actual',), '1234567890123456.78'),
+    (('saldo_total_actual',), '00000000000000001.5'),
+    (('saldo_total_actual',), ' 12.50 '),
+    (('saldo_total_actual',), 'NaN'),
+    (('saldo_total_actual',), MISSING),
+    (('fecha_hora_actual',), '30-06-2024 25:00:00'),
+    (('fecha_hora_actual',), '2024-06-30T10:15:00'),
+    (('fecha_hora_actual',), None),
+    (('fecha_hora_actual',), MISSING),
+    (('movimientos',), None),
+    (('movimientos',), 'x'),
+    (('movimientos',), {}),
+    (('movimientos',), []),
+    (('movimientos',), [None]),
+    (('movimientos',), [[]]),
+    (('movimientos', 0, 'fecha'), '2024-02-30'),
+    (('movimientos', 0, 'fecha'), '2024-6-3'),
+    (('movimientos', 0, 'fecha'), ' 2024-06-30'),
+    (('movimientos', 0, 'fecha'), None),
+    (('movimientos', 0, 'fecha'), MISSING),
+    (('movimientos', 1, 'descripcion'), ''),
+    (('movimientos', 1, 'descripcion'), MISSING),
+    (('movimientos', 1, 'referencia1'), ''),
+    (('movimientos', 1, 'referencia1'), None),
+    (('movimientos', 1, 'referencia1'), 7),
+    (('movimientos', 1, 'referencia1'), MISSING),
+    (('movimientos', 2, 'valor'), 1.5),
+    (('movimientos', 2, 'valor'), '1.001'),
+    (('movimientos', 2, 'valor'), '-1234567890123456.78'),
+    (('movimientos', 2, 'valor'), '1e3'),
+    (('movimientos', 2, 'valor'), MISSING),
+]
+
+
+@mock.patch.object(compiled, 'ENABLED', True)
+class CompiledSerializerTests(SimpleTestCase):
+    """The compiled validation must answer exactly like the DRF serializer."""
+
+    def assert_same_validation(self, serializer_class, data: dict) -> None:
+        expected = serializer_class(data=data)
+        actual = compiled.compile_serializer(serializer_class)(data=data)
+        self.assertEqual(actual.is_valid(), expected.is_valid(), data)
+        self.assertEqual(actual.errors, expected.errors, data)
+
+    def test_bancolombia_is_compiled(self):
+        self.assertIsNotNone(compiled.compile_serializer(BancolombiaSerializer).checker())
+
+    def test_valid_payload(self):
+        self.assert_same_validation(BancolombiaSerializer, payload(50))
+
+    def test_edge_values(self):
+        base = payload(3)
+        for path, value in CASES:
+            with self.subTest(path=path, value=value):
+                self.assert_same_validation(BancolombiaSerializer, _with(base, path, value))
+
+    def test_mutated_payloads(self):
+        rnd = random.Random(0)
+        base = payload(5)
+        for _ in range(500):
+            self.assert_same_validation(BancolombiaSerializer, mutate(base, rnd))
+
+    def test_uncompilable_serializer(self):
+        # ListField is not compiled: everything is validated by DRF
+        self.assertIsNone(compiled.compile_serializer(BancolombiaFlexibleSerializer).checker())
+        self.assert_same_validation(BancolombiaFlexibleSerializer, payload(3))
+        self.assert_same_validation(BancolombiaFlexibleSerializer, {'movimientos': 'x'})
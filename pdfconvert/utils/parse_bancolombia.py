@@ -1,156 +1,181 @@
+"""Parser of the Bancolombia plain-text statement export.
+
+The text (a string or an iterator of lines, see :mod:`pdfconvert.lines`)
+is read in a single pass: every line goes through a small state machine that fills the header fields (looked up by the text before the
+first ``:``) and groups the lines following each ``YYYY/MM/DD`` line into
+a movement block, which is tokenized with precompiled patterns as soon as
+the next date (or the end of the text) closes it.
+"""
+
 import re
-from datetime import datetime
-
-def parse_bancolombia(text: str) -> dict:
-    lines = [l.strip() for l in text.splitlines() if l.strip()]
-
-    header_map = {
-        'Empresa': 'empresa',
-        'Número de Cuenta': 'numero_cuenta',
-        'Fecha y Hora Actual': 'fecha_hora_actual',
-        'NIT': 'nit',
-        'Tipo de cuenta': 'tipo_cuenta',
-        'Fecha y Hora Consulta': 'fecha_hora_consulta',
-        'Impreso por': 'impreso_por',
-        'Saldo Efectivo Actual': 'saldo_efectivo_actual',
-        'Saldo en Canje Actual': 'saldo_canje_actual',
-        'Saldo Total Actual': 'saldo_total_actual',
+
+import pandas as pd
+
+from common.amounts import format_cents, to_cents
+from common.dates import OUTPUT_FORMAT, format_dates, parse_dates
+from pdfconvert.lines import iter_lines
+from pdfconvert.outputs import ALL_VIEWS, RAW, TRANSFORMED
+
+# Header label (text before the first ``:``) -> payload key
+HEADER_MAP = {
+    'Empresa': 'empresa',
+    'Número de Cuenta': 'numero_cuenta',
+    'Fecha y Hora Actual': 'fecha_hora_actual',
+    'NIT': 'nit',
+    'Tipo de cuenta': 'tipo_cuenta',
+    'Fecha y Hora Consulta': 'fecha_hora_consulta',
+    'Impreso por': 'impreso_por',
+    'Saldo Efectivo Actual': 'saldo_efectivo_actual',
+    'Saldo en Canje Actual': 'saldo_canje_actual',
+    'Saldo Total Actual': 'saldo_total_actual',
+}
+
+_DATE = re.compile(r'^\d{4}/\d{2}/\d{2}$')
+_FULL_NUMBER = re.compile(r'^-?[\d,]+\.\d+$')
+_TAIL_NUMBER = re.compile(r'^(.+?)\s+(-?[\d,]+\.\d+)$')
+_OPERATION = re.compile(r'(TRANSFERENCIA|REDESCONSIGNACION|CONSIGNACION|IMPTO|VALOR|COMIS|INTERESES|ABONO|DEPÓSITO|DEPOSITO|RETIRO|PAGO|CONSIG|RECAUDO|TRASL)', re.IGNORECASE)
+_NUMBER = re.compile(r'\*?\d+')
+_REFERENCE = re.compile(r'^\*?\d{3,18}$')
+_REDESCONSIG = re.compile(r'(?i)^REDESCONSIG')
+
+
+def _header_value(key: str, raw: str) -> str:
+    if key.startswith('saldo_'):
+        return raw.replace('$', '').replace(',', '')
+    return raw
+
+
+def _references(raw_desc: str, ref_lines: list) -> tuple:
+    refs = []
+    for lr in ref_lines:
+        for tok in _NUMBER.findall(lr):
+            if _REFERENCE.match(tok):
+                refs.append(tok)
+            if len(refs) == 2:
+                break
+        if len(refs) == 2:
+            break
+    if len(refs) < 2:
+        for tok in _NUMBER.findall(raw_desc):
+            if _REFERENCE.match(tok) and tok not in refs:
+                refs.append(tok)
+            if len(refs) == 2:
+                break
+    return (refs[0] if refs else ""), (refs[1] if len(refs) > 1 else "")
+
+
+def _movement(raw_fecha: str, block: list) -> dict:
+    """Tokenize the lines following the date line ``raw_fecha``."""
+    raw_val, j = "", None
+    for k in range(len(block) - 1, -1, -1):
+        if _FULL_NUMBER.match(block[k]):
+            raw_val, j = block[k].replace(',', ''), k
+            break
+        m = _TAIL_NUMBER.match(block[k])
+        if m:
+            raw_val, j = m.group(2).replace(',', ''), k
+            block[k] = m.group(1).strip()
+            break
+    if j is None:
+        j = len(block)
+
+    raw_desc = block[0]
+    ref_lines = block[1:j]
+    up = raw_desc.upper()
+
+    if 'NEQUI' in up and ref_lines:
+        nombre = raw_desc[up.find('NEQUI') + len('NEQUI'):].strip()
+        referencia1 = '\n'.join([nombre] + ref_lines)
+        referencia2 = ""
+    else:
+        referencia1, referencia2 = _references(raw_desc, ref_lines)
+
+    if up.startswith('CNB'):
+        sucursal_canal = 'CNB REDES'
+        desc = _REDESCONSIG.sub('CONSIG', raw_desc[len('CNB'):].strip())
+        descripcion = _NUMBER.sub('', desc).strip()
+    else:
+        rest = _NUMBER.sub('', raw_desc).strip()
+        m = _OPERATION.search(rest)
+        if m:
+            pref, suf = rest[:m.start()].strip(), rest[m.start():].strip()
+            if pref.upper().endswith('IVA'):
+                sucursal_canal = pref[:-3].strip()
+                descripcion = 'IVA ' + suf
+            else:
+                sucursal_canal = pref
+                descripcion = suf
+        else:
+            sucursal_canal, descripcion = '', rest
+
+    return {
+        'fecha': raw_fecha,
+        'descripcion': descripcion,
+        'sucursal_canal': sucursal_canal,
+        'referencia1': referencia1,
+        'referencia2': referencia2,
+        'documento': '',
+        'valor': raw_val,
     }
+
+
+def parse_bancolombia(text: str, views=ALL_VIEWS) -> dict:
     data = {}
-    i = 0
-    while i < len(lines):
-        line = lines[i]
-        found = False
-        for label, key in header_map.items():
-            if line.startswith(f"{label}:"):
-                after_colon = line.split(":", 1)[1].strip()
-                if after_colon:
-                    raw = after_colon
+    movimientos = []
+    pending = None      # header whose value is on the next line
+    started = False     # past the first line starting with "FECHA"
+    fecha, block = None, []
+
+    for line in iter_lines(text):
+        if pending is not None:
+            data[pending] = _header_value(pending, line)
+            pending = None
+        else:
+            label, colon, value = line.partition(':')
+            key = HEADER_MAP.get(label) if colon else None
+            if key is not None:
+                value = value.strip()
+                if value:
+                    data[key] = _header_value(key, value)
                 else:
-                    raw = lines[i+1].strip() if i+1 < len(lines) else ""
-                    i += 1  # saltar línea ya procesada
-                if key.startswith('saldo_'):
-                    raw = raw.replace('$', '').replace(',', '')
-                data[key] = raw
-                found = True
-                break
-        i += 1 if not found else 1
-
-    for key in header_map.values():
+                    pending = key
+
+        if not started:
+            started = line.upper().startswith('FECHA')
+        elif len(line) == 10 and _DATE.match(line):
+            if block:
+                movimientos.append(_movement(fecha, block))
+            fecha, block = line, []
+        elif fecha is not None:
+            block.append(line)
+
+    if pending is not None:
+        data[pending] = ""
+    if block:
+        movimientos.append(_movement(fecha, block))
+    for key in HEADER_MAP.values():
         data.setdefault(key, "")
 
-    start = next((i+1 for i, l in enumerate(lines) if l.upper().startswith("FECHA")), len(lines))
+    # YYYY/MM/DD -> ISO for the whole statement at once
+    fechas = [mov['fecha'] for mov in movimientos]
+    fechas_iso = format_dates(parse_dates(fechas, fmt='%Y/%m/%d', strict=True), '%Y-%m-%d', default=pd.Series(fechas))
+    for mov, fecha_iso in zip(movimientos, fechas_iso):
+        mov['fecha'] = fecha_iso
 
-    date_re = re.compile(r'^\d{4}/\d{2}/\d{2}$')
-    fullnum_re = re.compile(r'^-?[\d,]+\.\d+$')
-    tail_re = re.compile(r'^(.+?)\s+(-?[\d,]+\.\d+)$')
-    ops_re = re.compile(r'(TRANSFERENCIA|REDESCONSIGNACION|CONSIGNACION|IMPTO|VALOR|COMIS|INTERESES|ABONO|DEPÓSITO|DEPOSITO|RETIRO|PAGO|CONSIG|RECAUDO|TRASL)', re.IGNORECASE)
-    ref_pattern = re.compile(r'^\*?\d{3,18}$')
+    if RAW in views:
+        data["movimientos"] = movimientos
+    if TRANSFORMED in views:
+        data["transformado"] = parse_bancolombia_transformado(movimientos)
+    return data
 
-    movimientos = []
-    i = start
-    while i < len(lines):
-        if date_re.match(lines[i]):
-            raw_fecha = lines[i]
-            block = []
-            i += 1
-            while i < len(lines) and not date_re.match(lines[i]):
-                block.append(lines[i])
-                i += 1
-            if not block:
-                continue
-            raw_val, j = "", None
-            for k in range(len(block)-1, -1, -1):
-                if fullnum_re.match(block[k]):
-                    raw_val, j = block[k].replace(',', ''), k
-                    break
-                m = tail_re.match(block[k])
-                if m:
-                    raw_val, j = m.group(2).replace(',', ''), k
-                    block[k] = m.group(1).strip()
-                    break
-            if j is None:
-                j = len(block)
-
-            raw_desc = block[0]
-            ref_lines = block[1:j]
-
-            if 'NEQUI' in raw_desc.upper() and ref_lines:
-                idx_n = raw_desc.upper().find('NEQUI')
-                nombre = raw_desc[idx_n + len('NEQUI'):].strip()
-                partes = [nombre] + ref_lines
-                referencia1 = '\n'.join(partes)
-                referencia2 = ""
-            else:
-                refs = []
-                for lr in ref_lines:
-                    for tok in re.findall(r'\*?\d+', lr):
-                        if ref_pattern.match(tok):
-                            refs.append(tok)
-                        if len(refs) == 2:
-                            break
-                    if len(refs) == 2:
-                        break
-                if len(refs) < 2:
-                    for tok in re.findall(r'\*?\d+', raw_desc):
-                        if ref_pattern.match(tok) and tok not in refs:
-                            refs.append(tok)
-                        if len(refs) == 2:
-                            break
-                referencia1 = refs[0] if refs else ""
-                referencia2 = refs[1] if len(refs) > 1 else ""
-
-            up = raw_desc.upper()
-            if up.startswith('CNB'):
-                sucursal_canal = 'CNB REDES'
-                desc = raw_desc[len('CNB'):].strip()
-                desc = re.sub(r'(?i)^REDESCONSIG', 'CONSIG', desc)
-                descripcion = re.sub(r'\*?\d+', '', desc).strip()
-            else:
-                rest = re.sub(r'\*?\d+', '', raw_desc).strip()
-                m = ops_re.search(rest)
-                if m:
-                    pref, suf = rest[:m.start()].strip(), rest[m.start():].strip()
-                    if pref.upper().endswith('IVA'):
-                        sucursal_canal = pref[:-3].strip()
-                        descripcion = 'IVA ' + suf
-                    else:
-                        sucursal_canal = pref
-                        descripcion = suf
-                else:
-                    sucursal_canal, descripcion = '', rest
-
-            try:
-                fecha_iso = datetime.strptime(raw_fecha, '%Y/%m/%d').date().isoformat()
-            except:
-                fecha_iso = raw_fecha
-
-            movimientos.append({
-                'fecha': fecha_iso,
-                'descripcion': descripcion,
-                'sucursal_canal': sucursal_canal,
-                'referencia1': referencia1,
-                'referencia2': referencia2,
-                'documento': '',
-                'valor': raw_val,
-            })
-        else:
-            i += 1
 
-    data["movimientos"] = movimientos
-    data["transformado"] = parse_bancolombia_transformado(movimientos)
-    return data
 def parse_bancolombia_transformado(data: dict) -> dict:
-    print(f"Procesando {len(data)} movimientos...")
     movimientos = data
     resultado = []
+    fechas = [mov.get('fecha', '') for mov in movimientos]
+    fechas_str = format_dates(parse_dates(fechas, fmt='ISO8601', strict=True), OUTPUT_FORMAT, default=pd.Series(fechas))
 
-    for mov in movimientos:
-        try:
-            fecha_dt = datetime.fromisoformat(mov['fecha'])
-            fecha_str = fecha_dt.strftime('%d/%m/%Y')
-        except Exception:
-            fecha_str = mov.get('fecha', '')
+    for mov, fecha_str in zip(movimientos, fechas_str):
 
         desc_up = mov.get('descripcion', '').strip().upper()
         if desc_up == "IMPTO GOBIERNO X":
@@ -169,26 +194,14 @@ def parse_bancolombia_transformado(data: dict) -> dict:
                 referencia = refs[0]
             else:
                 referencia = ""
-        raw_val = str(mov.get('valor', 0))
-        clean_val = raw_val.replace(',', '').replace(' ', '')
-        try:
-            val = float(clean_val)
-        except Exception:
-            try:
-                val = float(clean_val.replace('.', '').replace(',', '.'))
-            except Exception:
-                val = 0.0
-        try:
-            val = float(mov.get('valor', 0))
-        except Exception:
-            val = 0.0
+        val = to_cents(mov.get('valor', 0))
 
         if val >= 0:
-            importe_credito = f"{val:.2f}"
+            importe_credito = format_cents(val)
             importe_debito = ""
         else:
             importe_credito = ""
-            importe_debito = f"{-val:.2f}"
+            importe_debito = format_cents(-val)
 
         resultado.append({
             "Fecha": fecha_str,
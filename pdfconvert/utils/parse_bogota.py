@@ -1,10 +1,14 @@
 import re
 from datetime import datetime
 
+from common.amounts import COMMA, format_cents, to_cents
+from pdfconvert.lines import iter_lines
+from pdfconvert.outputs import ALL_VIEWS, RAW, TRANSFORMED
+
 
 def _clean_number(value: str) -> str:
-    value = value.replace('.', '').replace(',', '.')
-    return value.strip()
+    """``1.234,56`` -> ``1234.56``."""
+    return format_cents(to_cents(value, COMMA))
 
 
 def _clean_ref(value: str) -> str:
@@ -13,90 +17,131 @@ def _clean_ref(value: str) -> str:
     return value
 
 
-def parse_bogota(text: str) -> dict:
-    lines = [l.strip() for l in text.splitlines() if l.strip()]
+_DATE = re.compile(r'^\d{2}/\d{2}/\d{4}')
+_AMOUNT = re.compile(r'^\d[\d\.]*,\d{2}$')
+_DC = re.compile(r'^(CR|DR)$', re.IGNORECASE)
 
-    start = 0
-    for i, l in enumerate(lines):
-        if l.lower().startswith('fecha'):
-            start = i + 1
-            break
 
+class _HeaderFound(Exception):
+    """The first ``Fecha`` line was read: movements start after it."""
+
+
+class _Lines:
+    """Statement lines with one line of lookahead.
+
+    Movements start after the first ``Fecha`` line, or at the first line
+    when there is none; they are read from the start and
+    :class:`_HeaderFound` is raised when that line shows up, so the caller
+    starts over from the following line.  The first ``Total abonos`` line
+    is kept for the totals.
+    """
+
+    def __init__(self, lines):
+        self._lines = lines
+        self._next = None
+        self.header_found = False
+        self.totals = None
+
+    def _pull(self):
+        line = next(self._lines, None)
+        if line is None:
+            return None
+        lower = line.lower()
+        if self.totals is None and lower.startswith('total abonos'):
+            self.totals = line
+        if not self.header_found and lower.startswith('fecha'):
+            self.header_found = True
+            raise _HeaderFound
+        return line
+
+    def peek(self):
+        if self._next is None:
+            self._next = self._pull()
+        return self._next
+
+    def pop(self):
+        line = self.peek()
+        self._next = None
+        return line
+
+
+def _movements(lines: _Lines) -> list:
     movimientos = []
-    date_re = re.compile(r'^\d{2}/\d{2}/\d{4}')
-    amount_re = re.compile(r'^\d[\d\.]*,\d{2}$')
-    dc_re = re.compile(r'^(CR|DR)$', re.IGNORECASE)
-
-    i = start
-    while i < len(lines):
-        line = lines[i]
-        if date_re.match(line):
-            tokens = line.split()
-            fecha = tokens[0]
-            doc = tokens[1] if len(tokens) > 1 else ''
-            descripcion_parts = [' '.join(tokens[2:])] if len(tokens) > 2 else []
-            i += 1
-            while i < len(lines) and not amount_re.match(lines[i]):
-                descripcion_parts.append(lines[i])
-                i += 1
-            descripcion = ' '.join(descripcion_parts).strip()
-
-            valor = '0'
-            if i < len(lines) and amount_re.match(lines[i]):
-                valor = _clean_number(lines[i])
-                i += 1
-
-            dc = ''
-            if i < len(lines) and dc_re.match(lines[i]):
-                dc = lines[i].upper()
-                i += 1
-
-            if i < len(lines) and (',' in lines[i]):
-                i += 1
-
-            nit = ''
-            ref1 = ''
-            if i < len(lines) and lines[i].isdigit():
-                nit = lines[i]
-                i += 1
-            if i < len(lines) and lines[i].isdigit():
-                ref1 = lines[i]
-                i += 1
-
-            ofi = ''
-            if i < len(lines) and not date_re.match(lines[i]):
-                ofi = lines[i]
-                i += 1
-
-            movimientos.append({
-                'Fecha': fecha,
-                'Doc': doc,
-                'Tran': descripcion,
-                'Ofi': ofi,
-                'Valor Total': valor,
-                'NIT Origen': nit,
-                'Referencia 1': ref1,
-                'Desc Mot.': descripcion,
-                'D/C': dc,
-            })
-        else:
-            i += 1
+    while (line := lines.pop()) is not None:
+        if not _DATE.match(line):
+            continue
+        tokens = line.split()
+        fecha = tokens[0]
+        doc = tokens[1] if len(tokens) > 1 else ''
+        descripcion_parts = [' '.join(tokens[2:])] if len(tokens) > 2 else []
+        while lines.peek() is not None and not _AMOUNT.match(lines.peek()):
+            descripcion_parts.append(lines.pop())
+        descripcion = ' '.join(descripcion_parts).strip()
+
+        valor = '0'
+        if lines.peek() is not None and _AMOUNT.match(lines.peek()):
+            valor = _clean_number(lines.pop())
+
+        dc = ''
+        if lines.peek() is not None and _DC.match(lines.peek()):
+            dc = lines.pop().upper()
+
+        if lines.peek() is not None and (',' in lines.peek()):
+            lines.pop()
+
+        nit = ''
+        ref1 = ''
+        if lines.peek() is not None and lines.peek().isdigit():
+            nit = lines.pop()
+        if lines.peek() is not None and lines.peek().isdigit():
+            ref1 = lines.pop()
+
+        ofi = ''
+        if lines.peek() is not None and not _DATE.match(lines.peek()):
+            ofi = lines.pop()
+
+        movimientos.append({
+            'Fecha': fecha,
+            'Doc': doc,
+            'Tran': descripcion,
+            'Ofi': ofi,
+            'Valor Total': valor,
+            'NIT Origen': nit,
+            'Referencia 1': ref1,
+            'Desc Mot.': descripcion,
+            'D/C': dc,
+        })
+    return movimientos
 
-    totales = {}
-    for idx, l in enumerate(lines):
-        if l.lower().startswith('total abonos'):
-            nums = re.findall(r'([\d\.]+,\d{2})', l)
-            if len(nums) >= 3:
-                totales['Total Abonos'] = _clean_number(nums[0])
-                totales['Total retiros y debitos'] = _clean_number(nums[1])
-                totales['Movimiento neto'] = _clean_number(nums[2])
+
+def parse_bogota(text, views=ALL_VIEWS) -> dict:
+    """Parse the statement ``text`` (a string or an iterator of lines)."""
+    lines = _Lines(iter_lines(text))
+    while True:
+        try:
+            movimientos = _movements(lines)
             break
+        except _HeaderFound:
+            continue
+
+    payload = {}
+    if RAW in views:
+        payload['movimientos'] = movimientos
+        payload['totales'] = _totales(lines.totals)
+    if TRANSFORMED in views:
+        payload['transformado'] = parse_bogota_transformado({'movimientos': movimientos})
+    return payload
 
-    return {
-        'movimientos': movimientos,
-        'totales': totales,
-        'transformado': parse_bogota_transformado({'movimientos': movimientos, 'totales': totales})
-    }
+
+def _totales(line: str | None) -> dict:
+    totales = {}
+    if line is not None:
+        nums = re.findall(r'([\d\.]+,\d{2})', line)
+        if len(nums) >= 3:
+            totales['Total Abonos'] = _clean_number(nums[0])
+            totales['Total retiros y debitos'] = _clean_number(nums[1])
+            totales['Movimiento neto'] = _clean_number(nums[2])
+    return totales
 
 
 def parse_bogota_transformado(data: dict) -> dict:
@@ -1,43 +1,67 @@
 import re
-from datetime import datetime
 
+import pandas as pd
 
-def parse_casa_bolsa(text: str) -> dict:
-    lines = [l.strip() for l in text.splitlines() if l.strip()]
-    # Ubicamos la sección "Movimiento del Periodo" y procesamos solo a partir de allí
-    start = 0
-    for i, l in enumerate(lines):
-        if "movimiento del periodo" in l.lower():
-            start = i + 1
-            break
-    lines = lines[start:]
+from common.amounts import to_cents
+from common.dates import OUTPUT_FORMAT, format_dates, parse_dates
+from pdfconvert.lines import iter_lines
+from pdfconvert.outputs import ALL_VIEWS, RAW, TRANSFORMED
 
-    # Cada transacción de Cuenta Ómnibus inicia con esta línea
-    alt_start_re = re.compile(r'^cuenta\s+[oó]mnibus.*\d{4}-\d{2}-\d{2}', re.IGNORECASE)
 
+# Cada transacción de Cuenta Ómnibus inicia con esta línea
+_BLOCK_START = re.compile(r'^cuenta\s+[oó]mnibus.*\d{4}-\d{2}-\d{2}', re.IGNORECASE)
+
+
+def _add_movement(movimientos: list, block: list) -> None:
+    parsed = _parse_block(block)
+    # Omitimos movimientos que correspondan al saldo inicial
+    tipo_low = parsed.get("Tipo", "").lower()
+    detalle_low = parsed.get("Detalle", "").lower()
+    if tipo_low == "saldo" and "inicial" in detalle_low:
+        return
+    movimientos.append(parsed)
+
+
+def parse_casa_bolsa(text, views=ALL_VIEWS) -> dict:
+    """Parse the statement ``text`` (a string or an iterator of lines).
+
+    Only the movements after the "Movimiento del Periodo" line count (all
+    of them when there is no such line); until it shows up the blocks are
+    kept unparsed.
+    """
     movimientos = []
-    i = 0
-    while i < len(lines):
-        if alt_start_re.match(lines[i]):
-            block = [lines[i]]
-            i += 1
-            while i < len(lines) and not alt_start_re.match(lines[i]):
-                block.append(lines[i])
-                i += 1
-            parsed = _parse_block(block)
-            # Omitimos movimientos que correspondan al saldo inicial
-            tipo_low = parsed.get("Tipo", "").lower()
-            detalle_low = parsed.get("Detalle", "").lower()
-            if tipo_low == "saldo" and "inicial" in detalle_low:
-                continue
-            movimientos.append(parsed)
+    early = []          # blocks read before the section line
+    in_section = False
+    block = None
+    for line in iter_lines(text):
+        if not in_section and "movimiento del periodo" in line.lower():
+            in_section = True
+            early, block = [], None
+            continue
+        if _BLOCK_START.match(line):
+            if block is not None:
+                if in_section:
+                    _add_movement(movimientos, block)
+                else:
+                    early.append(block)
+            block = [line]
+        elif block is not None:
+            block.append(line)
+    if block is not None:
+        if in_section:
+            _add_movement(movimientos, block)
         else:
-            i += 1
+            early.append(block)
+    # Sin la línea de sección cuentan todos los bloques
+    for block in early:
+        _add_movement(movimientos, block)
 
-    return {
-        "movimientos": movimientos,
-        "transformado": parse_casa_bolsa_transformado({"movimientos": movimientos}),
-    }
+    payload = {}
+    if RAW in views:
+        payload["movimientos"] = movimientos
+    if TRANSFORMED in views:
+        payload["transformado"] = parse_casa_bolsa_transformado({"movimientos": movimientos})
+    return payload
 
 
 def _parse_block(block):
@@ -60,11 +84,7 @@ def _parse_block(block):
     # buscar primera ocurrencia de $ como indicador de valor movimiento
     m_val = re.search(r'\$-?[\d,.]+', rest)
     valor = m_val.group().replace("$", "") if m_val else "0"
-    valor_clean = valor.replace(',', '')
-    try:
-        valor_float = float(valor_clean)
-    except Exception:
-        valor_float = 0.0
+    valor_float = to_cents(valor) / 100
     pre_val = rest[:m_val.start()] if m_val else rest
     detalle_tokens = pre_val.split()
     tipo_tokens = tipo_transaccion.split()
@@ -97,13 +117,9 @@ def _parse_block(block):
 
 def parse_casa_bolsa_transformado(data: dict) -> dict:
     resultado = []
-    for mov in data['movimientos']:
-        fecha_raw = mov.get('Fecha', '')
-        try:
-            fecha_obj = datetime.fromisoformat(fecha_raw)
-            fecha = fecha_obj.strftime('%d/%m/%Y')
-        except Exception:
-            fecha = fecha_raw
+    fechas_raw = [mov.get('Fecha', '') for mov in data['movimientos']]
+    fechas = format_dates(parse_dates(fechas_raw, fmt='ISO8601', strict=True), OUTPUT_FORMAT, default=pd.Series(fechas_raw))
+    for mov, fecha in zip(data['movimientos'], fechas):
         tipo = mov.get('Tipo', '')
         detalle = mov.get('Detalle', '')
         valor = mov.get('Valor', 0)
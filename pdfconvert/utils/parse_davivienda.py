@@ -1,10 +1,17 @@
 import re
 from datetime import datetime
 
+from common.amounts import COMMA, format_cents, to_cents
+from pdfconvert.lines import iter_lines
+from pdfconvert.outputs import ALL_VIEWS, RAW, TRANSFORMED
+
+
+_JORNADA = re.compile(r'\s+(Normal|Adicional)\s+')
+
 
 def _clean_number(value: str) -> str:
-    value = value.replace('.', '').replace(',', '.')
-    return value.strip()
+    """``1.234,56`` -> ``1234.56``."""
+    return format_cents(to_cents(value, COMMA))
 
 
 def _clean_ref(value: str) -> str:
@@ -13,81 +20,103 @@ def _clean_ref(value: str) -> str:
     return value
 
 
-def parse_davivienda(text: str) -> dict:
-    lines = [l.strip() for l in text.splitlines() if l.strip()]
+def _movement(line: str) -> dict | None:
+    """Return the movement of one statement line (``None`` if it is not one)."""
+    if '$' not in line:
+        return None
+    try:
+        prefix, val_total, rest = line.split('$', 2)
+    except ValueError:
+        return None
+    val_total = _clean_number(val_total)
+    tail = rest.strip().split()
+    if not tail:
+        return None
+    valor_cheque = _clean_number(tail[0])
+    if len(tail) >= 5:
+        nit = tail[1]
+        ref1 = tail[2]
+        ref2 = tail[3]
+        terminal = tail[4]
+    else:
+        nit = ''
+        ref1 = tail[1] if len(tail) > 1 else ''
+        ref2 = tail[2] if len(tail) > 2 else ''
+        terminal = tail[3] if len(tail) > 3 else ''
+
+    jor_match = _JORNADA.search(prefix)
+    jor = jor_match.group(1) if jor_match else ''
+    part1 = prefix[:jor_match.start()].strip() if jor_match else prefix
+    part2 = prefix[jor_match.end():].strip() if jor_match else ''
+    parts = part1.split()
+    if len(parts) < 4:
+        return None
+    fecha, doc = parts[0], parts[1]
+    tran = ' '.join(parts[2:4])
+    ofi = ' '.join(parts[4:])
+    tokens2 = part2.split()
+    hora = tokens2[0] if len(tokens2) > 0 else ''
+    mot = tokens2[1] if len(tokens2) > 1 else ''
+    desc_mot = ' '.join(tokens2[2:]) if len(tokens2) > 2 else ''
+
+    return {
+        'Fecha': fecha,
+        'Doc': doc,
+        'Tran': tran,
+        'Ofi': ofi,
+        'Jor': jor,
+        'Hora': hora,
+        'Mot': mot,
+        'Desc Mot.': desc_mot,
+        'Valor Total': val_total,
+        'Valor Cheque': valor_cheque,
+        'NIT Origen': nit,
+        'Referencia 1': ref1,
+        'Referencia 2': ref2,
+        'Terminal': terminal,
+    }
+
 
-    start = next((i for i, l in enumerate(lines) if l.lower().startswith('fecha')), len(lines))
-    end = next((i for i, l in enumerate(lines) if l.lower().startswith('total abonos')), len(lines))
+def parse_davivienda(text, views=ALL_VIEWS) -> dict:
+    """Parse the statement ``text`` (a string or an iterator of lines).
 
+    Movements are the lines between the first ``Fecha`` line and the first
+    ``Total abonos`` line; the totals are on the line after the latter.
+    """
+    lines = iter_lines(text)
     movimientos = []
-    for line in lines[start + 1:end]:
-        if '$' not in line:
-            continue
-        try:
-            prefix, val_total, rest = line.split('$', 2)
-        except ValueError:
-            continue
-        val_total = _clean_number(val_total)
-        tail = rest.strip().split()
-        if not tail:
+    totales_line = None
+    started = False
+    for line in lines:
+        lower = line.lower()
+        if lower.startswith('total abonos'):
+            totales_line = next(lines, None)
+            break
+        if not started:
+            started = lower.startswith('fecha')
             continue
-        valor_cheque = _clean_number(tail[0])
-        if len(tail) >= 5:
-            nit = tail[1]
-            ref1 = tail[2]
-            ref2 = tail[3]
-            terminal = tail[4]
-        else:
-            nit = ''
-            ref1 = tail[1] if len(tail) > 1 else ''
-            ref2 = tail[2] if len(tail) > 2 else ''
-            terminal = tail[3] if len(tail) > 3 else ''
-
-        jor_match = re.search(r'\s+(Normal|Adicional)\s+', prefix)
-        jor = jor_match.group(1) if jor_match else ''
-        part1 = prefix[:jor_match.start()].strip() if jor_match else prefix
-        part2 = prefix[jor_match.end():].strip() if jor_match else ''
-        parts = part1.split()
-        if len(parts) < 4:
-            continue
-        fecha, doc = parts[0], parts[1]
-        tran = ' '.join(parts[2:4])
-        ofi = ' '.join(parts[4:])
-        tokens2 = part2.split()
-        hora = tokens2[0] if len(tokens2) > 0 else ''
-        mot = tokens2[1] if len(tokens2) > 1 else ''
-        desc_mot = ' '.join(tokens2[2:]) if len(tokens2) > 2 else ''
-
-        movimientos.append({
-            'Fecha': fecha,
-            'Doc': doc,
-            'Tran': tran,
-            'Ofi': ofi,
-            'Jor': jor,
-            'Hora': hora,
-            'Mot': mot,
-            'Desc Mot.': desc_mot,
-            'Valor Total': val_total,
-            'Valor Cheque': valor_cheque,
-            'NIT Origen': nit,
-            'Referencia 1': ref1,
-            'Referencia 2': ref2,
-            'Terminal': terminal,
-        })
+        movimiento = _movement(line)
+        if movimiento is not None:
+            movimientos.append(movimiento)
+
+    payload = {}
+    if RAW in views:
+        payload['movimientos'] = movimientos
+        payload['totales'] = _totales(totales_line)
+    if TRANSFORMED in views:
+        payload['transformado'] = parse_davivienda_transformado({'movimientos': movimientos})
+    return payload
 
+
+def _totales(line: str | None) -> dict:
     totales = {}
-    if end < len(lines) - 1:
-        nums = re.findall(r'\$\s*([\d.,]+)', lines[end + 1])
+    if line is not None:
+        nums = re.findall(r'\$\s*([\d.,]+)', line)
         if len(nums) >= 3:
             totales['Total Abonos'] = _clean_number(nums[0])
             totales['Total retiros y debitos'] = _clean_number(nums[1])
             totales['Movimiento neto'] = _clean_number(nums[2])
-
-    return {
-        'movimientos': movimientos,
-        'totales': totales,
-        'transformado': parse_davivienda_transformado({'movimientos': movimientos, 'totales': totales})
-    }
+    return totales
 
 
 def parse_davivienda_transformado(data: dict) -> dict:
@@ -4,18 +4,45 @@ from rest_framework.response import Response
 from rest_framework          import status
 from django.views import View
 from django.shortcuts import render
+from django.http import StreamingHttpResponse
 
-from pdfconvert.tasks import worker
+from common.archives import is_archive
+from jobs.queues import QueueFull
+from pdfconvert.tasks import batch_pool, worker
+from pdfconvert import batch
 
 from pdfconvert.parsers.plaintext import PlainTextParser
-from pdfconvert.registry          import get_handler
+from pdfconvert.parsers.ndjson    import NDJSONParser
+from pdfconvert.lines             import TextLines
+from pdfconvert.registry          import get_handler, handler_views
+from pdfconvert.outputs           import RAW, parse_views
+from pdfconvert.detect            import resolve_bank_key
 from rest_framework.parsers import MultiPartParser
 
 
 class PDFConvertView(APIView):
+    """Parse a plain-text statement export.
+
+    The body is parsed line by line while it is read (see
+    :mod:`pdfconvert.lines`).  ``?views=raw,transformado`` selects the
+    representations to build and return (see :mod:`pdfconvert.outputs`).
+    """
     parser_classes = [PlainTextParser]
 
     def post(self, request, bank_key, *args, **kwargs):
+        texto = request.data
+        if not isinstance(texto, TextLines):
+            return Response({"error": "Texto no proporcionado"}, status=status.HTTP_400_BAD_REQUEST)
+
+        # bank_key=auto: banco detectado con las primeras líneas del texto
+        try:
+            views = parse_views(request.query_params.get('views'))
+            bank_key, detection = resolve_bank_key(bank_key, texto)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        if detection:
+            print(f">>> BANK DETECTED: {detection.bank} ({detection.confidence})")
+
         handler = get_handler(bank_key)
         if not handler:
             return Response(
@@ -23,12 +50,11 @@ class PDFConvertView(APIView):
                 status=status.HTTP_404_NOT_FOUND
             )
 
-        texto = request.data
-        print(">> > TEXT RECEIVED:") 
-        print(texto[:200], "...")  # primeros 200 caracteres
-
+        views = handler_views(handler, views)
         try:
-            payload = handler["parser"].parse(texto)
+            print(">> > TEXT RECEIVED:")
+            print("\n".join(texto.peek(5))[:200], "...")  # primeros 200 caracteres
+            payload = handler["parser"].parse(texto, views=views)
         except Exception as e:
             print(">>> PARSE ERROR:", str(e))
             return Response(
@@ -40,17 +66,62 @@ class PDFConvertView(APIView):
             "empresa", "numero_cuenta", "fecha_hora_actual", "nit", "tipo_cuenta"
         ]})
         # print(">>> RAW MOVIMIENTOS COUNT:", len(payload.get("movimientos", [])))
-        serializer_class = handler.get("serializer")
+        # The serializers validate the raw movements
+        serializer_class = handler.get("serializer") if RAW in views else None
         if serializer_class is None:
             # Si no hay serializer definido, devolvemos el payload directamente
-            return Response(payload, status=status.HTTP_200_OK)
+            return _with_detection(Response(payload, status=status.HTTP_200_OK), detection)
 
         serializer = serializer_class(data=payload)
         if serializer.is_valid():
-            return Response(payload, status=status.HTTP_200_OK)
+            return _with_detection(Response(payload, status=status.HTTP_200_OK), detection)
 
         print(">>> SERIALIZER ERRORS:", serializer.errors)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+def _with_detection(response, detection):
+    """Report the bank chosen by ``bank_key=auto`` in the response headers."""
+    if detection is not None:
+        response["X-Bank"] = detection.bank
+        response["X-Bank-Confidence"] = str(detection.confidence)
+    return response
+
+
+class PDFBatchConvertView(APIView):
+    """Parse many plain-text statements in the batch worker processes.
+
+    The body is NDJSON, one ``{"id", "bank_key", "text", "views"}`` object
+    per line, or a multipart upload where each file's field name is its
+    ``bank_key`` (``file``/``files`` use the ``bank_key`` parameter).
+    ``?bank_key=`` and ``?views=`` are the defaults of every document.
+    One NDJSON line per document is streamed back as soon as it is parsed
+    (see :mod:`pdfconvert.batch`).
+    """
+    parser_classes = [NDJSONParser, MultiPartParser]
+
+    def post(self, request, *args, **kwargs):
+        try:
+            views = parse_views(request.query_params.get('views'))
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        bank_key = request.query_params.get('bank_key') or request.POST.get('bank_key') or 'auto'
+        if request.content_type.startswith(NDJSONParser.media_type):
+            documents = batch.ndjson_documents(request.data, bank_key, views)
+        elif request.FILES:
+            documents = batch.multipart_documents(request.FILES, bank_key, views)
+        else:
+            return Response(
+                {"error": "Documentos no proporcionados",
+                 "detail": "Envíe NDJSON (application/x-ndjson) o archivos multipart"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        return StreamingHttpResponse(batch.iter_results(documents, batch_pool),
+                                     content_type='application/x-ndjson')
+
+
 class PDFTextractView(APIView):
     """View to handle PDF uploads processed with Amazon Textract."""
     parser_classes = [MultiPartParser]
@@ -81,19 +152,41 @@ class PDFTextractView(APIView):
         # Enqueue all files for processing
         enqueued_files = []
         failed_files = []
+        archives = []
+        job_ids = []
+        full = None
         
         for file in files:
+            if full is not None:
+                failed_files.append({"file": file.name, "error": str(full)})
+                continue
             try:
                 print(f">>> Processing file: {file.name}, size: {file.size} bytes")
-                worker.enqueue(bank_key, file.name, file.read())
-                enqueued_files.append(file.name)
+                if is_archive(file.name):
+                    # ZIP: cada PDF del archivo se encola por separado
+                    batch, jobs = worker.enqueue_archive(bank_key, file)
+                    archives.append({"file": file.name, "job_id": str(batch.pk), "files": len(jobs)})
+                    enqueued_files.extend(job.file_name for job in jobs)
+                    job_ids.extend({"file": job.file_name, "job_id": str(job.pk)} for job in jobs)
+                else:
+                    job_id = worker.enqueue(bank_key, file.name, file)
+                    enqueued_files.append(file.name)
+                    job_ids.append({"file": file.name, "job_id": job_id})
                 print(f">>> File enqueued for processing: {file.name}")
+            except QueueFull as e:
+                # Cola llena: el resto de archivos tampoco se encola
+                full = e
+                failed_files.append({"file": file.name, "error": str(e)})
+                print(f">>> QUEUE FULL, retry after {e.retry_after}s")
             except Exception as e:
                 failed_files.append({"file": file.name, "error": str(e)})
                 print(f">>> Error enqueueing file {file.name}: {str(e)}")
 
         # Prepare response
-        if enqueued_files and not failed_files:
+        if full is not None:
+            message = f"⏳ Cola llena: {len(enqueued_files)} archivo(s) encolado(s), reintente en {full.retry_after} s"
+            response_status = status.HTTP_429_TOO_MANY_REQUESTS
+        elif enqueued_files and not failed_files:
             message = f"✅ {len(enqueued_files)} archivo(s) encolado(s) para procesamiento"
             response_status = status.HTTP_202_ACCEPTED
         elif enqueued_files and failed_files:
@@ -107,10 +200,12 @@ class PDFTextractView(APIView):
             "message": message,
             "bank_key": bank_key,
             "enqueued_files": enqueued_files,
+            "jobs": job_ids,
             "failed_files": failed_files,
+            "archives": archives,
             "total_files": len(files),
             "queue_size": worker.get_queue_status()["queue_size"]
-        }, status=response_status)
+        }, status=response_status, headers={"Retry-After": str(full.retry_after)} if full else None)
 
 
 class PDFUploadView(View):
@@ -134,8 +229,13 @@ class PDFUploadView(View):
             msg = f'Banco "{bank_key}" no soportado.'
             return render(request, self.template_name, {"message": msg, "success": False})
 
-        for f in files:
-            worker.enqueue(bank_key, f.name, f.read())
+        try:
+            for f in files:
+                worker.enqueue(bank_key, f.name, f)
+        except QueueFull as e:
+            response = render(request, self.template_name, {"message": str(e), "success": False}, status=429)
+            response["Retry-After"] = str(e.retry_after)
+            return response
 
         msg = f"{len(files)} archivo(s) encolado(s) para procesamiento."
         return render(request, self.template_name, {"message": msg, "success": True})